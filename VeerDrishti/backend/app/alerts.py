@@ -0,0 +1,197 @@
+"""
+Alert construction for threat detections, and the in-memory alert store.
+Alerts are produced once by the detection and soldier pipelines and recorded
+here; the API only reads them. The store keeps a recent window; older alerts
+are queried from ``app.history``.
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter, deque
+from itertools import islice
+from typing import Any, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from app.history import history_store
+from app.hub import event_hub
+from app.metrics import alerts_total
+
+# Minimum detection confidence that raises an alert, and the level at which it is HIGH
+ALERT_CONFIDENCE_THRESHOLD = 0.5
+HIGH_SEVERITY_CONFIDENCE = 0.8
+
+# Alert store limits: how long alerts are kept (seconds) and how many at most
+# per alert type, so a flood of one type never evicts the others
+DEFAULT_ALERT_WINDOW = 600.0
+DEFAULT_ALERT_CAPACITY = 10000
+DEFAULT_TYPE_CAPACITIES = {"soldier_warning": 2000}
+
+# Alerts whose bbox matches on this pixel grid within the same time bucket
+# (seconds) are treated as duplicates
+DEFAULT_BBOX_QUANTUM = 32.0
+DEFAULT_TIME_BUCKET = 5.0
+
+
+def detection_alert(detection: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build a threat alert for a detection, or None if it is below the alert threshold."""
+    if detection["confidence"] < ALERT_CONFIDENCE_THRESHOLD:
+        return None
+    return {
+        "type": "threat_detection",
+        "message": f"Threat detected: {detection['label']} (confidence: {detection['confidence']:.2f})",
+        "meta": {
+            "label": detection["label"],
+            "confidence": detection["confidence"],
+            "bbox": detection["bbox"]
+        },
+        "severity": "HIGH" if detection["confidence"] >= HIGH_SEVERITY_CONFIDENCE else "MEDIUM",
+        "timestamp": detection["timestamp"]
+    }
+
+
+class AlertStore:
+    """Bounded, time-ordered ring buffers of alerts with hash-based dedup.
+
+    Alerts are kept oldest to newest in one buffer per alert type. Two alerts with the same dedup key
+    (type, label, severity, bbox quantized to ``bbox_quantum`` pixels,
+    timestamp bucketed to ``time_bucket`` seconds) are stored once, so an
+    escalation is kept alongside the alert it escalates. Entries are evicted
+    when they fall out of ``window`` seconds or their type exceeds its
+    capacity (``capacities`` overrides ``capacity`` per type). Queries merge
+    the buffers walking back from the newest entries, so they cost O(results).
+
+    Each stored alert gets an ``id``. ``version`` increases whenever the
+    stored set changes, so readers can cache anything derived from it.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_ALERT_CAPACITY, window: float = DEFAULT_ALERT_WINDOW,
+                 bbox_quantum: float = DEFAULT_BBOX_QUANTUM, time_bucket: float = DEFAULT_TIME_BUCKET,
+                 capacities: Optional[Dict[str, int]] = None):
+        self.capacity = capacity
+        self.capacities = dict(DEFAULT_TYPE_CAPACITIES if capacities is None else capacities)
+        self.window = window
+        self.bbox_quantum = bbox_quantum
+        self.time_bucket = time_bucket
+        self._entries: Dict[str, Deque[Tuple[float, Hashable, Dict[str, Any]]]] = {}
+        self._keys: Set[Hashable] = set()
+        self._next_id = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def dedup_key(self, alert: Dict[str, Any]) -> Hashable:
+        """Key identifying near-identical alerts."""
+        meta = alert.get("meta", {})
+        label = meta.get("label", meta.get("soldier_id"))
+        bbox = meta.get("bbox")
+        if bbox is not None:
+            bbox = tuple(int(coord // self.bbox_quantum) for coord in bbox)
+        return (alert["type"], label, alert.get("severity"), bbox, int(alert["timestamp"] // self.time_bucket))
+
+    def add(self, alert: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Store an alert. Returns False if it was a duplicate or already expired."""
+        return bool(self.add_many([alert], now))
+
+    def add_many(self, alerts: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Store several alerts under one lock. Returns the ones that were not duplicates."""
+        now = time.time() if now is None else now
+        keyed = [(self.dedup_key(alert), alert) for alert in alerts]
+        accepted = []
+        by_type: Dict[str, List[Tuple[float, Hashable, Dict[str, Any]]]] = {}
+        with self._lock:
+            self._evict(now)
+            cutoff = now - self.window
+            keys = self._keys
+            for key, alert in keyed:
+                timestamp = alert["timestamp"]
+                if key in keys or timestamp <= cutoff:
+                    continue
+                keys.add(key)
+                self._next_id += 1
+                alert["id"] = f"alert-{self._next_id}"
+                by_type.setdefault(alert["type"], []).append((timestamp, key, alert))
+                accepted.append(alert)
+            for alert_type, batch in by_type.items():
+                self._insert(alert_type, batch)
+            if accepted:
+                self.version += 1
+        return accepted
+
+    def _insert(self, alert_type: str, batch: List[Tuple[float, Hashable, Dict[str, Any]]]):
+        """Add entries of one type in time order and enforce its capacity (caller holds the lock)."""
+        entries = self._entries.setdefault(alert_type, deque())
+        for entry in batch:
+            timestamp = entry[0]
+            if not entries or timestamp >= entries[-1][0]:
+                entries.append(entry)
+                continue
+            # Late arrival: insert in time order, searching from the newest end
+            index = len(entries)
+            while index > 0 and entries[index - 1][0] > timestamp:
+                index -= 1
+            entries.insert(index, entry)
+
+        capacity = self.capacities.get(alert_type, self.capacity)
+        for _ in range(len(entries) - capacity):
+            self._keys.discard(entries.popleft()[1])
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop alerts that fell out of the window. Returns how many were dropped."""
+        with self._lock:
+            return self._evict(time.time() if now is None else now)
+
+    def _evict(self, now: float) -> int:
+        """Drop alerts older than the window (caller holds the lock)."""
+        cutoff = now - self.window
+        evicted = 0
+        for entries in self._entries.values():
+            while entries and entries[0][0] <= cutoff:
+                _, key, _ = entries.popleft()
+                self._keys.discard(key)
+                evicted += 1
+        if evicted:
+            self.version += 1
+        return evicted
+
+    def clear(self):
+        """Drop all stored alerts."""
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self.version += 1
+
+    def _newest_first(self) -> Iterable[Tuple[float, Hashable, Dict[str, Any]]]:
+        """All entries newest first, merged across types (caller holds the lock)."""
+        return heapq.merge(*(reversed(entries) for entries in self._entries.values()),
+                           key=lambda entry: entry[0], reverse=True)
+
+    def since(self, timestamp: float) -> List[Dict[str, Any]]:
+        """Alerts newer than timestamp, newest first."""
+        with self._lock:
+            results = []
+            for entry_time, _, alert in self._newest_first():
+                if entry_time <= timestamp:
+                    break
+                results.append(alert)
+            return results
+
+    def latest(self, count: int) -> List[Dict[str, Any]]:
+        """The most recent count alerts, newest first."""
+        with self._lock:
+            return [alert for _, _, alert in islice(self._newest_first(), count)]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+
+def publish_alerts(alerts: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Record alerts in the shared store and push the new ones to live clients."""
+    accepted = alert_store.add_many(alerts, now)
+    for (alert_type, severity), count in Counter((alert["type"], alert["severity"]) for alert in accepted).items():
+        alerts_total.inc(count, alert_type, severity)
+    if accepted:
+        event_hub.publish_events("alerts", {alert["id"]: alert for alert in accepted})
+        history_store.record_alerts(accepted)
+    return accepted
+
+# Global alert store shared by the detection and soldier pipelines
+alert_store = AlertStore()
@@ -0,0 +1,445 @@
+"""
+Process roles and state replication for multi-worker deployments.
+
+``VEERDRISHTI_ROLE`` selects what a process runs:
+
+- ``standalone`` (default): pipelines and API in one process, as before.
+- ``engine``: the only process running inference, the soldier simulation,
+  telemetry ingestion and history recording. It serves the full API and
+  publishes its state to API workers over a local TCP socket
+  (``StatePublisher``).
+- ``api``: any number of uvicorn workers holding a read-only replica of the
+  engine's state (``StateReplica``). Snapshot reads and push clients are
+  served locally; everything else is forwarded to the engine
+  (``EngineProxyMiddleware``).
+
+Snapshots cross the socket already serialized, so the engine encodes each
+version once however many API workers there are, and replicas serve the
+bytes as they arrived.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.hub import event_hub
+from app.snapshot import Snapshot
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROLES = ("standalone", "engine", "api")
+ROLE = os.environ.get("VEERDRISHTI_ROLE", "standalone")
+if ROLE not in ROLES:
+    raise ValueError(f"VEERDRISHTI_ROLE must be one of {ROLES}, got {ROLE!r}")
+
+# Where the engine publishes state, and where API workers forward other requests
+DEFAULT_BROKER_ADDRESS = "127.0.0.1:8765"
+DEFAULT_ENGINE_URL = "http://127.0.0.1:8001"
+
+# How often (seconds) the engine checks snapshots for new versions, and
+# republishes its status
+PUBLISH_INTERVAL = 0.05
+STATUS_INTERVAL = 1.0
+
+# Frames queued per API worker before it is disconnected (it reconnects and resyncs)
+SUBSCRIBER_QUEUE_SIZE = 1024
+RECONNECT_DELAY = 1.0
+
+# Frame: 8-byte header (header length, body length), JSON header, raw body
+_LENGTHS = struct.Struct("!II")
+
+# Hop-by-hop headers not forwarded by the proxy
+HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade", "te", "trailer", "host", "content-length"}
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _frame(header: Dict[str, Any], body: bytes = b"") -> bytes:
+    header_bytes = json.dumps(header, separators=(",", ":")).encode()
+    return _LENGTHS.pack(len(header_bytes), len(body)) + header_bytes + body
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1 << 20))
+        if not chunk:
+            raise ConnectionError("Broker connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _read_frame(sock: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    header_length, body_length = _LENGTHS.unpack(_recv_exact(sock, _LENGTHS.size))
+    header = json.loads(_recv_exact(sock, header_length))
+    return header, _recv_exact(sock, body_length) if body_length else b""
+
+
+class _Subscriber:
+    """One connected API worker: a bounded frame queue drained by a sender thread."""
+
+    def __init__(self, publisher: "StatePublisher", conn: socket.socket, address):
+        self.publisher = publisher
+        self.conn = conn
+        self.address = address
+        self.frames: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+
+    def send(self, frame: bytes):
+        """Queue a frame without blocking; a subscriber that falls behind is disconnected."""
+        if self.closed:
+            return
+        try:
+            self.frames.put_nowait(frame)
+        except queue.Full:
+            logger.warning(f"API worker {self.address} fell behind, disconnecting")
+            self._shutdown()
+
+    def on_hub_message(self, message: str, stateful: bool):
+        self.send(_frame({"type": "hub", "stateful": stateful}, message.encode()))
+
+    def _shutdown(self):
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        # Wake the sender if it is waiting for frames
+        try:
+            self.frames.put_nowait(b"")
+        except queue.Full:
+            pass
+
+    def run(self):
+        """Send queued frames until the connection fails or is shut down."""
+        try:
+            while not self.closed:
+                frame = self.frames.get()
+                if not frame:
+                    continue
+                self.conn.sendall(frame)
+        except OSError:
+            pass
+        finally:
+            self.closed = True
+            event_hub.remove_listener(self.on_hub_message)
+            self.publisher._remove(self)
+            self.conn.close()
+            logger.info(f"API worker {self.address} disconnected")
+
+
+class StatePublisher:
+    """Engine side: publishes snapshots, status and hub messages to API workers.
+
+    ``collect`` returns the current snapshot per key; a key is sent again only
+    when its snapshot version changes. ``status`` returns a small JSON-able
+    document (health and readiness) that is resent when it changes. New
+    subscribers first get every current snapshot, the status and the hub's
+    full state, then a ``synced`` marker.
+    """
+
+    def __init__(self, collect: Callable[[], Dict[str, Snapshot]], status: Callable[[], Dict[str, Any]],
+                 address: str = DEFAULT_BROKER_ADDRESS):
+        self.collect = collect
+        self.status = status
+        self.address = address
+        self.running = False
+        self.subscribers: List[_Subscriber] = []
+        self._frames: Dict[str, bytes] = {}
+        self._versions: Dict[str, Any] = {}
+        self._status_frame: Optional[bytes] = None
+        self._last_status: Optional[Dict[str, Any]] = None
+        self._server: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _broadcast(self, frame: bytes):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.send(frame)
+
+    def _remove(self, subscriber: _Subscriber):
+        with self._lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def publish(self):
+        """Send snapshots whose version changed, and removals of keys that disappeared."""
+        snapshots = self.collect()
+        for key, snapshot in snapshots.items():
+            if self._versions.get(key) == snapshot.version:
+                continue
+            frame = _frame({"type": "state", "key": key, "version": snapshot.version,
+                            "timestamp": snapshot.timestamp}, snapshot.json)
+            with self._lock:
+                self._versions[key] = snapshot.version
+                self._frames[key] = frame
+            self._broadcast(frame)
+
+        for key in [key for key in self._versions if key not in snapshots]:
+            with self._lock:
+                del self._versions[key]
+                del self._frames[key]
+            self._broadcast(_frame({"type": "remove", "key": key}))
+
+    def publish_status(self):
+        """Send the status document if it changed."""
+        status = self.status()
+        if status == self._last_status:
+            return
+        self._last_status = status
+        frame = _frame({"type": "status"}, json.dumps(status).encode())
+        with self._lock:
+            self._status_frame = frame
+        self._broadcast(frame)
+
+    def _publish_loop(self):
+        last_status = 0.0
+        while not self._stop_event.wait(PUBLISH_INTERVAL):
+            try:
+                self.publish()
+                now = time.monotonic()
+                if now - last_status >= STATUS_INTERVAL:
+                    last_status = now
+                    self.publish_status()
+            except Exception as e:
+                logger.error(f"State publish error: {e}")
+
+    def _accept_loop(self):
+        while self.running:
+            try:
+                conn, address = self._server.accept()
+            except OSError:
+                break
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = _Subscriber(self, conn, address)
+            with self._lock:
+                for frame in self._frames.values():
+                    subscriber.send(frame)
+                if self._status_frame is not None:
+                    subscriber.send(self._status_frame)
+                self.subscribers.append(subscriber)
+            event_hub.add_listener(subscriber.on_hub_message)
+            subscriber.send(_frame({"type": "synced"}))
+            threading.Thread(target=subscriber.run, name=f"broker-{address[1]}", daemon=True).start()
+            logger.info(f"API worker {address} connected")
+
+    def start(self):
+        """Listen for API workers and start publishing."""
+        if self.running:
+            return
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(_parse_address(self.address))
+        self._server.listen()
+        self.running = True
+        self._stop_event.clear()
+        self.publish()
+        self.publish_status()
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="broker-accept", daemon=True),
+            threading.Thread(target=self._publish_loop, name="broker-publish", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Publishing state to API workers on {self.address}")
+
+    def stop(self):
+        """Stop publishing and disconnect all API workers."""
+        self.running = False
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.close()
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber._shutdown()
+        for thread in self._threads:
+            thread.join()
+        logger.info("State publishing stopped")
+
+
+class StateReplica:
+    """API side: read-only copy of the engine's snapshots, status and hub state.
+
+    A background thread keeps a connection to the engine's publisher,
+    reconnecting after failures. Received snapshots are served as-is via
+    ``snapshot``; hub messages are applied to this process's ``event_hub``
+    so local WebSocket/SSE clients get the same deltas.
+    """
+
+    def __init__(self, address: str = DEFAULT_BROKER_ADDRESS):
+        self.address = address
+        self.snapshots: Dict[str, Snapshot] = {}
+        self.status: Dict[str, Any] = {}
+        self.connected = False
+        self.synced = False
+        self.running = False
+        self.thread = None
+        self._sock: Optional[socket.socket] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the replica is in sync with an engine that reports ready."""
+        return self.connected and self.synced and bool(self.status.get("ready"))
+
+    def snapshot(self, key: str) -> Snapshot:
+        """Latest snapshot received for a key. Raises KeyError if the engine has none."""
+        return self.snapshots[key]
+
+    def _apply_hub(self, message: str, stateful: bool):
+        data = json.loads(message)
+        if not stateful:
+            event_hub.publish_events(data["topic"], data["upsert"])
+        elif data["snapshot"]:
+            event_hub.publish_state(data["topic"], data["upsert"])
+        else:
+            event_hub.update_state(data["topic"], data["upsert"], data["remove"])
+
+    def _receive(self, sock: socket.socket):
+        """Apply frames until the connection drops."""
+        received = set()
+        while self.running:
+            header, body = _read_frame(sock)
+            kind = header["type"]
+            if kind == "state":
+                self.snapshots[header["key"]] = Snapshot.from_json(header["version"], body, header["timestamp"])
+                received.add(header["key"])
+            elif kind == "remove":
+                self.snapshots.pop(header["key"], None)
+            elif kind == "status":
+                self.status = json.loads(body)
+            elif kind == "hub":
+                self._apply_hub(body.decode(), header["stateful"])
+            elif kind == "synced":
+                # Drop keys the engine no longer has (removed while we were disconnected)
+                for key in [key for key in self.snapshots if key not in received]:
+                    del self.snapshots[key]
+                self.synced = True
+
+    def _run(self):
+        while self.running:
+            try:
+                sock = socket.create_connection(_parse_address(self.address), timeout=RECONNECT_DELAY)
+                sock.settimeout(None)
+                self._sock = sock
+                self.connected = True
+                logger.info(f"Connected to engine at {self.address}")
+                self._receive(sock)
+            except (OSError, ConnectionError, ValueError) as e:
+                if self.connected:
+                    logger.warning(f"Lost engine connection: {e}")
+            finally:
+                self.connected = False
+                self.synced = False
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+            self._stop_event.wait(RECONNECT_DELAY)
+
+    def start(self):
+        """Start following the engine."""
+        if not self.running:
+            self.running = True
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name="state-replica", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop following the engine."""
+        self.running = False
+        self._stop_event.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.thread:
+            self.thread.join()
+
+
+class EngineProxyMiddleware:
+    """ASGI middleware for API workers: forwards HTTP requests not served locally to the engine.
+
+    Responses are streamed back as they arrive (MJPEG and SSE included) and
+    the upstream request is cancelled when the client disconnects.
+    """
+
+    def __init__(self, app, is_local: Callable[[str], bool], engine_url: str = DEFAULT_ENGINE_URL):
+        import httpx
+
+        self.app = app
+        self.is_local = is_local
+        self.client = httpx.AsyncClient(base_url=engine_url, timeout=None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.is_local(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+
+        forward = asyncio.ensure_future(self._forward(scope, bytes(body), send))
+        disconnect = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await asyncio.wait({forward, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (forward, disconnect):
+                task.cancel()
+        if forward.done() and not forward.cancelled() and forward.exception() is not None:
+            raise forward.exception()
+
+    @staticmethod
+    async def _wait_disconnect(receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _forward(self, scope, body: bytes, send):
+        import httpx
+
+        headers = [(key.decode("latin-1"), value.decode("latin-1")) for key, value in scope["headers"]
+                   if key.decode("latin-1").lower() not in HOP_HEADERS]
+        url = scope["path"] + (f"?{scope['query_string'].decode()}" if scope.get("query_string") else "")
+        request = self.client.build_request(scope["method"], url, headers=headers, content=body)
+        try:
+            response = await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            logger.error(f"Engine unreachable: {e}")
+            payload = json.dumps({"detail": "Engine unavailable"}).encode()
+            await send({"type": "http.response.start", "status": 503,
+                        "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": payload})
+            return
+
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(key.encode("latin-1"), value.encode("latin-1"))
+                            for key, value in response.headers.multi_items() if key.lower() not in HOP_HEADERS]
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            await response.aclose()
@@ -0,0 +1,535 @@
+"""
+Interchangeable object detector backends.
+Each backend loads one model, warms it up, runs batches of frames and filters
+the results against the watchlist; all of them report their own latency.
+
+Backends:
+- ``ultralytics``: PyTorch YOLO through the ultralytics package
+- ``onnxruntime``: exported YOLO ONNX model on ONNX Runtime (OpenVINO provider when installed)
+- ``opencv_dnn``: exported YOLO ONNX model on OpenCV's DNN module
+- ``motion``: background-subtraction motion detection only
+
+ONNX models can be exported (and quantized) with:
+    python -m app.detectors --weights yolov8n.pt --precision int8
+"""
+
+import ast
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.metrics import detector_batch_size, detector_stage_seconds, metrics
+from app.motion import MotionEngine
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("ultralytics", "onnxruntime", "opencv_dnn", "motion")
+PRECISIONS = ("fp32", "fp16", "int8")
+
+# Backend used for streams that do not choose one
+DEFAULT_BACKEND = os.environ.get("DETECTOR_BACKEND", "ultralytics")
+DEFAULT_WEIGHTS = "yolov8n.pt"
+DEFAULT_INPUT_SIZE = 640
+DEFAULT_WARMUP_RUNS = 2
+
+# Overlap above which same-class boxes are merged by NMS (ONNX backends)
+NMS_IOU_THRESHOLD = 0.45
+
+# Serializes ONNX exports, so workers loading the same configuration export
+# the default model once instead of writing the same file concurrently
+_export_lock = threading.Lock()
+
+# Pad value used when letterboxing frames to the model input size
+LETTERBOX_COLOR = 114
+
+# Latency samples kept per backend for percentiles
+LATENCY_WINDOW = 1000
+
+MOTION_LABEL = "intrusion"
+MOTION_CONFIDENCE = 0.7  # Fixed confidence for motion detection
+
+# Class names of the COCO-trained YOLO models, used when an ONNX file has no metadata
+COCO_NAMES = [
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat", "traffic light",
+    "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse", "sheep", "cow",
+    "elephant", "bear", "zebra", "giraffe", "backpack", "umbrella", "handbag", "tie", "suitcase", "frisbee",
+    "skis", "snowboard", "sports ball", "kite", "baseball bat", "baseball glove", "skateboard", "surfboard",
+    "tennis racket", "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair", "couch",
+    "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse", "remote", "keyboard",
+    "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator", "book", "clock", "vase",
+    "scissors", "teddy bear", "hair drier", "toothbrush"
+]
+
+
+@dataclass(frozen=True)
+class DetectorConfig:
+    """Which backend a stream uses and how its model is loaded.
+
+    ``model_path`` defaults to the YOLO weights for ``ultralytics`` and to
+    the exported ONNX file for the requested precision otherwise (exported
+    on first load if missing). A custom ONNX ``model_path`` must exist.
+    """
+    backend: str = DEFAULT_BACKEND
+    model_path: Optional[str] = None
+    input_size: int = DEFAULT_INPUT_SIZE
+    precision: str = "fp32"
+    warmup_runs: int = DEFAULT_WARMUP_RUNS
+
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown detector backend: {self.backend} (expected one of {', '.join(BACKENDS)})")
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {self.precision} (expected one of {', '.join(PRECISIONS)})")
+        if self.input_size <= 0 or self.input_size % 32:
+            raise ValueError("input_size must be a positive multiple of 32")
+        if self.model_path and self.backend in ("onnxruntime", "opencv_dnn") and not Path(self.model_path).exists():
+            raise ValueError(f"Model file not found: {self.model_path}")
+
+    @property
+    def key(self) -> str:
+        """Short identifier used in stats."""
+        if self.backend == "motion":
+            return "motion"
+        return f"{self.backend}:{Path(self.resolved_model_path).name}@{self.input_size}"
+
+    @property
+    def resolved_model_path(self) -> str:
+        if self.model_path:
+            return self.model_path
+        if self.backend == "ultralytics":
+            return DEFAULT_WEIGHTS
+        return onnx_model_path(DEFAULT_WEIGHTS, self.precision)
+
+
+class LatencyStats:
+    """Rolling latency samples for one detector configuration (thread-safe)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.backend: Optional[str] = None
+        self.calls = 0
+        self.frames = 0
+        self.errors = 0
+        self._samples: Deque[Tuple[float, int]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, frames: int):
+        with self._lock:
+            self.calls += 1
+            self.frames += frames
+            self._samples.append((seconds, frames))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Call latency percentiles and per-frame cost, in milliseconds."""
+        with self._lock:
+            samples = list(self._samples)
+            calls, frames, errors = self.calls, self.frames, self.errors
+        stats = {"backend": self.backend, "calls": calls, "frames": frames, "errors": errors}
+        if samples:
+            seconds = np.array([sample[0] for sample in samples]) * 1000.0
+            batch_frames = sum(sample[1] for sample in samples)
+            stats.update({
+                "mean_ms": round(float(seconds.mean()), 2),
+                "p50_ms": round(float(np.percentile(seconds, 50)), 2),
+                "p99_ms": round(float(np.percentile(seconds, 99)), 2),
+                "per_frame_ms": round(float(seconds.sum()) / batch_frames, 2)
+            })
+        return stats
+
+
+class Detector:
+    """Base class for detector backends.
+
+    Subclasses implement ``load`` (set ``names``, the class id -> label
+    map) and ``_detect``. ``detect_batch`` keeps the watchlist lookup table
+    current, times each call and turns backend errors into empty results.
+    Backends that can split their time into preprocess, infer and postprocess
+    record it in ``stage_times``; otherwise the whole call counts as infer.
+    """
+
+    name = "base"
+    supports_batching = False
+
+    def __init__(self, config: DetectorConfig, watchlist, latency: Optional[LatencyStats] = None):
+        self.config = config
+        self.watchlist = watchlist
+        self.latency = latency or LatencyStats()
+        self.latency.backend = self.name
+        self.names: Dict[int, str] = {}
+        self.stage_times: Dict[str, float] = {}
+
+        # Per-class confidence thresholds indexed by class id (inf = not watched)
+        self._class_thresholds = np.empty(0, dtype=np.float32)
+        self._class_names = np.empty(0, dtype=object)
+        self._watchlist_version = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def _add_stage_time(self, stage: str, seconds: float):
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def warmup(self):
+        """Run the model on blank frames so the first real batch is not slow."""
+        self._compile_watchlist()
+        frame = np.zeros((self.config.input_size, self.config.input_size, 3), dtype=np.uint8)
+        motion = MotionEngine()
+        for _ in range(self.config.warmup_runs):
+            self._detect([frame], [motion])
+
+    def _compile_watchlist(self):
+        """Build the class-id indexed threshold table from the watchlist."""
+        version, thresholds = self.watchlist.snapshot()
+        table = np.full(max(self.names) + 1, np.inf, dtype=np.float32)
+        class_names = np.empty(len(table), dtype=object)
+        for class_id, name in self.names.items():
+            class_names[class_id] = name
+            if name in thresholds:
+                table[class_id] = thresholds[name]
+        self._class_thresholds = table
+        self._class_names = class_names
+        self._watchlist_version = version
+
+    def detect_batch(self, frames: List[np.ndarray], motion_engines: List[MotionEngine]) -> List[List[Dict[str, Any]]]:
+        """Detect watched objects in a batch of frames, one result list per frame.
+
+        ``motion_engines`` holds the per-stream motion state used by the motion backend.
+        """
+        try:
+            if self._watchlist_version != self.watchlist.version:
+                self._compile_watchlist()
+            self.stage_times = {}
+            start = time.perf_counter()
+            results = self._detect(frames, motion_engines)
+            elapsed = time.perf_counter() - start
+            self.latency.record(elapsed, len(frames))
+            if metrics.enabled:
+                key = self.config.key
+                detector_batch_size.observe(len(frames), key)
+                for stage, seconds in (self.stage_times or {"infer": elapsed}).items():
+                    detector_stage_seconds.observe(seconds, key, stage)
+            return results
+        except Exception as e:
+            self.latency.errors += 1
+            logger.error(f"{self.name} detection error: {e}")
+            return [[] for _ in frames]
+
+    def _detect(self, frames: List[np.ndarray], motion_engines: List[MotionEngine]) -> List[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def _to_detections(self, boxes: np.ndarray, confidence: np.ndarray, class_ids: np.ndarray,
+                       timestamp: float) -> List[Dict[str, Any]]:
+        """Keep watchlist boxes above their label's threshold using array masks."""
+        if len(boxes) == 0:
+            return []
+        class_ids = class_ids.astype(np.intp)
+        keep = confidence >= self._class_thresholds[class_ids]
+        if not keep.any():
+            return []
+        return [
+            {
+                "label": label,
+                "confidence": conf,
+                "bbox": bbox,
+                "timestamp": timestamp
+            }
+            for label, conf, bbox in zip(
+                self._class_names[class_ids[keep]].tolist(), confidence[keep].tolist(), boxes[keep].tolist()
+            )
+        ]
+
+
+class MotionDetector(Detector):
+    """Motion-only backend: every moving region is reported as an intrusion."""
+
+    name = "motion"
+
+    def load(self):
+        self.names = {0: MOTION_LABEL}
+
+    def warmup(self):
+        pass
+
+    def _detect(self, frames, motion_engines):
+        timestamp = time.time()
+        results = []
+        for frame, motion in zip(frames, motion_engines):
+            boxes = motion.detect(frame)
+            results.append(self._to_detections(
+                boxes, np.full(len(boxes), MOTION_CONFIDENCE, dtype=np.float32),
+                np.zeros(len(boxes), dtype=np.intp), timestamp
+            ))
+        return results
+
+
+class UltralyticsDetector(Detector):
+    """PyTorch YOLO via ultralytics. ``fp16`` runs the model in half precision."""
+
+    name = "ultralytics"
+    supports_batching = True
+
+    def load(self):
+        from ultralytics import YOLO
+
+        if self.config.precision == "int8":
+            logger.warning("ultralytics backend has no int8 mode, use onnxruntime for quantized models")
+        self.model = YOLO(self.config.resolved_model_path)
+        self.names = dict(self.model.names)
+
+    def _detect(self, frames, motion_engines):
+        results = self.model(frames, imgsz=self.config.input_size, half=self.config.precision == "fp16",
+                             verbose=False)
+        timestamp = time.time()
+        start = time.perf_counter()
+        detections = []
+        for result in results:
+            boxes = result.boxes
+            if boxes is None or len(boxes) == 0:
+                detections.append([])
+                continue
+            detections.append(self._to_detections(
+                boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy(), timestamp
+            ))
+
+        # ultralytics reports per-image stage times in milliseconds
+        if results:
+            speed = results[0].speed
+            for stage, name in (("preprocess", "preprocess"), ("infer", "inference"), ("postprocess", "postprocess")):
+                self._add_stage_time(stage, speed.get(name, 0.0) * len(results) / 1000.0)
+        self._add_stage_time("postprocess", time.perf_counter() - start)
+        return detections
+
+
+class OnnxYoloDetector(Detector):
+    """Shared pre- and post-processing for exported YOLOv8 ONNX models."""
+
+    def _ensure_model(self) -> str:
+        """Path of the ONNX model, exporting the default one first if it is missing."""
+        path = self.config.resolved_model_path
+        if self.config.model_path:
+            if not Path(path).exists():
+                raise FileNotFoundError(f"Model file not found: {path}")
+            return path
+        with _export_lock:
+            # Another worker may have exported it while this one waited
+            if not Path(path).exists():
+                logger.info(f"{path} not found, exporting from {DEFAULT_WEIGHTS}")
+                export_model(DEFAULT_WEIGHTS, self.config.precision, self.config.input_size, path)
+        return path
+
+    def _letterbox(self, frame: np.ndarray) -> Tuple[np.ndarray, float, float, float]:
+        """Resize keeping aspect ratio and pad to the square input size.
+
+        Returns (image, scale, pad_x, pad_y).
+        """
+        size = self.config.input_size
+        height, width = frame.shape[:2]
+        scale = min(size / height, size / width)
+        new_width, new_height = int(round(width * scale)), int(round(height * scale))
+        pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+        image = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+        image[pad_y:pad_y + new_height, pad_x:pad_x + new_width] = cv2.resize(
+            frame, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+        return image, scale, pad_x, pad_y
+
+    def _postprocess(self, output: np.ndarray, scale: float, pad_x: float, pad_y: float,
+                     timestamp: float) -> List[Dict[str, Any]]:
+        """Decode one image's (4 + classes, anchors) output into watchlist detections."""
+        predictions = output.T
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidence = scores[np.arange(len(scores)), class_ids]
+
+        # Drop anything below its class threshold before NMS
+        candidates = confidence >= self._class_thresholds[class_ids]
+        if not candidates.any():
+            return []
+        predictions, confidence, class_ids = predictions[candidates], confidence[candidates], class_ids[candidates]
+
+        cx, cy, w, h = predictions[:, 0], predictions[:, 1], predictions[:, 2], predictions[:, 3]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
+
+        xywh = np.concatenate([boxes[:, :2], boxes[:, 2:] - boxes[:, :2]], axis=1)
+        keep = cv2.dnn.NMSBoxesBatched(
+            xywh.tolist(), confidence.tolist(), class_ids.tolist(), 0.0, NMS_IOU_THRESHOLD
+        )
+        keep = np.asarray(keep, dtype=np.intp).reshape(-1)
+        return self._to_detections(boxes[keep], confidence[keep], class_ids[keep], timestamp)
+
+
+class OnnxRuntimeDetector(OnnxYoloDetector):
+    """YOLO ONNX model on ONNX Runtime, using OpenVINO on CPU when available."""
+
+    name = "onnxruntime"
+
+    def load(self):
+        import onnxruntime as ort
+
+        path = self._ensure_model()
+        available = ort.get_available_providers()
+        providers = [p for p in ("OpenVINOExecutionProvider", "CPUExecutionProvider") if p in available]
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, sess_options=options, providers=providers)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_dtype = np.float16 if model_input.type == "tensor(float16)" else np.float32
+        # Models exported with a fixed batch dimension take one frame per call
+        self.supports_batching = not isinstance(model_input.shape[0], int)
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata["names"]) if "names" in metadata else dict(enumerate(COCO_NAMES))
+        logger.info(f"ONNX Runtime model {path} loaded with {self.session.get_providers()}")
+
+    def _run(self, images: List[np.ndarray]) -> np.ndarray:
+        start = time.perf_counter()
+        blob = np.ascontiguousarray(np.stack(images)[..., ::-1].transpose(0, 3, 1, 2), dtype=self.input_dtype)
+        blob /= 255.0
+        ran = time.perf_counter()
+        output = self.session.run(None, {self.input_name: blob})[0]
+        self._add_stage_time("preprocess", ran - start)
+        self._add_stage_time("infer", time.perf_counter() - ran)
+        return output
+
+    def _detect(self, frames, motion_engines):
+        start = time.perf_counter()
+        letterboxed = [self._letterbox(frame) for frame in frames]
+        self._add_stage_time("preprocess", time.perf_counter() - start)
+        if self.supports_batching:
+            outputs = self._run([item[0] for item in letterboxed])
+        else:
+            outputs = np.concatenate([self._run([item[0]]) for item in letterboxed])
+        timestamp = time.time()
+        start = time.perf_counter()
+        results = [
+            self._postprocess(output.astype(np.float32), scale, pad_x, pad_y, timestamp)
+            for output, (_, scale, pad_x, pad_y) in zip(outputs, letterboxed)
+        ]
+        self._add_stage_time("postprocess", time.perf_counter() - start)
+        return results
+
+
+class OpenCVDNNDetector(OnnxYoloDetector):
+    """YOLO ONNX model on OpenCV's DNN module (no extra dependencies)."""
+
+    name = "opencv_dnn"
+
+    def load(self):
+        path = self._ensure_model()
+        self.net = cv2.dnn.readNetFromONNX(path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        if self.config.precision == "fp16" and hasattr(cv2.dnn, "DNN_TARGET_CPU_FP16"):
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU_FP16)
+        else:
+            self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.names = dict(enumerate(COCO_NAMES))
+        logger.info(f"OpenCV DNN model {path} loaded")
+
+    def _detect(self, frames, motion_engines):
+        results = []
+        for frame in frames:
+            start = time.perf_counter()
+            image, scale, pad_x, pad_y = self._letterbox(frame)
+            self.net.setInput(cv2.dnn.blobFromImage(image, 1.0 / 255.0, swapRB=True))
+            ran = time.perf_counter()
+            output = self.net.forward()[0]
+            finished = time.perf_counter()
+            results.append(self._postprocess(output, scale, pad_x, pad_y, time.time()))
+            self._add_stage_time("preprocess", ran - start)
+            self._add_stage_time("infer", finished - ran)
+            self._add_stage_time("postprocess", time.perf_counter() - finished)
+        return results
+
+
+DETECTOR_CLASSES = {
+    "ultralytics": UltralyticsDetector,
+    "onnxruntime": OnnxRuntimeDetector,
+    "opencv_dnn": OpenCVDNNDetector,
+    "motion": MotionDetector
+}
+
+
+def load_detector(config: DetectorConfig, watchlist, latency: Optional[LatencyStats] = None) -> Detector:
+    """Load and warm up a detector, falling back to motion detection if the backend fails."""
+    detector = DETECTOR_CLASSES[config.backend](config, watchlist, latency)
+    try:
+        detector.load()
+        detector.warmup()
+        logger.info(f"{config.key} detector ready")
+        return detector
+    except ImportError as e:
+        logger.warning(f"{config.backend} backend not available ({e}), using motion detection fallback")
+    except Exception as e:
+        logger.warning(f"{config.key} failed to load: {e}, using motion detection fallback")
+
+    detector = MotionDetector(config, watchlist, latency)
+    detector.load()
+    return detector
+
+
+def onnx_model_path(weights: str, precision: str) -> str:
+    """File name of the exported ONNX model for weights and precision."""
+    stem = Path(weights).with_suffix("")
+    return f"{stem}.onnx" if precision == "fp32" else f"{stem}-{precision}.onnx"
+
+
+def export_model(weights: str = DEFAULT_WEIGHTS, precision: str = "fp32", input_size: int = DEFAULT_INPUT_SIZE,
+                 output: Optional[str] = None) -> str:
+    """Export YOLO weights to ONNX, optionally converted to FP16 or quantized to INT8.
+
+    The model is exported with a dynamic batch dimension. INT8 uses ONNX
+    Runtime dynamic quantization; FP16 converts weights with onnxconverter-common
+    and keeps float32 inputs and outputs. The model is built in a staging
+    directory next to ``output`` and renamed into place, so readers never see
+    a partial file. Returns the path written.
+    """
+    from ultralytics import YOLO
+
+    output = output or onnx_model_path(weights, precision)
+    with tempfile.TemporaryDirectory(dir=Path(output).resolve().parent) as staging:
+        # Export a copy of the weights so the intermediate ONNX file is written inside the staging directory
+        staged = shutil.copy(YOLO(weights).ckpt_path or weights, staging)
+        exported = YOLO(staged).export(format="onnx", imgsz=input_size, dynamic=True, simplify=True)
+        partial = os.path.join(staging, Path(output).name)
+
+        if precision == "int8":
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(exported, partial, weight_type=QuantType.QUInt8)
+        elif precision == "fp16":
+            import onnx
+            from onnxconverter_common import float16
+            model = float16.convert_float_to_float16(onnx.load(exported), keep_io_types=True)
+            onnx.save(model, partial)
+        else:
+            partial = exported
+        os.replace(partial, output)
+
+    logger.info(f"Exported {weights} to {output} ({precision}, {input_size}px)")
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export YOLO weights for the ONNX detector backends")
+    parser.add_argument("--weights", default=DEFAULT_WEIGHTS)
+    parser.add_argument("--precision", choices=PRECISIONS, default="fp32")
+    parser.add_argument("--input-size", type=int, default=DEFAULT_INPUT_SIZE)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    print(export_model(args.weights, args.precision, args.input_size, args.output))
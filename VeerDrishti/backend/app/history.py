@@ -0,0 +1,383 @@
+"""
+Persistent history of detections, alerts and soldier telemetry.
+Rows are appended to an SQLite database in WAL mode by a single writer
+thread; the live pipelines only hand over batches, and range queries read
+through their own connections without blocking the writer.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.metrics import history_flush_seconds
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = "history.db"
+
+# How often (seconds) buffered rows are written, and how many rows may wait
+# before new ones are dropped (backpressure)
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 500000
+
+# Rows older than this (days) are deleted, and each table is trimmed to its
+# newest DEFAULT_MAX_ROWS rows, checked every RETENTION_CHECK_INTERVAL seconds
+DEFAULT_RETENTION_DAYS = 7.0
+DEFAULT_MAX_ROWS = 5000000
+RETENTION_CHECK_INTERVAL = 600.0
+
+# Simulated soldier state is sampled into history at most this often (seconds);
+# wearable readings are recorded as they arrive
+SOLDIER_SAMPLE_INTERVAL = 10.0
+
+# Range queries longer than this (seconds) are downsampled into at most
+# MAX_BUCKETS time buckets unless a bucket size is given
+RAW_WINDOW_LIMIT = 3600.0
+MAX_BUCKETS = 720
+DEFAULT_QUERY_LIMIT = 10000
+
+# Replay looks back this far (seconds) for the last known state
+DEFAULT_REPLAY_WINDOW = 10.0
+
+KINDS = ("telemetry", "detections", "alerts")
+STATUS_NAMES = ("OK", "AT_RISK", "CRITICAL")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    ts REAL NOT NULL, stream_id TEXT NOT NULL, track_id INTEGER, label TEXT NOT NULL,
+    confidence REAL, x1 REAL, y1 REAL, x2 REAL, y2 REAL
+);
+CREATE INDEX IF NOT EXISTS detections_ts ON detections (ts);
+CREATE INDEX IF NOT EXISTS detections_stream_ts ON detections (stream_id, ts);
+CREATE TABLE IF NOT EXISTS alerts (
+    ts REAL NOT NULL, id TEXT, type TEXT NOT NULL, severity TEXT, message TEXT, meta TEXT
+);
+CREATE INDEX IF NOT EXISTS alerts_ts ON alerts (ts);
+CREATE TABLE IF NOT EXISTS telemetry (
+    ts REAL NOT NULL, soldier_id TEXT NOT NULL, lat REAL, lon REAL, heart_rate INTEGER, status INTEGER
+);
+CREATE INDEX IF NOT EXISTS telemetry_ts ON telemetry (ts);
+CREATE INDEX IF NOT EXISTS telemetry_soldier_ts ON telemetry (soldier_id, ts);
+"""
+
+INSERTS = {
+    "detections": "INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "alerts": "INSERT INTO alerts VALUES (?, ?, ?, ?, ?, ?)",
+    "telemetry": "INSERT INTO telemetry VALUES (?, ?, ?, ?, ?, ?)"
+}
+
+# Downsampled aggregates per kind: (group columns, aggregate columns)
+AGGREGATES = {
+    "telemetry": ("soldier_id", "AVG(lat) AS lat, AVG(lon) AS lon, AVG(heart_rate) AS heart_rate, "
+                                "MIN(heart_rate) AS heart_rate_min, MAX(heart_rate) AS heart_rate_max, "
+                                "MAX(status) AS status, COUNT(*) AS samples"),
+    "detections": ("stream_id, label", "COUNT(*) AS count, COUNT(DISTINCT track_id) AS tracks, "
+                                       "MAX(confidence) AS max_confidence"),
+    "alerts": ("type, severity", "COUNT(*) AS count")
+}
+
+# A pending batch: (table, row count, builder producing the rows on the writer thread)
+Chunk = Tuple[str, int, Callable[[], Iterable[Sequence[Any]]]]
+
+
+class HistoryStore:
+    """Append-only history in SQLite (WAL mode).
+
+    The ``record_*`` methods only queue a closure that builds the rows, so
+    the live loops never format rows or touch the database; a writer thread
+    builds and inserts all queued rows in one transaction every
+    ``flush_interval`` seconds. When more than ``max_pending`` rows are
+    waiting, new batches are dropped and counted. Rows past the retention
+    period, and the oldest rows of any table above ``max_rows``, are deleted
+    periodically.
+
+    Queries open a read connection per thread. In WAL mode readers see the
+    last committed state and never wait on the writer.
+    """
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH, enabled: bool = True,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_pending: int = DEFAULT_MAX_PENDING,
+                 retention_days: float = DEFAULT_RETENTION_DAYS, max_rows: int = DEFAULT_MAX_ROWS):
+        self.path = path
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.retention = retention_days * 86400.0
+        self.max_rows = max_rows
+        self.running = False
+        self._queryable = False
+        self.read_only = False
+        self.thread = None
+        self._pending: List[Chunk] = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._local = threading.local()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._last_retention = 0.0
+
+        # Counters
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def queryable(self) -> bool:
+        """Whether queries can be served (read-only stores wait for the recording process to create the file)."""
+        return self._queryable and (not self.read_only or os.path.exists(self.path))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection (opened read-only when this process does not record)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self.read_only:
+                conn = sqlite3.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True,
+                                       check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+            else:
+                conn = self._connect()
+            conn.execute("PRAGMA query_only=1")
+            self._local.conn = conn
+        return conn
+
+    # Recording (called from the live loops)
+
+    def _append(self, table: str, count: int, build: Callable[[], Iterable[Sequence[Any]]]):
+        if not self.enabled or not self.running or count == 0:
+            return
+        with self._lock:
+            if self._pending_rows + count > self.max_pending:
+                self.dropped += count
+                return
+            self._pending.append((table, count, build))
+            self._pending_rows += count
+
+    def record_detections(self, stream_id: str, detections: List[Dict[str, Any]], timestamp: float):
+        """Record one detector pass for a stream."""
+        self._append("detections", len(detections), lambda: [
+            (timestamp, stream_id, detection.get("track_id"), detection["label"], detection["confidence"],
+             *detection["bbox"])
+            for detection in detections
+        ])
+
+    def record_alerts(self, alerts: List[Dict[str, Any]]):
+        """Record alerts accepted by the alert store."""
+        self._append("alerts", len(alerts), lambda: [
+            (alert["timestamp"], alert.get("id"), alert["type"], alert.get("severity"), alert.get("message"),
+             json.dumps(alert.get("meta", {}), default=str))
+            for alert in alerts
+        ])
+
+    def record_telemetry(self, ids: List[str], lat, lon, heart_rate, status, timestamp):
+        """Record soldier state from parallel columns (lists or arrays owned by the caller)."""
+        self._append("telemetry", len(ids), lambda: zip(
+            _column(timestamp), ids, _column(lat), _column(lon), _column(heart_rate), _column(status)
+        ))
+
+    # Writer
+
+    def flush(self) -> int:
+        """Write all pending rows in one transaction. Returns how many were written."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._pending_rows = 0
+        if not batch:
+            return 0
+
+        written = 0
+        with history_flush_seconds.time():
+            try:
+                with self._writer:
+                    for table, count, build in batch:
+                        self._writer.executemany(INSERTS[table], build())
+                        written += count
+            except sqlite3.Error as e:
+                self.errors += 1
+                logger.error(f"History write error: {e}")
+                return 0
+        self.written += written
+        return written
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete rows older than the retention period, then trim each table to ``max_rows``.
+
+        Returns how many rows were deleted. Rows are appended in time order,
+        so the lowest rowids are the oldest.
+        """
+        cutoff = (time.time() if now is None else now) - self.retention
+        expired = trimmed = 0
+        with self._writer:
+            for table in KINDS:
+                expired += self._writer.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff,)).rowcount
+                trimmed += self._writer.execute(
+                    f"DELETE FROM {table} WHERE rowid <= (SELECT MAX(rowid) FROM {table}) - ?", (self.max_rows,)
+                ).rowcount
+        if expired:
+            logger.info(f"History pruned {expired} rows older than {self.retention / 86400.0:g} days")
+        if trimmed:
+            logger.info(f"History trimmed {trimmed} rows over {self.max_rows} per table")
+        return expired + trimmed
+
+    def _writer_loop(self):
+        """Write buffered rows at a fixed interval and prune old rows now and then."""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+                now = time.time()
+                if now - self._last_retention >= RETENTION_CHECK_INTERVAL:
+                    self._last_retention = now
+                    self.prune(now)
+            except Exception as e:
+                logger.error(f"History writer error: {e}")
+
+    def start(self, record: bool = True):
+        """Open the database and start the writer thread.
+
+        With ``record=False`` (API workers in a scaled-out deployment) the
+        store only serves queries over read-only connections; the recording
+        process is the only one that creates the schema.
+        """
+        if not self.enabled or self.running:
+            return
+        if not record:
+            self.read_only = True
+            self._queryable = True
+            logger.info(f"History queries from {self.path} (read-only)")
+            return
+        self.read_only = False
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._queryable = True
+        self._writer = conn
+        self.running = True
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._writer_loop, name="history-writer", daemon=True)
+        self.thread.start()
+        logger.info(f"History recording to {self.path}")
+
+    def stop(self):
+        """Stop the writer thread, writing anything still buffered."""
+        self._queryable = False
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+        self._writer.close()
+        self._writer = None
+        logger.info("History recording stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer counters."""
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "written": self.written,
+            "pending": self._pending_rows,
+            "dropped": self.dropped,
+            "errors": self.errors
+        }
+
+    # Queries (called from API worker threads)
+
+    def query(self, kind: str, start: float, end: float, soldier_id: Optional[str] = None,
+              stream_id: Optional[str] = None, bucket: Optional[float] = None,
+              limit: int = DEFAULT_QUERY_LIMIT) -> Dict[str, Any]:
+        """Rows of one kind in [start, end), oldest first.
+
+        Windows longer than ``RAW_WINDOW_LIMIT`` are aggregated into time
+        buckets (about ``MAX_BUCKETS`` of them) unless ``bucket`` is given;
+        ``bucket=0`` forces raw rows.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown history kind: {kind}")
+        if end <= start:
+            raise ValueError("'to' must be after 'from'")
+        if bucket is None and end - start > RAW_WINDOW_LIMIT:
+            bucket = float(math.ceil((end - start) / MAX_BUCKETS))
+        if bucket is not None and bucket < 0:
+            raise ValueError("bucket must not be negative")
+
+        where, params = ["ts >= ?", "ts < ?"], [start, end]
+        if soldier_id is not None and kind == "telemetry":
+            where.append("soldier_id = ?")
+            params.append(soldier_id)
+        if stream_id is not None and kind == "detections":
+            where.append("stream_id = ?")
+            params.append(stream_id)
+        condition = " AND ".join(where)
+
+        if bucket:
+            group, aggregates = AGGREGATES[kind]
+            sql = (f"SELECT CAST(ts / ? AS INTEGER) * ? AS ts, {group}, {aggregates} FROM {kind} "
+                   f"WHERE {condition} GROUP BY 1, {group} ORDER BY 1 LIMIT ?")
+            params = [bucket, bucket] + params + [limit]
+        else:
+            bucket = None
+            sql = f"SELECT * FROM {kind} WHERE {condition} ORDER BY ts LIMIT ?"
+            params.append(limit)
+
+        rows = [self._row(kind, row) for row in self._reader().execute(sql, params)]
+        return {"kind": kind, "from": start, "to": end, "bucket": bucket, "items": rows,
+                "truncated": len(rows) >= limit}
+
+    def replay(self, at: float, window: float = DEFAULT_REPLAY_WINDOW) -> Dict[str, Any]:
+        """Last known soldier state and detector pass per stream at a point in time."""
+        conn = self._reader()
+        # SQLite returns the row holding MAX(ts) for the bare columns
+        soldiers = conn.execute(
+            "SELECT soldier_id, lat, lon, heart_rate, status, MAX(ts) AS ts FROM telemetry "
+            "WHERE ts > ? AND ts <= ? GROUP BY soldier_id", (at - window, at)
+        )
+        detections = conn.execute(
+            "SELECT d.* FROM detections d JOIN (SELECT stream_id, MAX(ts) AS ts FROM detections "
+            "WHERE ts > ? AND ts <= ? GROUP BY stream_id) latest "
+            "ON d.stream_id = latest.stream_id AND d.ts = latest.ts", (at - window, at)
+        )
+        return {
+            "at": at,
+            "window": window,
+            "soldiers": [self._row("telemetry", row) for row in soldiers],
+            "detections": [self._row("detections", row) for row in detections]
+        }
+
+    @staticmethod
+    def _row(kind: str, row: sqlite3.Row) -> Dict[str, Any]:
+        item = dict(row)
+        if "status" in item and item["status"] is not None:
+            item["status"] = STATUS_NAMES[min(int(item["status"]), len(STATUS_NAMES) - 1)]
+        if kind == "detections" and "x1" in item:
+            item["bbox"] = [item.pop("x1"), item.pop("y1"), item.pop("x2"), item.pop("y2")]
+        if kind == "alerts" and item.get("meta"):
+            item["meta"] = json.loads(item["meta"])
+        return item
+
+
+def _column(values) -> list:
+    """Plain Python values for sqlite3 from a list or numpy array."""
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+# Global history store
+history_store = HistoryStore(
+    path=os.environ.get("HISTORY_PATH", DEFAULT_HISTORY_PATH),
+    enabled=os.environ.get("HISTORY_ENABLED", "1") != "0",
+    retention_days=float(os.environ.get("HISTORY_RETENTION_DAYS", DEFAULT_RETENTION_DAYS)),
+    max_rows=int(os.environ.get("HISTORY_MAX_ROWS", DEFAULT_MAX_ROWS))
+)
@@ -0,0 +1,174 @@
+"""
+In-process publish/subscribe hub for pushing live updates to dashboards.
+Background threads publish state changes; WebSocket and SSE clients receive deltas.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Messages buffered per client before it is considered too slow and resynced
+DEFAULT_CLIENT_QUEUE_SIZE = 256
+
+
+class EventHub:
+    """Fan-out of keyed state deltas to connected clients.
+
+    Messages are JSON objects of the form::
+
+        {"topic": "soldiers", "snapshot": false, "upsert": {id: item}, "remove": [id], "version": n}
+
+    ``publish_state`` (whole topic) and ``update_state`` (some ids) keep the
+    latest items per topic and only broadcast the ids whose value actually
+    changed. ``publish_events`` broadcasts keyed items (e.g. alerts) without
+    retaining them. Each message is serialized once, and only if anyone is
+    connected, and the same string is queued for every subscriber.
+
+    Publishing is thread-safe and messages are handed to the event loop passed
+    to ``bind`` in version order. Listeners added with ``add_listener`` also
+    receive every message (e.g. to relay it to other processes).
+    """
+
+    def __init__(self, client_queue_size: int = DEFAULT_CLIENT_QUEUE_SIZE):
+        self.client_queue_size = client_queue_size
+        self.version = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._listeners: List[Callable[[str, bool], None]] = []
+        self._lock = threading.Lock()
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the event loop that serves subscribers."""
+        self._loop = loop
+
+    def _message(self, topic: str, upsert: Dict[str, Any], remove: List[str], snapshot: bool = False) -> str:
+        return json.dumps({
+            "topic": topic,
+            "snapshot": snapshot,
+            "upsert": upsert,
+            "remove": remove,
+            "version": self.version,
+            "timestamp": time.time()
+        })
+
+    def publish_state(self, topic: str, items: Dict[str, Any]):
+        """Replace the keyed state of a topic and broadcast what changed."""
+        with self._lock:
+            previous = self._state.get(topic, {})
+            upsert = {key: value for key, value in items.items() if previous.get(key) != value}
+            remove = [key for key in previous if key not in items]
+            if not upsert and not remove:
+                return
+            self._state[topic] = dict(items)
+            self.version += 1
+            self._broadcast(topic, upsert, remove, stateful=True)
+
+    def update_state(self, topic: str, upsert: Dict[str, Any], remove: List[str] = ()):
+        """Change some ids of a topic's keyed state and broadcast what changed."""
+        with self._lock:
+            current = self._state.setdefault(topic, {})
+            changed = {key: value for key, value in upsert.items() if current.get(key) != value}
+            removed = [key for key in remove if key in current]
+            if not changed and not removed:
+                return
+            current.update(changed)
+            for key in removed:
+                del current[key]
+            self.version += 1
+            self._broadcast(topic, changed, removed, stateful=True)
+
+    def publish_events(self, topic: str, items: Dict[str, Any]):
+        """Broadcast keyed items that are not kept as state."""
+        if not items:
+            return
+        with self._lock:
+            self.version += 1
+            self._broadcast(topic, items, [], stateful=False)
+
+    def snapshot_messages(self) -> List[str]:
+        """Full state of every topic, sent to new or resyncing clients."""
+        with self._lock:
+            return [self._message(topic, items, [], snapshot=True) for topic, items in self._state.items()]
+
+    def add_listener(self, listener: Callable[[str, bool], None]):
+        """Call ``listener(message, stateful)`` for every message, starting with the current full state.
+
+        ``stateful`` tells state deltas from events. Listeners run with the hub
+        locked, in version order, and must not block.
+        """
+        with self._lock:
+            for topic, items in self._state.items():
+                listener(self._message(topic, items, [], snapshot=True), True)
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, bool], None]):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _deliverable(self) -> bool:
+        loop = self._loop
+        return loop is not None and not loop.is_closed() and bool(self._subscribers)
+
+    @property
+    def has_audience(self) -> bool:
+        """Whether a message published now would reach any subscriber or listener."""
+        return bool(self._listeners) or self._deliverable()
+
+    def _broadcast(self, topic: str, upsert: Dict[str, Any], remove: List[str], stateful: bool):
+        """Serialize a message and schedule delivery on the event loop (called with the lock held)."""
+        deliver = self._deliverable()
+        if not deliver and not self._listeners:
+            return
+        message = self._message(topic, upsert, remove)
+        for listener in self._listeners:
+            listener(message, stateful)
+        if not deliver:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._fan_out, message)
+        except RuntimeError:
+            # Event loop shut down between the check and the call
+            pass
+
+    def _fan_out(self, message: str):
+        """Queue a message for each subscriber (runs on the event loop)."""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Client fell behind; drop its backlog and resend full state
+                self._resync(queue)
+
+    def _resync(self, queue: asyncio.Queue):
+        while not queue.empty():
+            queue.get_nowait()
+        for message in self.snapshot_messages():
+            queue.put_nowait(message)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a client. Its queue starts with the current full state."""
+        queue = asyncio.Queue(maxsize=self.client_queue_size)
+        for message in self.snapshot_messages():
+            queue.put_nowait(message)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Remove a client."""
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+# Global event hub instance
+event_hub = EventHub()
@@ -1,176 +1,788 @@
 """
 Video inference module for threat detection.
 Supports YOLO model with OpenCV motion detection fallback.
+
+Each registered video source gets its own decode thread (``VideoStream``).
+Frames picked for analysis are handed to a bounded pool of detector workers
+(``DetectorPool``) shared by all streams, so detection throughput scales with
+the number of workers instead of being tied to a single feed. Each stream
+picks its detector backend (``app.detectors``) and optionally a region of
+interest and tiling (``app.regions``), tracks its detections across frames
+and raises alerts per track.
 """
 
 import cv2
 import numpy as np
+import os
 import time
+import queue
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import threading
 from pathlib import Path
 
+from app.alerts import detection_alert, publish_alerts
+from app.detectors import Detector, DetectorConfig, LatencyStats, MotionDetector, load_detector
+from app.history import history_store
+from app.hub import event_hub
+from app.metrics import frame_read_seconds
+from app.motion import MotionEngine, MotionProbe
+from app.regions import RegionConfig, RegionPlanner
+from app.snapshot import Snapshot, SnapshotCell
+from app.tracking import SEVERITY_RANK, Tracker
+from app.video_output import DEFAULT_OUTPUT_FPS, FrameBroadcaster
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class VideoInference:
-    def __init__(self, video_path: str = "../sample_videos/demo1.mp4"):
-        self.video_path = video_path
-        self.detections = []
-        self.model = None
-        self.cap = None
+DEFAULT_STREAM_ID = "default"
+DEFAULT_VIDEO_PATH = "../sample_videos/demo1.mp4"
+
+# Frame sampling: analysis rate per stream, and the source rate assumed when
+# the container does not report one
+DEFAULT_TARGET_FPS = 1.0
+DEFAULT_SOURCE_FPS = 30.0
+MAX_SOURCE_FPS = 240.0
+RECONNECT_DELAY = 2.0
+
+# Adaptive rate: after the probe sees motion, keep analyzing at the full
+# target rate for this long (seconds) before dropping back to the idle rate
+DEFAULT_BURST_HOLD = 3.0
+LIVE_SOURCE_PREFIXES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+# Detector workers shared by all streams (each worker owns one model instance
+# per detector configuration in use)
+DEFAULT_NUM_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+
+# Frames from all streams are grouped into batches of up to this size, waiting
+# at most this long (seconds) for a batch to fill
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_BATCH_WAIT = 0.02
+
+CONFIDENCE_THRESHOLD = 0.5
+
+# Watchlist for threat detection: label -> minimum confidence
+DEFAULT_WATCHLIST = {
+    label: CONFIDENCE_THRESHOLD
+    for label in ["person", "car", "truck", "motorbike", "knife", "gun", "vehicle", "intrusion"]
+}
+
+
+class Watchlist:
+    """Labels to report with their per-label confidence thresholds.
+
+    Shared by all detector workers. ``update`` bumps ``version`` and the
+    workers recompile their class lookup table before their next batch, so
+    the watchlist can be reloaded without restarting any threads.
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, float]] = None):
+        self.thresholds = dict(DEFAULT_WATCHLIST if thresholds is None else thresholds)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def update(self, thresholds: Dict[str, float]):
+        """Replace the watchlist."""
+        for label, threshold in thresholds.items():
+            if not 0.0 <= threshold <= 1.0:
+                raise ValueError(f"Threshold for {label} must be between 0 and 1")
+        with self._lock:
+            self.thresholds = dict(thresholds)
+            self.version += 1
+        logger.info(f"Watchlist reloaded (version {self.version}): {sorted(thresholds)}")
+
+    def snapshot(self) -> Tuple[int, Dict[str, float]]:
+        """Get the current version and thresholds."""
+        with self._lock:
+            return self.version, self.thresholds
+
+
+class FrameScheduler:
+    """Picks which decoded frames to analyze against a wall-clock deadline.
+
+    File sources are paced to their native frame rate, so ``tick`` returns the
+    wall-clock time at which each frame is due. Live sources are paced by the
+    device and each frame is due as soon as it is grabbed.
+    """
+
+    def __init__(self, source_fps: float, target_fps: float, realtime: bool = True):
+        self.frame_interval = 1.0 / source_fps
+        self.analysis_interval = 1.0 / target_fps if target_fps > 0 else self.frame_interval
+        self.realtime = realtime
+        self.reset()
+
+    def reset(self):
+        """Restart the clock, e.g. after the video loops."""
+        self.start_time = time.monotonic()
+        self.frame_index = 0
+        self.next_due = self.start_time
+
+    def tick(self) -> Tuple[float, bool]:
+        """Advance by one frame. Returns (frame time, whether to analyze it)."""
+        if self.realtime:
+            frame_time = self.start_time + self.frame_index * self.frame_interval
+        else:
+            frame_time = time.monotonic()
+        self.frame_index += 1
+
+        if frame_time < self.next_due:
+            return frame_time, False
+
+        self.next_due += self.analysis_interval
+        if self.next_due <= frame_time:
+            # Fell behind (slow decode or camera stall), don't burst to catch up
+            self.next_due = frame_time + self.analysis_interval
+        return frame_time, True
+
+
+class AdaptiveRate:
+    """Motion-gated detection rate for one stream.
+
+    Frames due at the stream's full target rate are first checked by a cheap
+    ``MotionProbe``. While the scene is static only one frame per
+    ``1 / idle_fps`` seconds reaches the detector (keep-alive); any motion
+    switches to bursting at the full rate until ``hold_seconds`` pass with
+    no further motion.
+    """
+
+    def __init__(self, idle_fps: float, hold_seconds: float = DEFAULT_BURST_HOLD):
+        if idle_fps <= 0:
+            raise ValueError("idle_fps must be positive")
+        self.idle_fps = idle_fps
+        self.idle_interval = 1.0 / idle_fps
+        self.hold_seconds = hold_seconds
+        self.probe = MotionProbe()
+        self.reset()
+
+    def reset(self):
+        """Forget the probe frame and burst state, e.g. after the video loops."""
+        self.probe.reset()
+        self.last_run = float("-inf")
+        self.burst_until = float("-inf")
+
+    def bursting(self, now: float) -> bool:
+        return now < self.burst_until
+
+    def should_detect(self, frame: np.ndarray, now: float) -> bool:
+        """Probe a due frame and decide whether to run the detector on it."""
+        if self.probe.moved(frame):
+            self.burst_until = now + self.hold_seconds
+        if self.bursting(now) or now - self.last_run >= self.idle_interval:
+            self.last_run = now
+            return True
+        return False
+
+
+class DetectorPool:
+    """Bounded pool of detector workers shared by all video streams.
+
+    Jobs are queued with ``submit``; when the queue is full the frame is
+    dropped rather than blocking the submitting decode thread. Each worker
+    takes up to ``max_batch_size`` pending frames (from any stream), waiting
+    at most ``max_batch_wait`` seconds to fill the batch. Frames in a batch
+    are grouped by their stream's ``DetectorConfig``; each worker loads one
+    detector per configuration, and latency is tracked per configuration
+    across all workers. Streams with an ROI or tiling contribute one crop
+    per tile, so tiles from all streams share the same batches.
+
+    Models are loaded by the workers themselves, never on the caller's
+    thread: ``register`` announces a configuration and every worker loads
+    and warms it up before taking more frames. ``ready`` reports whether all
+    workers have finished; ``readiness`` also reports the backend that
+    actually loaded, and marks a configuration ``degraded`` when a worker
+    fell back to motion detection.
+    """
+
+    def __init__(self, num_workers: int = DEFAULT_NUM_WORKERS, max_pending: Optional[int] = None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_batch_wait: float = DEFAULT_MAX_BATCH_WAIT,
+                 watchlist: Optional[Watchlist] = None):
+        self.num_workers = max(1, num_workers)
+        self.watchlist = watchlist or Watchlist()
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_wait = max_batch_wait
+        self.jobs = queue.Queue(maxsize=max_pending or self.num_workers * self.max_batch_size * 2)
         self.running = False
-        self.thread = None
-        
-        # Watchlist for threat detection
-        self.watchlist = ["person", "car", "truck", "motorbike", "knife", "gun", "vehicle", "intrusion"]
-        
-        # Initialize model (YOLO or fallback)
-        self._initialize_model()
-        
-    def _initialize_model(self):
-        """Initialize YOLO model or set up OpenCV fallback."""
+        self.threads: List[threading.Thread] = []
+        self.latency: Dict[DetectorConfig, LatencyStats] = {}
+
+        # Registered configurations -> number of workers that have loaded them,
+        # and how many of those fell back to motion detection
+        self._loaded: Dict[DetectorConfig, int] = {}
+        self._fallbacks: Dict[DetectorConfig, int] = {}
+        self._config_lock = threading.Lock()
+
+    def submit(self, stream: "VideoStream", frame) -> bool:
+        """Queue a frame for detection. Returns False if it was dropped."""
         try:
-            from ultralytics import YOLO
-            self.model = YOLO("yolov8n.pt")
-            logger.info("YOLO model loaded successfully")
-        except ImportError:
-            logger.warning("Ultralytics not available, using OpenCV motion detection fallback")
-            self.model = "opencv_fallback"
-        except Exception as e:
-            logger.warning(f"YOLO model failed to load: {e}, using OpenCV fallback")
-            self.model = "opencv_fallback"
-    
-    def _yolo_detect(self, frame) -> List[Dict[str, Any]]:
-        """Run YOLO inference on frame."""
+            self.jobs.put_nowait((stream, frame))
+            return True
+        except queue.Full:
+            return False
+
+    def _next_batch(self, max_wait: float) -> List[Tuple["VideoStream", np.ndarray]]:
+        """Collect pending jobs until the batch is full or max_wait elapses."""
         try:
-            results = self.model(frame, verbose=False)
-            detections = []
-            
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get box coordinates and confidence
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = box.conf[0].cpu().numpy()
-                        class_id = int(box.cls[0].cpu().numpy())
-                        
-                        # Get class name
-                        class_name = self.model.names[class_id]
-                        
-                        # Only include watchlist items with confidence >= 0.5
-                        if class_name in self.watchlist and confidence >= 0.5:
-                            detection = {
-                                "label": class_name,
-                                "confidence": float(confidence),
-                                "bbox": [float(x1), float(y1), float(x2), float(y2)],
-                                "timestamp": time.time()
-                            }
-                            detections.append(detection)
-            
-            return detections
-        except Exception as e:
-            logger.error(f"YOLO detection error: {e}")
+            batch = [self.jobs.get(timeout=0.5)]
+        except queue.Empty:
             return []
-    
-    def _opencv_detect(self, frame, prev_frame) -> List[Dict[str, Any]]:
-        """OpenCV motion detection fallback."""
-        try:
-            if prev_frame is None:
-                return []
-            
-            # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-            
-            # Calculate frame difference
-            diff = cv2.absdiff(gray, prev_gray)
-            _, thresh = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
-            
-            # Find contours
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            detections = []
-            for contour in contours:
-                area = cv2.contourArea(contour)
-                if area > 1000:  # Minimum area threshold
-                    x, y, w, h = cv2.boundingRect(contour)
-                    detection = {
-                        "label": "intrusion",
-                        "confidence": 0.7,  # Fixed confidence for motion detection
-                        "bbox": [float(x), float(y), float(x + w), float(y + h)],
-                        "timestamp": time.time()
-                    }
-                    detections.append(detection)
-            
-            return detections
-        except Exception as e:
-            logger.error(f"OpenCV detection error: {e}")
-            return []
-    
+
+        deadline = time.monotonic() + max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.jobs.get(timeout=remaining))
+                else:
+                    batch.append(self.jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def register(self, config: DetectorConfig):
+        """Have every worker load and warm up a detector configuration in the background."""
+        with self._config_lock:
+            self._loaded.setdefault(config, 0)
+
+    @property
+    def ready(self) -> bool:
+        """Whether every worker has loaded every registered configuration."""
+        with self._config_lock:
+            return self.running and all(count >= self.num_workers for count in self._loaded.values())
+
+    def loaded_backend(self, config: DetectorConfig) -> Optional[str]:
+        """Backend actually running a configuration (None until a worker has loaded it)."""
+        with self._config_lock:
+            if not self._loaded.get(config):
+                return None
+            return MotionDetector.name if self._fallbacks.get(config) else config.backend
+
+    def readiness(self) -> Dict[str, Dict[str, Any]]:
+        """Load state and loaded backend per registered configuration."""
+        with self._config_lock:
+            loaded = dict(self._loaded)
+            fallbacks = dict(self._fallbacks)
+        readiness = {}
+        for config, count in loaded.items():
+            if fallbacks.get(config):
+                state = "degraded"
+            elif count >= self.num_workers:
+                state = "ready"
+            else:
+                state = "warming"
+            readiness[config.key] = {
+                "state": state,
+                "requested": config.backend,
+                "backend": (MotionDetector.name if fallbacks.get(config) else config.backend) if count else None,
+                "workers": f"{count}/{self.num_workers}"
+            }
+        return readiness
+
+    @property
+    def degraded(self) -> bool:
+        """Whether any configuration is running on the motion fallback instead of its backend."""
+        with self._config_lock:
+            return any(self._fallbacks.values())
+
+    def _load(self, detectors: Dict[DetectorConfig, Detector], config: DetectorConfig) -> Detector:
+        """Load a configuration into a worker's own detector set."""
+        with self._config_lock:
+            latency = self.latency.setdefault(config, LatencyStats())
+        detector = detectors[config] = load_detector(config, self.watchlist, latency)
+        with self._config_lock:
+            if config in self._loaded:
+                self._loaded[config] += 1
+                if detector.name != config.backend:
+                    self._fallbacks[config] = self._fallbacks.get(config, 0) + 1
+        return detector
+
+    def _worker_loop(self):
+        """Pull batches of frames from the queue and run detection on them."""
+        detectors: Dict[DetectorConfig, Detector] = {}
+        max_wait = 0.0
+        while self.running:
+            # Warm up newly registered configurations before taking more frames
+            with self._config_lock:
+                missing = [config for config in self._loaded if config not in detectors]
+            for config in missing:
+                if not self.running:
+                    break
+                self._load(detectors, config)
+            if any(detector.supports_batching for detector in detectors.values()):
+                max_wait = self.max_batch_wait
+
+            batch = self._next_batch(max_wait)
+            if not batch:
+                continue
+
+            groups: Dict[DetectorConfig, List[Tuple["VideoStream", np.ndarray]]] = {}
+            for job in batch:
+                groups.setdefault(job[0].detector_config, []).append(job)
+
+            for config, jobs in groups.items():
+                streams = [job[0] for job in jobs]
+                try:
+                    detector = detectors.get(config) or self._load(detectors, config)
+                    for (stream, frame), detections in zip(jobs, self._detect_jobs(detector, jobs)):
+                        stream._publish(detections, frame)
+                except Exception as e:
+                    logger.error(f"Detector worker error on streams {[s.stream_id for s in streams]}: {e}")
+                finally:
+                    for stream in streams:
+                        stream._pending.clear()
+                        self.jobs.task_done()
+
+    def _detect_jobs(self, detector: Detector,
+                     jobs: List[Tuple["VideoStream", np.ndarray]]) -> List[List[Dict[str, Any]]]:
+        """Run one detector call over a group of jobs, slicing frames into ROI crops and tiles where configured."""
+        images, engines, plans = [], [], []
+        for stream, frame in jobs:
+            planner = stream.regions
+            if not planner.config.active:
+                plans.append((planner, None))
+                images.append(frame)
+                engines.append(stream.motion)
+                continue
+            if detector.name == MotionDetector.name:
+                # The motion backend needs whole frames to keep its background model
+                crops = planner.plan(frame, tiled=False)
+            else:
+                motion_boxes = stream.motion.detect(frame) if planner.config.motion_gated else None
+                crops = planner.plan(frame, motion_boxes)
+            plans.append((planner, crops))
+            images.extend(frame[y1:y2, x1:x2] for x1, y1, x2, y2 in crops)
+            engines.extend([stream.motion] * len(crops))
+
+        results = detector.detect_batch(images, engines) if images else []
+        detections, index = [], 0
+        for planner, crops in plans:
+            if crops is None:
+                detections.append(results[index])
+                index += 1
+            else:
+                detections.append(planner.merge(crops, results[index:index + len(crops)]))
+                index += len(crops)
+        return detections
+
+    def detector_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Latency stats per detector configuration."""
+        with self._config_lock:
+            latency = dict(self.latency)
+        return {config.key: stats.snapshot() for config, stats in latency.items()}
+
+    def start(self):
+        """Start the detector workers."""
+        if not self.running:
+            self.running = True
+            self.threads = [
+                threading.Thread(target=self._worker_loop, name=f"detector-{i}", daemon=True)
+                for i in range(self.num_workers)
+            ]
+            for thread in self.threads:
+                thread.start()
+            logger.info(f"Detector pool started with {self.num_workers} workers")
+
+    def stop(self):
+        """Stop the detector workers."""
+        self.running = False
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        logger.info("Detector pool stopped")
+
+
+class VideoStream:
+    """A single video source with its own decode thread."""
+
+    def __init__(self, stream_id: str, source: str, pool: DetectorPool, loop: bool = True,
+                 target_fps: float = DEFAULT_TARGET_FPS, detector_config: Optional[DetectorConfig] = None,
+                 region_config: Optional[RegionConfig] = None, idle_fps: Optional[float] = None):
+        self.stream_id = stream_id
+        self.source = source
+        self.pool = pool
+        self.detector_config = detector_config or DetectorConfig()
+        self.regions = RegionPlanner(region_config)
+        self.loop = loop
+        self.target_fps = target_fps
+        self.adaptive = AdaptiveRate(idle_fps) if idle_fps else None
+        self.live = str(source).isdigit() or str(source).startswith(LIVE_SOURCE_PREFIXES)
+        self.source_fps = None
+        self.state = SnapshotCell()
+        self.motion = MotionEngine()
+        self.tracker = Tracker()
+        self.output = FrameBroadcaster(stream_id)
+        self.output_fps = DEFAULT_OUTPUT_FPS
+        self.cap = None
+        self.running = False
+        self.thread = None
+        self.frames_read = 0
+        self.frames_analyzed = 0
+        self.frames_dropped = 0
+        self.frames_idle = 0
+        self.last_detection_time = None
+
+        # Set while a frame from this stream is queued or being analyzed, so a
+        # slow detector never builds up a backlog of stale frames for one feed.
+        self._pending = threading.Event()
+        self._stop_event = threading.Event()
+        self._track_lock = threading.Lock()
+
+    def _publish(self, detections: List[Dict[str, Any]], frame: Optional[np.ndarray] = None):
+        """Track detections produced by a pool worker and raise alerts for new or escalated tracks.
+
+        ``frame`` is the analyzed frame; it is shown to video viewers with exactly these results drawn on it.
+        """
+        self.frames_analyzed += 1
+        now = time.time()
+        with self._track_lock:
+            tracks, updated = self.tracker.update(detections, now)
+            tracked = [track.to_detection(now if track.misses else None) for track in tracks]
+
+            # Alert stage: a track alerts when it starts and again only if its severity rises
+            alerts = []
+            observed = []
+            for track in updated:
+                detection = track.to_detection()
+                observed.append(detection)
+                alert = detection_alert(detection)
+                if alert is None or SEVERITY_RANK[alert["severity"]] <= SEVERITY_RANK.get(track.alerted_severity, 0):
+                    continue
+                if track.alerted_severity is not None:
+                    alert["message"] = alert["message"].replace("Threat detected", "Threat escalated", 1)
+                alert["meta"]["stream_id"] = self.stream_id
+                alert["meta"]["track_id"] = track.track_id
+                alert["meta"]["event"] = "escalation" if track.alerted_severity else "track_start"
+                track.alerted_severity = alert["severity"]
+                alerts.append(alert)
+
+        if detections:
+            self.last_detection_time = now
+            logger.info(f"[{self.stream_id}] Detected {len(detections)} threats, {len(tracks)} tracks")
+        if tracked or self.detections:
+            self._set_detections(tracked)
+        if frame is not None:
+            self.output.submit(frame, tracked)
+        history_store.record_detections(self.stream_id, observed, now)
+        publish_alerts(alerts)
+
+    def _propagate(self):
+        """Move live tracks along their predicted paths without running the detector."""
+        with self._track_lock:
+            if not self.tracker.tracks:
+                return
+            predicted = self.tracker.predict(time.time())
+        self._set_detections(predicted)
+
+    def _show(self):
+        """Decode the grabbed frame and send it to video viewers with the predicted tracks."""
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return
+        with self._track_lock:
+            predicted = self.tracker.predict(time.time())
+        self.output.submit(frame, predicted)
+
+    @property
+    def detections(self) -> Tuple[Dict[str, Any], ...]:
+        """Current detections (immutable snapshot, safe to read from any thread)."""
+        return self.state.current.items
+
+    @property
+    def version(self) -> int:
+        return self.state.version
+
+    def _set_detections(self, detections: List[Dict[str, Any]]):
+        """Swap in a new detections snapshot and push it to live clients."""
+        self.state.publish(detections)
+        event_hub.update_state("detections", {self.stream_id: detections})
+
+    def set_regions(self, config: RegionConfig):
+        """Replace the ROI and tiling settings; takes effect from the next analyzed frame."""
+        self.regions = RegionPlanner(config)
+        logger.info(f"[{self.stream_id}] Regions updated: {config.to_dict()}")
+
+    def _open_capture(self):
+        """Open the video source (camera index, file path or stream URL)."""
+        source = int(self.source) if str(self.source).isdigit() else self.source
+        return cv2.VideoCapture(source)
+
     def _inference_loop(self):
-        """Main inference loop running in background thread."""
+        """Decode loop running in background thread.
+
+        Every frame is grabbed to keep the decoder position in step with the
+        clock, but only frames picked by the scheduler are retrieved
+        (decoded) and submitted to the detector pool. With an adaptive rate,
+        decoded frames that the motion probe finds static are skipped until
+        the keep-alive interval is due.
+
+        While the annotated video output has viewers, frames between detector
+        passes are also decoded at ``output_fps`` and shown with the tracks'
+        predicted boxes.
+        """
         try:
-            self.cap = cv2.VideoCapture(self.video_path)
+            self.cap = self._open_capture()
             if not self.cap.isOpened():
-                logger.error(f"Could not open video: {self.video_path}")
+                logger.error(f"Could not open video: {self.source}")
                 return
-            
-            prev_frame = None
-            frame_count = 0
-            
+
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if not fps or fps <= 0 or fps > MAX_SOURCE_FPS:
+                fps = DEFAULT_SOURCE_FPS
+            self.source_fps = fps
+            scheduler = FrameScheduler(fps, self.target_fps, realtime=not self.live)
+            output_interval = 1.0 / self.output_fps
+            next_output = 0.0
+
             while self.running:
-                ret, frame = self.cap.read()
+                if not self.cap.grab():
+                    if self.live:
+                        # Camera dropped out, reconnect after a short pause
+                        logger.warning(f"[{self.stream_id}] Lost video source, reconnecting")
+                        self.cap.release()
+                        if self._stop_event.wait(RECONNECT_DELAY):
+                            break
+                        self.cap = self._open_capture()
+                    elif self.loop:
+                        # Loop video
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    else:
+                        break
+                    scheduler.reset()
+                    next_output = 0.0
+                    self.motion.reset()
+                    if self.adaptive:
+                        self.adaptive.reset()
+                    with self._track_lock:
+                        self.tracker.reset()
+                    continue
+                self.frames_read += 1
+
+                frame_time, analyze = scheduler.tick()
+                if not analyze:
+                    # Skip while a detector result is pending so its frame isn't shown out of order
+                    if self.output.watched and frame_time >= next_output and not self._pending.is_set():
+                        next_output = frame_time + output_interval
+                        delay = frame_time - time.monotonic()
+                        if delay > 0 and self._stop_event.wait(delay):
+                            break
+                        self._show()
+                    continue
+
+                # Hold file playback to the frame's wall-clock deadline
+                delay = frame_time - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+
+                if self._pending.is_set():
+                    # Previous frame from this stream still in flight, skip decoding
+                    # and keep the tracks moving on their predictions instead
+                    self.frames_dropped += 1
+                    self._propagate()
+                    continue
+
+                with frame_read_seconds.time(self.stream_id):
+                    ret, frame = self.cap.retrieve()
                 if not ret:
-                    # Loop video
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    prev_frame = None
                     continue
-                
-                # Process at 1 FPS
-                if frame_count % 30 == 0:  # Assuming 30 FPS video
-                    if self.model == "opencv_fallback":
-                        detections = self._opencv_detect(frame, prev_frame)
-                    else:
-                        detections = self._yolo_detect(frame)
-                    
-                    if detections:
-                        self.detections = detections
-                        logger.info(f"Detected {len(detections)} threats")
-                
-                prev_frame = frame.copy()
-                frame_count += 1
-                
-                # Sleep to maintain 1 FPS processing
-                time.sleep(1.0)
-                
+
+                if self.adaptive and not self.adaptive.should_detect(frame, time.monotonic()):
+                    self.frames_idle += 1
+                    self._propagate()
+                    continue
+
+                self._pending.set()
+                if not self.pool.submit(self, frame):
+                    self._pending.clear()
+                    self.frames_dropped += 1
+
         except Exception as e:
-            logger.error(f"Inference loop error: {e}")
+            logger.error(f"[{self.stream_id}] Inference loop error: {e}")
         finally:
+            self.running = False
             if self.cap:
                 self.cap.release()
-    
+
     def start(self):
-        """Start the inference loop."""
+        """Start the decode loop."""
         if not self.running:
             self.running = True
-            self.thread = threading.Thread(target=self._inference_loop, daemon=True)
+            self._stop_event.clear()
+            self.thread = threading.Thread(
+                target=self._inference_loop, name=f"stream-{self.stream_id}", daemon=True
+            )
             self.thread.start()
-            logger.info("Inference loop started")
-    
+            logger.info(f"Stream {self.stream_id} started ({self.source})")
+
     def stop(self):
-        """Stop the inference loop."""
+        """Stop the decode loop."""
         self.running = False
+        self._stop_event.set()
         if self.thread:
             self.thread.join()
-        logger.info("Inference loop stopped")
-    
-    def get_detections(self) -> List[Dict[str, Any]]:
+        logger.info(f"Stream {self.stream_id} stopped")
+
+    def get_detections(self) -> Tuple[Dict[str, Any], ...]:
         """Get latest detections."""
-        return self.detections.copy()
+        return self.detections
+
+    def _mode(self) -> str:
+        """Detection cadence: fixed, or idle / burst when the rate is adaptive."""
+        if self.adaptive is None:
+            return "fixed"
+        return "burst" if self.adaptive.bursting(time.monotonic()) else "idle"
+
+    def info(self) -> Dict[str, Any]:
+        """Get stream status and counters."""
+        backend = self.pool.loaded_backend(self.detector_config)
+        return {
+            "id": self.stream_id,
+            "source": self.source,
+            "running": self.running,
+            "live": self.live,
+            "source_fps": self.source_fps,
+            "target_fps": self.target_fps,
+            "idle_fps": self.adaptive.idle_fps if self.adaptive else None,
+            "mode": self._mode(),
+            "detector": self.detector_config.key,
+            "backend": backend,
+            "degraded": backend is not None and backend != self.detector_config.backend,
+            "regions": self.regions.config.to_dict(),
+            "frames_read": self.frames_read,
+            "frames_analyzed": self.frames_analyzed,
+            "frames_dropped": self.frames_dropped,
+            "frames_idle": self.frames_idle,
+            "detections": len(self.detections),
+            "tracks": len(self.tracker.tracks),
+            "output": self.output.stats(),
+            "last_detection_time": self.last_detection_time
+        }
+
+
+class StreamManager:
+    """Registry of video streams sharing one detector pool."""
+
+    def __init__(self, num_workers: int = DEFAULT_NUM_WORKERS, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_batch_wait: float = DEFAULT_MAX_BATCH_WAIT):
+        self.watchlist = Watchlist()
+        self.pool = DetectorPool(num_workers, max_batch_size=max_batch_size, max_batch_wait=max_batch_wait,
+                                 watchlist=self.watchlist)
+        self.streams: Dict[str, VideoStream] = {}
+        self.running = False
+        self._registry_version = 0
+        self._aggregate = Snapshot("", ())
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any stream's detections or the set of streams change."""
+        with self._lock:
+            streams = list(self.streams.values())
+            registry_version = self._registry_version
+        return f"{registry_version}.{sum(stream.version for stream in streams)}"
+
+    @property
+    def ready(self) -> bool:
+        """Whether the detector models for all registered streams are loaded."""
+        return self.running and self.pool.ready
+
+    def add_stream(self, stream_id: str, source: str, loop: bool = True,
+                   target_fps: float = DEFAULT_TARGET_FPS,
+                   detector_config: Optional[DetectorConfig] = None,
+                   region_config: Optional[RegionConfig] = None,
+                   idle_fps: Optional[float] = None) -> VideoStream:
+        """Register a video source. Starts it immediately if the manager is running.
+
+        The stream's detector is loaded in the background by the pool workers.
+        With ``idle_fps`` the detection rate adapts to motion: ``idle_fps``
+        while the scene is static, bursting up to ``target_fps`` on motion.
+        """
+        if target_fps <= 0:
+            raise ValueError("target_fps must be positive")
+        if idle_fps is not None and not 0 < idle_fps <= target_fps:
+            raise ValueError("idle_fps must be positive and at most target_fps")
+        with self._lock:
+            if stream_id in self.streams:
+                raise ValueError(f"Stream {stream_id} already registered")
+            stream = VideoStream(stream_id, source, self.pool, loop=loop, target_fps=target_fps,
+                                 detector_config=detector_config, region_config=region_config,
+                                 idle_fps=idle_fps)
+            self.streams[stream_id] = stream
+            self._registry_version += 1
+        self.pool.register(stream.detector_config)
+        if self.running:
+            stream.start()
+        return stream
+
+    def remove_stream(self, stream_id: str) -> bool:
+        """Stop and unregister a video source."""
+        with self._lock:
+            stream = self.streams.pop(stream_id, None)
+            self._registry_version += 1
+        if stream is None:
+            return False
+        stream.stop()
+        event_hub.update_state("detections", {}, [stream_id])
+        return True
+
+    def list_streams(self) -> List[Dict[str, Any]]:
+        """Get status for all registered streams."""
+        with self._lock:
+            streams = list(self.streams.values())
+        return [stream.info() for stream in streams]
+
+    def start(self):
+        """Start the detector pool and all registered streams."""
+        if not self.running:
+            self.running = True
+            self.pool.start()
+            with self._lock:
+                streams = list(self.streams.values())
+            for stream in streams:
+                stream.start()
+            logger.info("Inference loop started")
+
+    def stop(self):
+        """Stop all streams and the detector pool."""
+        self.running = False
+        with self._lock:
+            streams = list(self.streams.values())
+        for stream in streams:
+            stream.stop()
+        self.pool.stop()
+        logger.info("Inference loop stopped")
+
+    def snapshot(self, stream_id: Optional[str] = None) -> Snapshot:
+        """Current detections snapshot for one stream, or for all streams when no id is given.
+
+        The all-streams snapshot tags each detection with its stream_id and is
+        rebuilt only when some stream publishes. Raises KeyError for an
+        unknown stream id.
+        """
+        if stream_id is not None:
+            return self.streams[stream_id].state.current
+
+        version = self.version
+        aggregate = self._aggregate
+        if aggregate.version == version:
+            return aggregate
+
+        with self._lock:
+            snapshots = [(stream.stream_id, stream.state.current) for stream in self.streams.values()]
+        aggregate = Snapshot(version, build=lambda: [
+            {**detection, "stream_id": stream_id}
+            for stream_id, snapshot in snapshots
+            for detection in snapshot.items
+        ])
+        self._aggregate = aggregate
+        return aggregate
+
+    def get_detections(self, stream_id: Optional[str] = None) -> Tuple[Dict[str, Any], ...]:
+        """Get latest detections for one stream, or for all streams when no id is given.
+
+        Raises KeyError for an unknown stream id.
+        """
+        return self.snapshot(stream_id).items
 
 # Global inference instance
-inference_engine = VideoInference()
+inference_engine = StreamManager()
+inference_engine.add_stream(DEFAULT_STREAM_ID, DEFAULT_VIDEO_PATH)
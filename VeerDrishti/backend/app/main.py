@@ -2,16 +2,31 @@
 FastAPI main application for VeerDrishti threat detection and soldier monitoring.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
+import asyncio
 import logging
+import os
+import re
 import time
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.alerts import alert_store
+from app.broker import (DEFAULT_BROKER_ADDRESS, DEFAULT_ENGINE_URL, ROLE, EngineProxyMiddleware, StatePublisher,
+                        StateReplica)
+from app.detectors import BACKENDS, DetectorConfig
+from app.history import DEFAULT_QUERY_LIMIT, DEFAULT_REPLAY_WINDOW, history_store
+from app.hub import event_hub
+from app.regions import DEFAULT_TILE_OVERLAP, RegionConfig
+from app.snapshot import Snapshot
 from app.inference import inference_engine
+from app.metrics import RouteMetricsMiddleware, http_request_seconds, metrics
 from app.soldier_data import soldier_monitor
+from app.telemetry import telemetry_ingestor, start_udp_listener, parse_ndjson, parse_msgpack
+from app.video_output import DEFAULT_TIER, MJPEG_MEDIA_TYPE, TIERS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +48,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histogram for /metrics
+app.add_middleware(RouteMetricsMiddleware, histogram=http_request_seconds, registry=metrics)
+
+# Routes an API worker serves from its state replica (and its own /metrics);
+# everything else goes to the engine, including /metrics/engine
+LOCAL_PATHS = {"/", "/api/detections", "/api/soldiers", "/api/alerts", "/api/events", "/ws/stream", "/health",
+               "/ready", "/metrics"}
+LOCAL_PATTERN = re.compile(r"^/api/(history(/replay)?|streams/[^/]+/detections)$")
+
+def served_locally(path: str) -> bool:
+    return path in LOCAL_PATHS or LOCAL_PATTERN.match(path) is not None
+
+# Process role (see app.broker): API workers follow the engine's state and forward the rest
+replica = StateReplica(os.environ.get("BROKER_ADDRESS", DEFAULT_BROKER_ADDRESS)) if ROLE == "api" else None
+if ROLE == "api":
+    app.add_middleware(EngineProxyMiddleware, is_local=served_locally,
+                       engine_url=os.environ.get("ENGINE_URL", DEFAULT_ENGINE_URL))
+
 # Pydantic models
 class SimulationRequest(BaseModel):
     id: str
@@ -49,21 +82,192 @@ class AlertResponse(BaseModel):
     alerts: List[Dict[str, Any]]
     timestamp: float
 
-# Global variables for tracking alerts
-last_high_alert_time = 0
-alert_history = []
+class StreamRequest(BaseModel):
+    id: str
+    source: str
+    loop: bool = True
+    target_fps: float = 1.0
+    idle_fps: Optional[float] = None
+    backend: Optional[str] = None
+    model_path: Optional[str] = None
+    input_size: Optional[int] = None
+    precision: Optional[str] = None
+    roi: Optional[List[List[List[float]]]] = None
+    tile_size: Optional[int] = None
+    tile_overlap: float = DEFAULT_TILE_OVERLAP
+    full_frame: bool = True
+    motion_gated: bool = False
+
+class RegionsRequest(BaseModel):
+    roi: Optional[List[List[List[float]]]] = None
+    tile_size: Optional[int] = None
+    tile_overlap: float = DEFAULT_TILE_OVERLAP
+    full_frame: bool = True
+    motion_gated: bool = False
+
+class WatchlistRequest(BaseModel):
+    thresholds: Dict[str, float]
+
+class StreamResponse(BaseModel):
+    streams: List[Dict[str, Any]]
+    timestamp: float
+
+class MetricsToggleRequest(BaseModel):
+    enabled: bool
+
+def _stream_frame_counts() -> Dict[Tuple[str, str], float]:
+    counts = {}
+    for stream in list(inference_engine.streams.values()):
+        counts[(stream.stream_id, "read")] = stream.frames_read
+        counts[(stream.stream_id, "analyzed")] = stream.frames_analyzed
+        counts[(stream.stream_id, "dropped")] = stream.frames_dropped
+        counts[(stream.stream_id, "idle")] = stream.frames_idle
+    return counts
+
+# Values owned by the services are read only when /metrics is scraped. API
+# workers never run the pipelines, so they only report their own routes and clients
+if ROLE != "api":
+    metrics.counter_callback("frames_total", "Video frames by stream and outcome", _stream_frame_counts,
+                             ["stream", "outcome"])
+    metrics.gauge_callback("detector_queue_depth", "Frames waiting for a detector worker",
+                           lambda: inference_engine.pool.jobs.qsize())
+    metrics.gauge_callback("soldiers", "Soldiers tracked", lambda: len(soldier_monitor))
+    metrics.gauge_callback("telemetry_pending", "Telemetry readings waiting to be applied",
+                           lambda: len(telemetry_ingestor._pending))
+    metrics.counter_callback("telemetry_dropped_total", "Telemetry readings dropped by backpressure",
+                             lambda: telemetry_ingestor.dropped)
+    metrics.gauge_callback("alerts_stored", "Alerts in the alert store", lambda: len(alert_store))
+    metrics.gauge_callback("history_pending", "History rows waiting to be written",
+                           lambda: history_store._pending_rows)
+    metrics.counter_callback("history_dropped_total", "History rows dropped by backpressure",
+                             lambda: history_store.dropped)
+    metrics.gauge_callback(
+        "video_viewers", "Annotated video viewers by stream and tier",
+        lambda: {(stream.stream_id, tier): count for stream in list(inference_engine.streams.values())
+                 for tier, count in stream.output.viewers.items()},
+        ["stream", "tier"]
+    )
+    metrics.counter_callback(
+        "video_frames_encoded_total", "Annotated video frames encoded (once per tier, shared by viewers)",
+        lambda: {(stream.stream_id,): stream.output.encoded for stream in list(inference_engine.streams.values())},
+        ["stream"]
+    )
+
+metrics.gauge_callback("push_clients", "Connected WebSocket/SSE clients", lambda: event_hub.subscriber_count)
+
+# UDP telemetry listener, opened on startup
+udp_transport = None
+
+# Alerts in the store's window, rebuilt only when the store changes
+alerts_cache = Snapshot(-1, ())
+
+def alerts_snapshot() -> Snapshot:
+    """Current alerts (newest first) as a snapshot versioned by the alert store."""
+    global alerts_cache
+    # Alerts are raised by the pipelines; drop those older than the store's
+    # window (older alerts are served by /api/history?kind=alerts)
+    alert_store.expire()
+    version = alert_store.version
+    if alerts_cache.version != version:
+        alerts_cache = Snapshot(version, alert_store.since(time.time() - alert_store.window))
+    return alerts_cache
+
+def published_snapshots() -> Dict[str, Snapshot]:
+    """Every snapshot API workers serve, by key."""
+    snapshots = {
+        "detections:*": inference_engine.snapshot(),
+        "soldiers": soldier_monitor.snapshot,
+        "alerts": alerts_snapshot()
+    }
+    for stream_id, stream in list(inference_engine.streams.items()):
+        snapshots[f"detections:{stream_id}"] = stream.state.current
+    return snapshots
+
+def engine_health() -> Dict[str, Any]:
+    return {
+        "inference": "running" if inference_engine.running else "stopped",
+        "streams": len(inference_engine.streams),
+        "soldier_monitor": "running" if soldier_monitor.running else "stopped"
+    }
+
+def engine_readiness() -> Dict[str, Any]:
+    services = {
+        "inference": inference_engine.ready,
+        "soldier_monitor": soldier_monitor.running,
+        "telemetry": telemetry_ingestor.running
+    }
+    return {
+        "ready": all(services.values()),
+        "degraded": inference_engine.pool.degraded,
+        "services": services,
+        "detectors": inference_engine.pool.readiness(),
+        "health": engine_health()
+    }
+
+publisher = StatePublisher(published_snapshots, engine_readiness,
+                           os.environ.get("BROKER_ADDRESS", DEFAULT_BROKER_ADDRESS)) if ROLE == "engine" else None
+
+def current_snapshot(key: str) -> Snapshot:
+    """A published snapshot from this process or, on API workers, from the engine. Raises KeyError."""
+    if replica is not None:
+        try:
+            return replica.snapshot(key)
+        except KeyError:
+            if key.startswith("detections:") and key != "detections:*":
+                raise
+            # Not synced with the engine yet
+            return Snapshot(0, ())
+    if key == "soldiers":
+        return soldier_monitor.snapshot
+    if key == "alerts":
+        return alerts_snapshot()
+    stream_id = key.split(":", 1)[1]
+    return inference_engine.snapshot(None if stream_id == "*" else stream_id)
+
+def snapshot_response(request: Request, cache_key: str, snapshot: Snapshot, field: str) -> Response:
+    """Serve a state snapshot using its cached serialized body.
+
+    Clients sending the current ETag in If-None-Match get a 304.
+    """
+    etag = f'"{cache_key}-{snapshot.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=snapshot.body(field), media_type="application/json", headers={"ETag": etag})
 
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on application startup."""
     logger.info("Starting VeerDrishti backend services...")
     
-    # Start inference engine
+    # Deliver hub messages on the server's event loop
+    event_hub.bind(asyncio.get_running_loop())
+    
+    if replica is not None:
+        # API worker: follow the engine's state, query history read-only
+        history_store.start(record=False)
+        replica.start()
+        logger.info("API worker following the engine")
+        return
+    
+    # Start the history writer before the pipelines that feed it
+    history_store.start()
+    
+    # Start inference engine; detector models load and warm up in the
+    # background, see /ready
     inference_engine.start()
     
     # Start soldier monitoring
     soldier_monitor.start()
     
+    # Start telemetry ingestion (HTTP batches and UDP)
+    global udp_transport
+    telemetry_ingestor.start()
+    udp_transport = await start_udp_listener(telemetry_ingestor)
+    
+    # Publish state to API workers
+    if publisher is not None:
+        publisher.start()
+    
     logger.info("All services started successfully")
 
 @app.on_event("shutdown")
@@ -71,12 +275,28 @@ async def shutdown_event():
     """Stop background tasks on application shutdown."""
     logger.info("Stopping VeerDrishti backend services...")
     
+    if replica is not None:
+        replica.stop()
+        history_store.stop()
+        return
+    
+    if publisher is not None:
+        publisher.stop()
+    
     # Stop inference engine
     inference_engine.stop()
     
     # Stop soldier monitoring
     soldier_monitor.stop()
     
+    # Stop telemetry ingestion
+    if udp_transport is not None:
+        udp_transport.close()
+    telemetry_ingestor.stop()
+    
+    # Write out buffered history last
+    history_store.stop()
+    
     logger.info("All services stopped")
 
 @app.get("/")
@@ -85,63 +305,175 @@ async def root():
     return {
         "message": "VeerDrishti API",
         "version": "1.0.0",
+        "role": ROLE,
         "endpoints": {
             "detections": "/api/detections",
             "soldiers": "/api/soldiers",
             "simulate_emergency": "/api/soldiers/simulate",
-            "alerts": "/api/alerts"
+            "alerts": "/api/alerts",
+            "telemetry": "/api/telemetry",
+            "history": "/api/history",
+            "streams": "/api/streams",
+            "detectors": "/api/detectors",
+            "health": "/health",
+            "ready": "/ready",
+            "metrics": "/metrics",
+            "engine_metrics": "/metrics/engine",
+            "websocket": "/ws/stream",
+            "events": "/api/events"
         }
     }
 
 @app.get("/api/detections", response_model=DetectionResponse)
-async def get_detections():
-    """Get latest threat detections from video analysis."""
+async def get_detections(request: Request, stream_id: Optional[str] = None):
+    """Get latest threat detections from video analysis, optionally for one stream."""
     try:
-        detections = inference_engine.get_detections()
-        
-        # Convert detections to alert format if confidence >= 0.5
-        current_time = time.time()
-        for detection in detections:
-            if detection["confidence"] >= 0.5:
-                alert = {
-                    "type": "threat_detection",
-                    "message": f"Threat detected: {detection['label']} (confidence: {detection['confidence']:.2f})",
-                    "meta": {
-                        "label": detection["label"],
-                        "confidence": detection["confidence"],
-                        "bbox": detection["bbox"]
-                    },
-                    "severity": "HIGH" if detection["confidence"] >= 0.8 else "MEDIUM",
-                    "timestamp": detection["timestamp"]
-                }
-                
-                # Add to alert history if not already present
-                if alert not in alert_history:
-                    alert_history.append(alert)
-        
-        return DetectionResponse(
-            detections=detections,
-            timestamp=current_time
-        )
+        key = f"detections:{stream_id or '*'}"
+        return snapshot_response(request, key, current_snapshot(key), "detections")
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
     except Exception as e:
         logger.error(f"Error getting detections: {e}")
         raise HTTPException(status_code=500, detail="Failed to get detections")
 
+@app.get("/api/streams", response_model=StreamResponse)
+async def list_streams():
+    """List registered video streams and their counters."""
+    return StreamResponse(
+        streams=inference_engine.list_streams(),
+        timestamp=time.time()
+    )
+
+@app.post("/api/streams")
+async def add_stream(request: StreamRequest):
+    """Register a new video source for analysis."""
+    options = {
+        "backend": request.backend,
+        "model_path": request.model_path,
+        "input_size": request.input_size,
+        "precision": request.precision
+    }
+    try:
+        detector_config = DetectorConfig(**{key: value for key, value in options.items() if value is not None})
+        region_config = RegionConfig.from_polygons(
+            request.roi, tile_size=request.tile_size, tile_overlap=request.tile_overlap,
+            full_frame=request.full_frame, motion_gated=request.motion_gated
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        stream = inference_engine.add_stream(
+            request.id, request.source, loop=request.loop, target_fps=request.target_fps,
+            detector_config=detector_config, region_config=region_config, idle_fps=request.idle_fps
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "message": f"Stream {request.id} registered",
+        "stream": stream.info()
+    }
+
+@app.delete("/api/streams/{stream_id}")
+def remove_stream(stream_id: str):
+    """Stop and unregister a video source."""
+    if not inference_engine.remove_stream(stream_id):
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
+    return {"message": f"Stream {stream_id} removed", "success": True}
+
+@app.get("/api/streams/{stream_id}/mjpeg")
+async def stream_mjpeg(stream_id: str, tier: str = DEFAULT_TIER):
+    """Annotated live video for one stream as MJPEG (use as an <img> source).
+
+    Frames are encoded once per tier and shared by all viewers of that tier.
+    """
+    stream = inference_engine.streams.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
+    if tier not in TIERS:
+        raise HTTPException(status_code=422, detail=f"Unknown tier {tier}, expected one of {list(TIERS)}")
+    return StreamingResponse(
+        stream.output.mjpeg(tier),
+        media_type=MJPEG_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache, no-store", "X-Accel-Buffering": "no"}
+    )
+
+@app.put("/api/streams/{stream_id}/regions")
+async def update_regions(stream_id: str, request: RegionsRequest):
+    """Replace a stream's ROI polygons and tiling settings without restarting it."""
+    stream = inference_engine.streams.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail=f"Stream {stream_id} not found")
+    try:
+        config = RegionConfig.from_polygons(
+            request.roi, tile_size=request.tile_size, tile_overlap=request.tile_overlap,
+            full_frame=request.full_frame, motion_gated=request.motion_gated
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    stream.set_regions(config)
+    return {"success": True, "regions": config.to_dict()}
+
+@app.get("/api/streams/{stream_id}/detections", response_model=DetectionResponse)
+async def get_stream_detections(request: Request, stream_id: str):
+    """Get latest detections for a single stream."""
+    return await get_detections(request, stream_id)
+
+@app.get("/api/detectors")
+async def detector_stats():
+    """Available detector backends and latency per configuration in use."""
+    return {
+        "backends": list(BACKENDS),
+        "default": DetectorConfig().key,
+        "latency": inference_engine.pool.detector_stats(),
+        "timestamp": time.time()
+    }
+
+@app.get("/api/admin/watchlist")
+async def get_watchlist():
+    """Get watched labels and their confidence thresholds."""
+    version, thresholds = inference_engine.watchlist.snapshot()
+    return {"version": version, "thresholds": thresholds}
+
+@app.put("/api/admin/watchlist")
+async def update_watchlist(request: WatchlistRequest):
+    """Replace the watchlist; detector workers pick it up on their next batch."""
+    try:
+        inference_engine.watchlist.update(request.thresholds)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    version, thresholds = inference_engine.watchlist.snapshot()
+    return {"version": version, "thresholds": thresholds}
+
 @app.get("/api/soldiers", response_model=SoldierResponse)
-async def get_soldiers():
+async def get_soldiers(request: Request):
     """Get current soldier status and data."""
     try:
-        soldiers = soldier_monitor.get_soldiers()
-        current_time = time.time()
-        
-        return SoldierResponse(
-            soldiers=soldiers,
-            timestamp=current_time
-        )
+        return snapshot_response(request, "soldiers", current_snapshot("soldiers"), "soldiers")
     except Exception as e:
         logger.error(f"Error getting soldiers: {e}")
         raise HTTPException(status_code=500, detail="Failed to get soldier data")
 
+@app.get("/api/soldiers/viewport", response_model=SoldierResponse)
+async def get_soldiers_in_viewport(min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """Get soldiers inside a map viewport (bounding box)."""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=422, detail="Viewport minimum must not exceed maximum")
+    return SoldierResponse(
+        soldiers=soldier_monitor.soldiers_in_bbox(min_lat, min_lon, max_lat, max_lon),
+        timestamp=time.time()
+    )
+
+@app.get("/api/soldiers/nearest", response_model=SoldierResponse)
+async def get_nearest_soldiers(lat: float, lon: float, k: int = 5):
+    """Get the k soldiers closest to a location (e.g. an alert), nearest first."""
+    if k < 1:
+        raise HTTPException(status_code=422, detail="k must be at least 1")
+    return SoldierResponse(
+        soldiers=soldier_monitor.nearest_soldiers(lat, lon, k),
+        timestamp=time.time()
+    )
+
 @app.post("/api/soldiers/simulate")
 async def simulate_emergency(request: SimulationRequest):
     """Simulate emergency for a specific soldier."""
@@ -159,61 +491,184 @@ async def simulate_emergency(request: SimulationRequest):
         logger.error(f"Error simulating emergency: {e}")
         raise HTTPException(status_code=500, detail="Failed to simulate emergency")
 
+@app.post("/api/telemetry", status_code=202)
+async def ingest_telemetry(request: Request):
+    """Accept a batch of wearable readings as NDJSON (default) or msgpack.
+    
+    Each reading is {"id", "lat", "lon", "heart_rate", "timestamp"}; all but
+    id are optional. Returns 429 when the ingestion buffer is full.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        if "msgpack" in content_type:
+            readings = parse_msgpack(body)
+        else:
+            readings = parse_ndjson(body)
+    except ImportError:
+        raise HTTPException(status_code=415, detail="msgpack support is not installed")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed telemetry batch")
+    
+    accepted, dropped = telemetry_ingestor.submit(readings)
+    if dropped and not accepted:
+        raise HTTPException(status_code=429, detail="Telemetry buffer full", headers={"Retry-After": "1"})
+    return {"accepted": accepted, "dropped": dropped}
+
+@app.get("/api/telemetry/stats")
+async def telemetry_stats():
+    """Telemetry ingestion counters (received, dropped, applied, pending...)."""
+    return telemetry_ingestor.stats()
+
+@app.get("/api/history")
+def get_history(
+    kind: str = "telemetry",
+    start: Optional[float] = Query(None, alias="from"),
+    end: Optional[float] = Query(None, alias="to"),
+    soldier_id: Optional[str] = None,
+    stream_id: Optional[str] = None,
+    bucket: Optional[float] = None,
+    limit: int = Query(DEFAULT_QUERY_LIMIT, ge=1, le=100000)
+):
+    """Recorded telemetry, detections or alerts in a time range (default: the last hour).
+
+    Long ranges are downsampled into time buckets; pass ``bucket`` (seconds,
+    0 for raw rows) to choose the resolution.
+    """
+    if not history_store.queryable:
+        raise HTTPException(status_code=503, detail="History is not available")
+    end = time.time() if end is None else end
+    start = end - 3600.0 if start is None else start
+    try:
+        return history_store.query(kind, start, end, soldier_id=soldier_id, stream_id=stream_id, bucket=bucket,
+                                   limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error querying history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to query history")
+
+@app.get("/api/history/replay")
+def replay_history(at: float, window: float = Query(DEFAULT_REPLAY_WINDOW, gt=0, le=3600)):
+    """Soldier positions and detections as they were at a point in time."""
+    if not history_store.queryable:
+        raise HTTPException(status_code=503, detail="History is not available")
+    try:
+        return history_store.replay(at, window)
+    except Exception as e:
+        logger.error(f"Error replaying history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to replay history")
+
+@app.get("/api/history/stats")
+async def history_stats():
+    """History writer counters (written, pending, dropped...)."""
+    return history_store.stats()
+
 @app.get("/api/alerts", response_model=AlertResponse)
-async def get_alerts():
+async def get_alerts(request: Request):
     """Get unified alerts from both threat detection and soldier monitoring."""
     try:
-        current_time = time.time()
-        all_alerts = []
-        
-        # Get soldier alerts
-        soldier_alerts = soldier_monitor.get_alerts()
-        all_alerts.extend(soldier_alerts)
-        
-        # Get threat detection alerts
-        detections = inference_engine.get_detections()
-        for detection in detections:
-            if detection["confidence"] >= 0.5:
-                alert = {
-                    "type": "threat_detection",
-                    "message": f"Threat detected: {detection['label']} (confidence: {detection['confidence']:.2f})",
-                    "meta": {
-                        "label": detection["label"],
-                        "confidence": detection["confidence"],
-                        "bbox": detection["bbox"]
-                    },
-                    "severity": "HIGH" if detection["confidence"] >= 0.8 else "MEDIUM",
-                    "timestamp": detection["timestamp"]
-                }
-                all_alerts.append(alert)
-        
-        # Sort alerts by timestamp (newest first)
-        all_alerts.sort(key=lambda x: x["timestamp"], reverse=True)
-        
-        # Keep only recent alerts (last 10 minutes)
-        cutoff_time = current_time - 600  # 10 minutes ago
-        all_alerts = [alert for alert in all_alerts if alert["timestamp"] > cutoff_time]
-        
-        return AlertResponse(
-            alerts=all_alerts,
-            timestamp=current_time
-        )
+        return snapshot_response(request, "alerts", current_snapshot("alerts"), "alerts")
     except Exception as e:
         logger.error(f"Error getting alerts: {e}")
         raise HTTPException(status_code=500, detail="Failed to get alerts")
 
+@app.websocket("/ws/stream")
+async def stream_socket(websocket: WebSocket):
+    """Push detection, soldier and alert deltas to a dashboard over WebSocket."""
+    await websocket.accept()
+    queue = event_hub.subscribe()
+    try:
+        while True:
+            message = await queue.get()
+            await websocket.send_text(message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_hub.unsubscribe(queue)
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """Push the same deltas as /ws/stream using Server-Sent Events."""
+    async def event_source():
+        queue = event_hub.subscribe()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            event_hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics of this process in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/engine", response_class=PlainTextResponse)
+async def get_engine_metrics():
+    """Metrics of the process running the pipelines (API workers forward this to the engine)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.put("/api/admin/metrics")
+async def toggle_metrics(request: MetricsToggleRequest):
+    """Turn metric recording on or off at runtime."""
+    metrics.enabled = request.enabled
+    logger.info(f"Metrics recording {'enabled' if request.enabled else 'disabled'}")
+    return {"enabled": metrics.enabled}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    if replica is not None:
+        services = dict(replica.status.get("health", {}), engine_connected=replica.connected)
+    else:
+        services = engine_health()
+    services["push_clients"] = event_hub.subscriber_count
     return {
         "status": "healthy",
+        "role": ROLE,
         "timestamp": time.time(),
-        "services": {
-            "inference": "running" if inference_engine.running else "stopped",
-            "soldier_monitor": "running" if soldier_monitor.running else "stopped"
-        }
+        "services": services
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: 503 until every service is started and detector models are warmed up.
+    
+    Unlike /health (liveness), this tells a load balancer when to start
+    routing traffic to a freshly started instance. API workers are ready
+    once they have synced with a ready engine. Detectors that fell back to
+    motion detection are reported as degraded; the instance stays ready.
+    """
+    if replica is not None:
+        readiness = dict(replica.status, synced=replica.synced)
+        ready = replica.ready
+    else:
+        readiness = engine_readiness()
+        ready = readiness["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "starting",
+            "role": ROLE,
+            "timestamp": time.time(),
+            "degraded": readiness.get("degraded", False),
+            "services": readiness.get("services", {}),
+            "detectors": readiness.get("detectors", {})
+        }
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
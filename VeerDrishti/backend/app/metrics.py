@@ -0,0 +1,262 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition.
+Counters and histograms are updated from the hot paths (decode loop,
+detector workers, soldier tick, HTTP routes); values owned elsewhere
+(queue depths, per-stream frame counters) are read through callbacks only
+when /metrics is scraped.
+
+Set METRICS_ENABLED=0 (or toggle ``metrics.enabled`` at runtime) to turn
+recording into a single attribute check.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+METRIC_PREFIX = "veerdrishti_"
+
+# Latency buckets (seconds), from sub-millisecond API hits to multi-second inference
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Batch size buckets for the detector pool
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+LabelValues = Tuple[str, ...]
+Sample = Union[float, Dict[LabelValues, float]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    """Base class: a named metric family with fixed label names."""
+
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.registry = registry
+        self.name = METRIC_PREFIX + name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labelvalues: str):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in fixed cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labelvalues: str) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labelvalues)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = {labels: (list(state[0]), state[1], state[2]) for labels, state in self._values.items()}
+        lines = []
+        for labels, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram: Histogram, labelvalues: LabelValues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter whose value is read from a callback at scrape time.
+
+    The callback returns a number, or a dict of label values -> number.
+    """
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, collect: Callable[[], Sample],
+                 labelnames: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(registry, name, help_text, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def _samples(self) -> List[str]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                for labels, value in values.items()]
+
+
+class MetricsRegistry:
+    """All metrics exposed at /metrics."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets=buckets))
+
+    def gauge_callback(self, name: str, help_text: str, collect: Callable[[], Sample],
+                       labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self._register(CallbackMetric(self, name, help_text, collect, labelnames, "gauge"))
+
+    def counter_callback(self, name: str, help_text: str, collect: Callable[[], Sample],
+                         labelnames: Sequence[str] = ()) -> CallbackMetric:
+        return self._register(CallbackMetric(self, name, help_text, collect, labelnames, "counter"))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RouteMetricsMiddleware:
+    """ASGI middleware timing every HTTP request by method, route template and status."""
+
+    def __init__(self, app, histogram: Histogram, registry: "MetricsRegistry"):
+        self.app = app
+        self.histogram = histogram
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep label cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.histogram.observe(time.perf_counter() - start, scope["method"], path, str(status))
+
+# Global metrics registry
+metrics = MetricsRegistry(enabled=os.environ.get("METRICS_ENABLED", "1") != "0")
+
+frame_read_seconds = metrics.histogram(
+    "frame_read_seconds", "Time to decode (retrieve) a frame picked for analysis", ["stream"]
+)
+detector_stage_seconds = metrics.histogram(
+    "detector_stage_seconds", "Detector batch time by stage (preprocess, infer, postprocess)", ["detector", "stage"]
+)
+detector_batch_size = metrics.histogram(
+    "detector_batch_size", "Frames per detector call", ["detector"], buckets=BATCH_SIZE_BUCKETS
+)
+soldier_tick_seconds = metrics.histogram(
+    "soldier_tick_seconds", "Soldier simulation tick time, including alerts and snapshot"
+)
+telemetry_flush_seconds = metrics.histogram(
+    "telemetry_flush_seconds", "Time to apply one batch of telemetry readings"
+)
+history_flush_seconds = metrics.histogram(
+    "history_flush_seconds", "Time to write one batch of history rows"
+)
+alerts_total = metrics.counter(
+    "alerts_total", "Alerts recorded (after dedup) by type and severity", ["type", "severity"]
+)
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
@@ -0,0 +1,174 @@
+"""
+Incremental motion detection for the OpenCV fallback.
+Keeps a running grayscale background model on a downscaled copy of each frame.
+"""
+
+import cv2
+import numpy as np
+import logging
+from typing import Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Width (pixels) frames are downscaled to before diffing
+DEFAULT_PROCESS_WIDTH = 320
+
+# Background update rate for the running average (0-1, higher adapts faster)
+DEFAULT_LEARNING_RATE = 0.05
+
+# Per-pixel difference needed to count as motion (0-255)
+DEFAULT_DIFF_THRESHOLD = 30
+
+# Minimum motion blob area, in source-frame pixels
+DEFAULT_MIN_AREA = 1000
+
+# Motion probe: width of the diffed frame, and the fraction of changed pixels
+# that counts as activity
+DEFAULT_PROBE_WIDTH = 160
+DEFAULT_MIN_CHANGED = 0.002
+
+
+class MotionEngine:
+    """Background-subtraction motion detector for a single video stream.
+
+    Frames are downscaled to ``process_width`` and converted to grayscale
+    into buffers that are allocated once per frame size and reused, so no
+    memory is allocated per frame apart from the contour list. Motion boxes
+    are returned in source-frame coordinates.
+
+    ``method`` is either ``"running_average"`` (cheapest) or ``"mog2"``.
+    """
+
+    def __init__(self, process_width: int = DEFAULT_PROCESS_WIDTH, learning_rate: float = DEFAULT_LEARNING_RATE,
+                 diff_threshold: int = DEFAULT_DIFF_THRESHOLD, min_area: float = DEFAULT_MIN_AREA,
+                 method: str = "running_average"):
+        if method not in ("running_average", "mog2"):
+            raise ValueError(f"Unknown motion method: {method}")
+        self.process_width = process_width
+        self.learning_rate = learning_rate
+        self.diff_threshold = diff_threshold
+        self.min_area = min_area
+        self.method = method
+
+        self._source_shape = None
+        self._scale = 1.0
+        self._initialized = False
+        self._subtractor = None
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+        # Preallocated working buffers (sized on first frame)
+        self._small: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._background: Optional[np.ndarray] = None
+        self._background_u8: Optional[np.ndarray] = None
+        self._diff: Optional[np.ndarray] = None
+        self._mask: Optional[np.ndarray] = None
+
+    def reset(self):
+        """Forget the background model, e.g. after the video loops."""
+        self._initialized = False
+
+    def _allocate(self, frame: np.ndarray):
+        """Size working buffers for a new source resolution."""
+        height, width = frame.shape[:2]
+        self._scale = min(1.0, self.process_width / width)
+        small_size = (max(1, int(round(height * self._scale))), max(1, int(round(width * self._scale))))
+
+        self._small = np.empty(small_size + frame.shape[2:], dtype=np.uint8)
+        self._gray = np.empty(small_size, dtype=np.uint8)
+        self._background = np.empty(small_size, dtype=np.float32)
+        self._background_u8 = np.empty(small_size, dtype=np.uint8)
+        self._diff = np.empty(small_size, dtype=np.uint8)
+        self._mask = np.empty(small_size, dtype=np.uint8)
+        if self.method == "mog2":
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        self._source_shape = frame.shape
+        self._initialized = False
+
+    def _preprocess(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale and convert the frame to grayscale into reused buffers."""
+        if frame.shape != self._source_shape:
+            self._allocate(frame)
+
+        small = frame
+        if self._scale < 1.0:
+            cv2.resize(frame, (self._small.shape[1], self._small.shape[0]), dst=self._small,
+                       interpolation=cv2.INTER_AREA)
+            small = self._small
+        if small.ndim == 3:
+            cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        else:
+            np.copyto(self._gray, small)
+        cv2.GaussianBlur(self._gray, (5, 5), 0, dst=self._gray)
+        return self._gray
+
+    def _foreground_mask(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        """Update the background model and return the motion mask."""
+        if self.method == "mog2":
+            learning_rate = -1 if self._initialized else 1.0
+            self._subtractor.apply(gray, fgmask=self._mask, learningRate=learning_rate)
+            first_frame = not self._initialized
+            self._initialized = True
+            return None if first_frame else self._mask
+
+        if not self._initialized:
+            self._background[...] = gray
+            self._initialized = True
+            return None
+
+        cv2.convertScaleAbs(self._background, dst=self._background_u8)
+        cv2.absdiff(gray, self._background_u8, dst=self._diff)
+        cv2.threshold(self._diff, self.diff_threshold, 255, cv2.THRESH_BINARY, dst=self._mask)
+        cv2.accumulateWeighted(gray, self._background, self.learning_rate)
+        return self._mask
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        """Feed a frame and return motion boxes as an (N, 4) x1, y1, x2, y2 array."""
+        gray = self._preprocess(frame)
+        mask = self._foreground_mask(gray)
+        if mask is None:
+            return np.empty((0, 4), dtype=np.float32)
+
+        cv2.dilate(mask, self._kernel, dst=mask, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return np.empty((0, 4), dtype=np.float32)
+
+        min_area = self.min_area * self._scale * self._scale
+        rects = np.array(
+            [cv2.boundingRect(contour) for contour in contours if cv2.contourArea(contour) > min_area],
+            dtype=np.float32
+        ).reshape(-1, 4)
+
+        # x, y, w, h in the downscaled frame -> x1, y1, x2, y2 in the source frame
+        rects[:, 2:] += rects[:, :2]
+        rects /= self._scale
+        return rects
+
+
+class MotionProbe(MotionEngine):
+    """Cheap change check deciding whether a frame is worth sending to the detector.
+
+    Diffs a heavily downscaled grayscale frame against the previous probed
+    frame (a running average with learning rate 1) and reports the fraction
+    of pixels that changed. Runs on the decode thread, separately from the
+    stream's ``MotionEngine`` used by the detector workers.
+    """
+
+    def __init__(self, process_width: int = DEFAULT_PROBE_WIDTH, diff_threshold: int = DEFAULT_DIFF_THRESHOLD,
+                 min_changed: float = DEFAULT_MIN_CHANGED):
+        super().__init__(process_width=process_width, learning_rate=1.0, diff_threshold=diff_threshold)
+        self.min_changed = min_changed
+
+    def changed_fraction(self, frame: np.ndarray) -> float:
+        """Fraction of pixels changed since the previous probe (0.0 for the first frame)."""
+        mask = self._foreground_mask(self._preprocess(frame))
+        if mask is None:
+            return 0.0
+        return cv2.countNonZero(mask) / mask.size
+
+    def moved(self, frame: np.ndarray) -> bool:
+        """Whether the scene changed enough to be worth analyzing."""
+        return self.changed_fraction(frame) >= self.min_changed
@@ -0,0 +1,228 @@
+"""
+Regions of interest and tiled inference for high-resolution streams.
+Decides which crops of a frame go to the detector (ROI bounding box,
+overlapping tiles, optionally only tiles with motion) and maps the results
+back into one set of frame-level detections.
+"""
+
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Fraction of a tile shared with its neighbours
+DEFAULT_TILE_OVERLAP = 0.2
+
+# Same-label boxes from overlapping crops (neighbouring tiles, or a tile and
+# the full-frame pass) overlapping by at least this IoU are duplicates
+MERGE_IOU_THRESHOLD = 0.5
+
+# The ROI mask is rasterized at most this wide
+MASK_MAX_WIDTH = 1024
+
+Crop = Tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class RegionConfig:
+    """Per-stream ROI and tiling settings.
+
+    ``roi`` is a list of polygons in normalized (0-1) frame coordinates;
+    detections whose center falls outside every polygon are dropped and
+    only the polygons' bounding box is analyzed. ``tile_size`` (source
+    pixels) slices that area into overlapping tiles so small objects keep
+    their resolution; ``full_frame`` adds one downscaled pass for objects
+    larger than a tile. With ``motion_gated``, only tiles containing motion
+    inside the ROI are analyzed and nothing is sent to the model when the
+    ROI is static.
+    """
+    roi: Tuple[Tuple[Tuple[float, float], ...], ...] = ()
+    tile_size: Optional[int] = None
+    tile_overlap: float = DEFAULT_TILE_OVERLAP
+    full_frame: bool = True
+    motion_gated: bool = False
+
+    def __post_init__(self):
+        for polygon in self.roi:
+            if len(polygon) < 3:
+                raise ValueError("ROI polygons need at least 3 points")
+            if any(not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0) for x, y in polygon):
+                raise ValueError("ROI points must be normalized to 0-1")
+        if self.tile_size is not None and self.tile_size < 64:
+            raise ValueError("tile_size must be at least 64 pixels")
+        if not 0.0 <= self.tile_overlap < 0.9:
+            raise ValueError("tile_overlap must be between 0 and 0.9")
+
+    @classmethod
+    def from_polygons(cls, roi: Optional[Sequence[Sequence[Sequence[float]]]] = None, **kwargs) -> "RegionConfig":
+        """Build from JSON-style nested lists."""
+        polygons = tuple(tuple((float(x), float(y)) for x, y in polygon) for polygon in roi or ())
+        return cls(roi=polygons, **kwargs)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.roi) or self.tile_size is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "roi": [[list(point) for point in polygon] for polygon in self.roi],
+            "tile_size": self.tile_size,
+            "tile_overlap": self.tile_overlap,
+            "full_frame": self.full_frame,
+            "motion_gated": self.motion_gated
+        }
+
+
+def _tile_starts(start: int, end: int, tile: int, step: int) -> List[int]:
+    """Tile origins covering [start, end) with the last tile flush to the end."""
+    if end - start <= tile:
+        return [start]
+    starts = list(range(start, end - tile, step))
+    starts.append(end - tile)
+    return starts
+
+
+def merge_detections(detections: List[Dict[str, Any]],
+                     threshold: float = MERGE_IOU_THRESHOLD) -> List[Dict[str, Any]]:
+    """Cross-crop NMS: of same-label boxes overlapping by ``threshold`` IoU, keep the most confident."""
+    if len(detections) < 2:
+        return detections
+    order = sorted(range(len(detections)), key=lambda i: detections[i]["confidence"], reverse=True)
+    boxes = np.array([detections[i]["bbox"] for i in order], dtype=np.float64)
+    labels = [detections[i]["label"] for i in order]
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    suppressed = np.zeros(len(order), dtype=bool)
+
+    kept = []
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        kept.append(detections[order[i]])
+        rest = np.flatnonzero(~suppressed[i + 1:]) + i + 1
+        rest = rest[[labels[j] == labels[i] for j in rest]] if len(rest) else rest
+        if len(rest):
+            width = np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0])
+            height = np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1])
+            intersection = np.clip(width, 0, None) * np.clip(height, 0, None)
+            union = areas[i] + areas[rest] - intersection
+            suppressed[rest[intersection >= threshold * np.maximum(union, 1e-9)]] = True
+    return kept
+
+
+class RegionPlanner:
+    """Plans crops for one stream's frames and merges the detections back.
+
+    Masks and tile grids depend only on the frame size and are computed
+    once per resolution.
+    """
+
+    def __init__(self, config: Optional[RegionConfig] = None):
+        self.config = config or RegionConfig()
+        self._shape = None
+        self._mask: Optional[np.ndarray] = None
+        self._mask_scale = 1.0
+        self._area: Crop = (0, 0, 0, 0)
+        self._tiles: np.ndarray = np.empty((0, 4), dtype=np.int64)
+
+    def _prepare(self, shape: Tuple[int, ...]):
+        """Rasterize the ROI and lay out the tile grid for a frame size."""
+        height, width = shape[:2]
+        self._shape = shape
+        self._mask = None
+        self._area = (0, 0, width, height)
+
+        if self.config.roi:
+            self._mask_scale = min(1.0, MASK_MAX_WIDTH / width)
+            mask_size = (max(1, int(round(height * self._mask_scale))), max(1, int(round(width * self._mask_scale))))
+            self._mask = np.zeros(mask_size, dtype=np.uint8)
+            scale = np.array([mask_size[1] - 1, mask_size[0] - 1], dtype=np.float64)
+            polygons = [np.round(np.array(polygon) * scale).astype(np.int32) for polygon in self.config.roi]
+            cv2.fillPoly(self._mask, polygons, 255)
+
+            points = np.concatenate([np.array(polygon) for polygon in self.config.roi])
+            x1, y1 = np.floor(points.min(axis=0) * [width, height]).astype(int)
+            x2, y2 = np.ceil(points.max(axis=0) * [width, height]).astype(int)
+            self._area = (max(0, int(x1)), max(0, int(y1)), min(width, int(x2)), min(height, int(y2)))
+
+        tiles = []
+        if self.config.tile_size:
+            x1, y1, x2, y2 = self._area
+            tile = self.config.tile_size
+            step = max(1, int(tile * (1.0 - self.config.tile_overlap)))
+            for ty in _tile_starts(y1, y2, tile, step):
+                for tx in _tile_starts(x1, x2, tile, step):
+                    crop = (tx, ty, min(tx + tile, x2), min(ty + tile, y2))
+                    if self._overlaps_roi(crop):
+                        tiles.append(crop)
+        self._tiles = np.array(tiles, dtype=np.int64).reshape(-1, 4)
+
+    def _overlaps_roi(self, crop: Crop) -> bool:
+        if self._mask is None:
+            return True
+        x1, y1, x2, y2 = (int(coord * self._mask_scale) for coord in crop)
+        return bool(self._mask[y1:max(y2, y1 + 1), x1:max(x2, x1 + 1)].any())
+
+    def plan(self, frame: np.ndarray, motion_boxes: Optional[np.ndarray] = None, tiled: bool = True) -> List[Crop]:
+        """Crops (x1, y1, x2, y2) of the frame to run the detector on.
+
+        ``motion_boxes`` (source coordinates) gate the crops when the config
+        is motion gated. With ``tiled=False`` the whole frame is returned and
+        only the ROI filter applies to the results.
+        """
+        if frame.shape != self._shape:
+            self._prepare(frame.shape)
+
+        if not tiled:
+            return [(0, 0, frame.shape[1], frame.shape[0])]
+
+        if self.config.motion_gated and motion_boxes is not None and len(motion_boxes) and self._mask is not None:
+            # Motion outside the ROI never triggers analysis
+            inside = [self._overlaps_roi(tuple(box)) for box in np.asarray(motion_boxes, dtype=np.int64).tolist()]
+            motion_boxes = motion_boxes[np.array(inside, dtype=bool)]
+
+        if not self.config.tile_size:
+            if self.config.motion_gated and motion_boxes is not None and len(motion_boxes) == 0:
+                return []
+            return [self._area]
+
+        tiles = self._tiles
+        if self.config.motion_gated and motion_boxes is not None:
+            if len(motion_boxes) == 0:
+                return []
+            # Keep tiles intersecting any motion box
+            hit = (
+                (tiles[:, None, 0] < motion_boxes[None, :, 2]) & (tiles[:, None, 2] > motion_boxes[None, :, 0])
+                & (tiles[:, None, 1] < motion_boxes[None, :, 3]) & (tiles[:, None, 3] > motion_boxes[None, :, 1])
+            ).any(axis=1)
+            tiles = tiles[hit]
+
+        crops = [tuple(tile) for tile in tiles.tolist()]
+        if self.config.full_frame and len(self._tiles) > 1:
+            crops.insert(0, self._area)
+        return crops
+
+    def merge(self, crops: Sequence[Crop], results: Sequence[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Map per-crop detections to frame coordinates, apply the ROI and merge across tiles."""
+        detections = []
+        for (x, y, _, _), crop_detections in zip(crops, results):
+            for detection in crop_detections:
+                x1, y1, x2, y2 = detection["bbox"]
+                detections.append({**detection, "bbox": [x1 + x, y1 + y, x2 + x, y2 + y]})
+        detections = self.filter_roi(detections)
+        if len(crops) > 1:
+            detections = merge_detections(detections)
+        return detections
+
+    def filter_roi(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop detections whose box center lies outside the ROI."""
+        if self._mask is None or not detections:
+            return detections
+        height, width = self._mask.shape
+        kept = []
+        for detection in detections:
+            x1, y1, x2, y2 = detection["bbox"]
+            cx = min(width - 1, max(0, int((x1 + x2) / 2 * self._mask_scale)))
+            cy = min(height - 1, max(0, int((y1 + y2) / 2 * self._mask_scale)))
+            if self._mask[cy, cx]:
+                kept.append(detection)
+        return kept
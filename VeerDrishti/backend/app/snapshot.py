@@ -0,0 +1,92 @@
+"""
+Immutable, versioned state snapshots.
+A producer thread publishes a new snapshot and swaps it in with a single
+reference assignment; readers take ``cell.current`` without locking or
+copying and always see one consistent version.
+"""
+
+import json
+import threading
+import time
+from functools import cached_property
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+
+class Snapshot:
+    """One published version of a list of items.
+
+    Items are either given directly or built lazily by ``build`` on first
+    read, so a producer can publish cheaply (e.g. copies of column arrays)
+    and only versions that are actually read get materialized. The items
+    are built at most once per snapshot, even with concurrent readers, and
+    must not be mutated by readers.
+    """
+
+    def __init__(self, version: Any, items: Optional[Sequence[Dict[str, Any]]] = None,
+                 build: Optional[Callable[[], Sequence[Dict[str, Any]]]] = None,
+                 timestamp: Optional[float] = None):
+        self.version = version
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._build = build
+        self._build_lock = threading.Lock() if build is not None else None
+        if items is not None:
+            self.__dict__["items"] = tuple(items)
+        self._bodies: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_json(cls, version: Any, data: bytes, timestamp: Optional[float] = None) -> "Snapshot":
+        """Snapshot received already serialized (e.g. from another process); items are only decoded if read."""
+        snapshot = cls(version, build=lambda: json.loads(data), timestamp=timestamp)
+        snapshot.__dict__["json"] = data
+        return snapshot
+
+    @cached_property
+    def items(self) -> Tuple[Dict[str, Any], ...]:
+        # cached_property does not lock (Python 3.12+), so concurrent first
+        # reads are serialized here and later ones reuse the built items
+        with self._build_lock:
+            items = self.__dict__.get("items")
+            if items is None:
+                items = tuple(self._build())
+                self.__dict__["items"] = items
+                self._build = None
+            return items
+
+    @cached_property
+    def json(self) -> bytes:
+        """Items serialized as a JSON array."""
+        return json.dumps(self.items, separators=(",", ":")).encode()
+
+    def body(self, field: str) -> bytes:
+        """JSON object ``{field: items, "timestamp": ...}`` as served by the API, cached per field."""
+        body = self._bodies.get(field)
+        if body is None:
+            body = b'{"%s":%s,"timestamp":%s}' % (field.encode(), self.json, repr(self.timestamp).encode())
+            self._bodies[field] = body
+        return body
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class SnapshotCell:
+    """Holds the current snapshot of one piece of state.
+
+    Writers are serialized by a lock; readers never take it.
+    """
+
+    def __init__(self, items: Sequence[Dict[str, Any]] = ()):
+        self._lock = threading.Lock()
+        self.current = Snapshot(0, items)
+
+    @property
+    def version(self) -> int:
+        return self.current.version
+
+    def publish(self, items: Optional[Sequence[Dict[str, Any]]] = None,
+                build: Optional[Callable[[], Sequence[Dict[str, Any]]]] = None) -> Snapshot:
+        """Swap in a new snapshot built from items, or lazily from build."""
+        with self._lock:
+            snapshot = Snapshot(self.current.version + 1, items, build)
+            self.current = snapshot
+        return snapshot
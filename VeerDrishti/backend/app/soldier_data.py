@@ -1,20 +1,63 @@
 """
 Soldier monitoring data simulation.
 Manages soldier status, GPS, heart rate, and emergency simulation.
+
+Soldier state is stored column-wise in NumPy arrays (one row per soldier) so
+simulation ticks, status classification and alert extraction are whole-array
+operations that stay cheap for tens of thousands of wearables.
 """
 
+import os
 import time
-import random
 import threading
 import logging
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.alerts import publish_alerts
+from app.history import SOLDIER_SAMPLE_INTERVAL, history_store
+from app.hub import event_hub
+from app.metrics import soldier_tick_seconds
+from app.snapshot import Snapshot, SnapshotCell
+from app.spatial import GridIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Status codes stored in the status column
+STATUS_OK = 0
+STATUS_AT_RISK = 1
+STATUS_CRITICAL = 2
+STATUS_NAMES = np.array(["OK", "AT_RISK", "CRITICAL"], dtype=object)
+
+# Simulated vitals: heart rate range, and the band outside which a soldier is AT_RISK
+HEART_RATE_MIN = 60
+HEART_RATE_MAX = 100
+HEART_RATE_OK_LOW = 70
+HEART_RATE_OK_HIGH = 90
+HEART_RATE_STEP = 5
+GPS_DRIFT = 0.0001
+
+# Reported heart rates outside this band mark a soldier CRITICAL
+HEART_RATE_CRITICAL_LOW = 40
+HEART_RATE_CRITICAL_HIGH = 140
+
+# Optional damping of the simulation, off by default because it delays or
+# suppresses warnings: a simulated status change only takes effect after the
+# new status has held for the dwell time (seconds), and a simulated soldier is
+# warned about at most once per cooldown (seconds). Useful for load tests with
+# large synthetic fleets, whose random-walk heart rates cross the band edges
+# every few ticks. Wearable telemetry and emergencies are never damped.
+DEFAULT_STATUS_DWELL = 0.0
+DEFAULT_WARNING_COOLDOWN = 0.0
+
+# Fleets up to this size push every soldier to live clients each tick; larger
+# fleets only push soldiers whose status changed
+PUSH_ALL_LIMIT = 500
+
 @dataclass
 class Soldier:
     id: str
@@ -25,15 +68,76 @@ class Soldier:
     status: str  # "OK", "AT_RISK", "CRITICAL"
     last_update: float
 
+def soldier_dicts(ids: List[str], names: List[str], lat: np.ndarray, lon: np.ndarray, heart_rate: np.ndarray,
+                  status: np.ndarray, last_update: np.ndarray) -> List[Dict[str, Any]]:
+    """Build soldier dicts from column values."""
+    return [
+        {
+            "id": soldier_id,
+            "name": name,
+            "gps": {"lat": soldier_lat, "lon": soldier_lon},
+            "heart_rate": soldier_heart_rate,
+            "status": soldier_status,
+            "last_update": soldier_last_update
+        }
+        for soldier_id, name, soldier_lat, soldier_lon, soldier_heart_rate, soldier_status, soldier_last_update in zip(
+            ids, names, lat.tolist(), lon.tolist(), heart_rate.tolist(), STATUS_NAMES[status].tolist(),
+            last_update.tolist()
+        )
+    ]
+
 class SoldierMonitor:
-    def __init__(self):
-        self.soldiers = []
+    """Columnar soldier state with a simulation thread.
+
+    ``count`` adds synthetic soldiers around the base position on top of the
+    six named ones, for battalion-scale testing. ``status_dwell`` and
+    ``warning_cooldown`` damp the simulation (see DEFAULT_STATUS_DWELL).
+    """
+
+    def __init__(self, count: int = 0, seed: Optional[int] = None, status_dwell: float = DEFAULT_STATUS_DWELL,
+                 warning_cooldown: float = DEFAULT_WARNING_COOLDOWN):
         self.running = False
+        self.status_dwell = status_dwell
+        self.warning_cooldown = warning_cooldown
         self.thread = None
-        self._initialize_soldiers()
-    
-    def _initialize_soldiers(self):
-        """Initialize 6 simulated soldiers with random data."""
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+        # Column arrays, one row per soldier, plus id -> row index
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.lat = np.empty(0, dtype=np.float64)
+        self.lon = np.empty(0, dtype=np.float64)
+        self.heart_rate = np.empty(0, dtype=np.int16)
+        self.status = np.empty(0, dtype=np.uint8)
+        self.last_update = np.empty(0, dtype=np.float64)
+
+        # Rows fed by real wearable telemetry are no longer simulated
+        self.live = np.empty(0, dtype=bool)
+
+        # When a simulated status change was first seen (NaN = none pending),
+        # and when each simulated soldier was last warned about (damping only)
+        self.pending_since = np.empty(0, dtype=np.float64)
+        self.last_warned = np.empty(0, dtype=np.float64)
+
+        # Grid index over GPS positions for viewport and nearest-soldier queries
+        self.spatial = GridIndex()
+
+        # Immutable snapshot of all soldiers, swapped in after every change
+        self.state = SnapshotCell()
+
+        # When the simulated state was last sampled into history
+        self._last_history_sample = 0.0
+
+        # Whether the event hub holds every soldier's current state; it falls
+        # behind while nobody is connected and is refreshed in full on reconnect
+        self._hub_synced = False
+
+        self._initialize_soldiers(count)
+
+    def _initialize_soldiers(self, count: int):
+        """Initialize 6 simulated soldiers (plus synthetic ones up to count) with random data."""
         soldier_data = [
             {"id": "soldier-1", "name": "Lt. Rajesh Kumar", "lat": 28.6139, "lon": 77.2090},
             {"id": "soldier-2", "name": "Sgt. Priya Sharma", "lat": 28.6140, "lon": 77.2095},
@@ -42,47 +146,161 @@ class SoldierMonitor:
             {"id": "soldier-5", "name": "Maj. Vikram Joshi", "lat": 28.6148, "lon": 77.2105},
             {"id": "soldier-6", "name": "Capt. Anjali Patel", "lat": 28.6143, "lon": 77.2102}
         ]
-        
-        for data in soldier_data:
-            soldier = Soldier(
-                id=data["id"],
-                name=data["name"],
-                gps_lat=data["lat"],
-                gps_lon=data["lon"],
-                heart_rate=random.randint(60, 100),
-                status="OK",
-                last_update=time.time()
-            )
-            self.soldiers.append(soldier)
-        
-        logger.info(f"Initialized {len(self.soldiers)} soldiers")
-    
+
+        ids = [data["id"] for data in soldier_data]
+        names = [data["name"] for data in soldier_data]
+        lat = np.array([data["lat"] for data in soldier_data])
+        lon = np.array([data["lon"] for data in soldier_data])
+
+        extra = max(0, count - len(soldier_data))
+        if extra:
+            first = len(soldier_data) + 1
+            ids += [f"soldier-{i}" for i in range(first, first + extra)]
+            names += [f"Unit {i}" for i in range(first, first + extra)]
+            lat = np.concatenate([lat, lat[0] + self._rng.normal(0.0, 0.01, extra)])
+            lon = np.concatenate([lon, lon[0] + self._rng.normal(0.0, 0.01, extra)])
+
+        self.add_soldiers(ids, names, lat, lon)
+        logger.info(f"Initialized {len(self.ids)} soldiers")
+
+    def add_soldiers(self, ids: List[str], names: List[str], lat: np.ndarray, lon: np.ndarray):
+        """Append soldiers with random starting heart rates and OK status."""
+        count = len(ids)
+        with self._lock:
+            duplicates = [soldier_id for soldier_id in ids if soldier_id in self.index]
+            if duplicates:
+                raise ValueError(f"Soldiers already registered: {duplicates[:5]}")
+
+            first_row = len(self.ids)
+            self.ids.extend(ids)
+            self.names.extend(names)
+            self.index.update((soldier_id, first_row + i) for i, soldier_id in enumerate(ids))
+            self.lat = np.concatenate([self.lat, np.asarray(lat, dtype=np.float64)])
+            self.lon = np.concatenate([self.lon, np.asarray(lon, dtype=np.float64)])
+            self.heart_rate = np.concatenate([
+                self.heart_rate,
+                self._rng.integers(HEART_RATE_MIN, HEART_RATE_MAX + 1, count).astype(np.int16)
+            ])
+            self.status = np.concatenate([self.status, np.full(count, STATUS_OK, dtype=np.uint8)])
+            self.last_update = np.concatenate([self.last_update, np.full(count, time.time())])
+            self.live = np.concatenate([self.live, np.zeros(count, dtype=bool)])
+            self.pending_since = np.concatenate([self.pending_since, np.full(count, np.nan)])
+            self.last_warned = np.concatenate([self.last_warned, np.full(count, -np.inf)])
+            self.spatial.update(np.arange(first_row, first_row + count), self.lat, self.lon)
+            self._publish_snapshot()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _tick(self, now: float) -> np.ndarray:
+        """Advance the simulation by one step for all soldiers.
+
+        Returns the rows whose status changed this tick. Caller holds the lock.
+        """
+        # Only update simulated soldiers not in CRITICAL status (emergency simulation)
+        active = np.flatnonzero((self.status != STATUS_CRITICAL) & ~self.live)
+        count = len(active)
+
+        # Random heart rate variation (60-100 bpm)
+        heart_rate = self.heart_rate[active] + self._rng.integers(-HEART_RATE_STEP, HEART_RATE_STEP + 1, count)
+        np.clip(heart_rate, HEART_RATE_MIN, HEART_RATE_MAX, out=heart_rate)
+        self.heart_rate[active] = heart_rate
+
+        # Random GPS drift (small movements)
+        self.lat[active] += self._rng.uniform(-GPS_DRIFT, GPS_DRIFT, count)
+        self.lon[active] += self._rng.uniform(-GPS_DRIFT, GPS_DRIFT, count)
+        self.spatial.update(active, self.lat, self.lon)
+
+        # Determine status based on heart rate
+        status = np.where(
+            (heart_rate < HEART_RATE_OK_LOW) | (heart_rate > HEART_RATE_OK_HIGH), STATUS_AT_RISK, STATUS_OK
+        ).astype(np.uint8)
+        flip = status != self.status[active]
+        if self.status_dwell:
+            # Damped: a change only takes effect once the new status has held for status_dwell seconds
+            pending_since = self.pending_since[active]
+            pending_since = np.where(flip, np.where(np.isnan(pending_since), now, pending_since), np.nan)
+            flip &= now - pending_since >= self.status_dwell
+            pending_since[flip] = np.nan
+            self.pending_since[active] = pending_since
+        changed = active[flip]
+        self.status[changed] = status[flip]
+
+        self.last_update[~self.live] = now
+        return changed
+
+    def apply_readings(self, ids: List[str], lat: np.ndarray, lon: np.ndarray, heart_rate: np.ndarray,
+                       timestamp: np.ndarray) -> int:
+        """Apply a batch of wearable readings under a single lock acquisition.
+
+        Missing values are NaN and leave the stored value unchanged. Readings
+        for unknown ids are ignored. Returns the number of readings applied.
+        """
+        rows = np.fromiter((self.index.get(soldier_id, -1) for soldier_id in ids), dtype=np.intp, count=len(ids))
+        known = rows >= 0
+        if not known.any():
+            return 0
+        rows, lat, lon, heart_rate, timestamp = rows[known], lat[known], lon[known], heart_rate[known], timestamp[known]
+
+        with self._lock:
+            has_lat, has_lon, has_heart_rate = ~np.isnan(lat), ~np.isnan(lon), ~np.isnan(heart_rate)
+            self.lat[rows[has_lat]] = lat[has_lat]
+            self.lon[rows[has_lon]] = lon[has_lon]
+            self.heart_rate[rows[has_heart_rate]] = np.clip(heart_rate[has_heart_rate], 0, 250).astype(np.int16)
+            self.last_update[rows] = timestamp
+            self.live[rows] = True
+            self.spatial.update(rows[has_lat | has_lon], self.lat, self.lon)
+
+            # Reclassify status from the reported heart rate
+            updated = np.unique(rows)
+            reported = self.heart_rate[updated]
+            status = np.where(
+                (reported < HEART_RATE_CRITICAL_LOW) | (reported > HEART_RATE_CRITICAL_HIGH), STATUS_CRITICAL,
+                np.where((reported < HEART_RATE_OK_LOW) | (reported > HEART_RATE_OK_HIGH), STATUS_AT_RISK, STATUS_OK)
+            ).astype(np.uint8)
+            changed = updated[status != self.status[updated]]
+            self.status[updated] = status
+            self.pending_since[updated] = np.nan
+
+            alerts = self._soldier_alerts(changed)
+            soldiers = self._soldier_dicts(changed if len(self.ids) > PUSH_ALL_LIMIT else updated)
+            self._publish_snapshot()
+            self._record_history(updated)
+
+        publish_alerts(alerts)
+        self._publish(soldiers, replace=False)
+        return len(rows)
+
+    def step(self, now: Optional[float] = None):
+        """Run one simulation update: tick, raise alerts, publish snapshot and push."""
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        with self._lock:
+            changed = self._tick(now)
+            if now - self._last_history_sample >= SOLDIER_SAMPLE_INTERVAL:
+                self._last_history_sample = now
+                self._record_history()
+
+            # Raise an alert when a soldier enters a worse status
+            raised = self._soldier_alerts(self._throttle_warnings(changed, now))
+            soldiers = pushed = None
+            if event_hub.has_audience:
+                pushed = changed if len(self.ids) > PUSH_ALL_LIMIT and self._hub_synced else None
+                soldiers = self._soldier_dicts(pushed)
+            self._hub_synced = soldiers is not None
+            self._publish_snapshot(soldiers if pushed is None else None)
+
+        publish_alerts(raised)
+        if soldiers is not None:
+            self._publish(soldiers, replace=pushed is None)
+        soldier_tick_seconds.observe(time.perf_counter() - start)
+
     def _simulate_soldier_data(self):
         """Simulate soldier data updates every second."""
         while self.running:
-            for soldier in self.soldiers:
-                # Only update if not in CRITICAL status (emergency simulation)
-                if soldier.status != "CRITICAL":
-                    # Random heart rate variation (60-100 bpm)
-                    heart_rate_change = random.randint(-5, 5)
-                    soldier.heart_rate = max(60, min(100, soldier.heart_rate + heart_rate_change))
-                    
-                    # Random GPS drift (small movements)
-                    lat_change = random.uniform(-0.0001, 0.0001)
-                    lon_change = random.uniform(-0.0001, 0.0001)
-                    soldier.gps_lat += lat_change
-                    soldier.gps_lon += lon_change
-                    
-                    # Determine status based on heart rate
-                    if soldier.heart_rate < 70 or soldier.heart_rate > 90:
-                        soldier.status = "AT_RISK"
-                    else:
-                        soldier.status = "OK"
-                
-                soldier.last_update = time.time()
-            
+            self.step()
             time.sleep(1.0)  # Update every second
-    
+
     def start(self):
         """Start the soldier monitoring simulation."""
         if not self.running:
@@ -90,76 +308,175 @@ class SoldierMonitor:
             self.thread = threading.Thread(target=self._simulate_soldier_data, daemon=True)
             self.thread.start()
             logger.info("Soldier monitoring started")
-    
+
     def stop(self):
         """Stop the soldier monitoring simulation."""
         self.running = False
         if self.thread:
             self.thread.join()
         logger.info("Soldier monitoring stopped")
-    
-    def get_soldiers(self) -> List[Dict[str, Any]]:
-        """Get current soldier data."""
+
+    def _publish(self, soldiers: List[Dict[str, Any]], replace: bool = True):
+        """Push soldier state to the event hub."""
+        items = {soldier["id"]: soldier for soldier in soldiers}
+        if replace:
+            event_hub.publish_state("soldiers", items)
+        else:
+            event_hub.update_state("soldiers", items)
+
+    def _publish_snapshot(self, soldiers: Optional[List[Dict[str, Any]]] = None):
+        """Swap in a new snapshot of all soldiers. Caller holds the lock.
+
+        The columns are copied (cheap) and the soldier dicts are only built
+        when the snapshot is first read, unless they are passed in.
+        """
+        if soldiers is not None:
+            self.state.publish(soldiers)
+            return
+        columns = (
+            list(self.ids), list(self.names), self.lat.copy(), self.lon.copy(),
+            self.heart_rate.copy(), self.status.copy(), self.last_update.copy()
+        )
+        self.state.publish(build=lambda: soldier_dicts(*columns))
+
+    def _record_history(self, rows: Optional[np.ndarray] = None):
+        """Queue the given rows (all by default) for the history store. Caller holds the lock.
+
+        Only column copies are handed over; rows are built on the history writer thread.
+        """
+        if not history_store.running:
+            return
+        if rows is None:
+            history_store.record_telemetry(list(self.ids), self.lat.copy(), self.lon.copy(), self.heart_rate.copy(),
+                                           self.status.copy(), self.last_update.copy())
+            return
+        history_store.record_telemetry([self.ids[row] for row in rows.tolist()], self.lat[rows], self.lon[rows],
+                                       self.heart_rate[rows], self.status[rows], self.last_update[rows])
+
+    def _soldier_dicts(self, rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """Build soldier dicts for the given rows (all rows by default). Caller holds the lock."""
+        if rows is None:
+            return soldier_dicts(self.ids, self.names, self.lat, self.lon, self.heart_rate, self.status,
+                                 self.last_update)
+        row_list = rows.tolist()
+        return soldier_dicts(
+            [self.ids[row] for row in row_list], [self.names[row] for row in row_list], self.lat[rows],
+            self.lon[rows], self.heart_rate[rows], self.status[rows], self.last_update[rows]
+        )
+
+    @property
+    def snapshot(self) -> Snapshot:
+        """Current immutable snapshot of all soldiers."""
+        return self.state.current
+
+    @property
+    def version(self) -> int:
+        return self.state.version
+
+    def get_soldiers(self) -> Tuple[Dict[str, Any], ...]:
+        """Get current soldier data (no locking, no copying)."""
+        return self.state.current.items
+
+    def soldiers_in_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Dict[str, Any]]:
+        """Get soldiers positioned inside a bounding box (e.g. the map viewport)."""
+        with self._lock:
+            rows = self.spatial.query_bbox(self.lat, self.lon, min_lat, min_lon, max_lat, max_lon)
+            return self._soldier_dicts(rows)
+
+    def nearest_soldiers(self, lat: float, lon: float, k: int = 5) -> List[Dict[str, Any]]:
+        """Get the k soldiers closest to a location, nearest first, with distance in meters."""
+        with self._lock:
+            rows, distances = self.spatial.nearest(self.lat, self.lon, lat, lon, k)
+            soldiers = self._soldier_dicts(rows)
+        for soldier, distance in zip(soldiers, distances.tolist()):
+            soldier["distance_m"] = distance
+        return soldiers
+
+    def get_soldier(self, soldier_id: str) -> Optional[Soldier]:
+        """Get a single soldier's current state."""
+        with self._lock:
+            row = self.index.get(soldier_id)
+            if row is None:
+                return None
+            return Soldier(
+                id=soldier_id,
+                name=self.names[row],
+                gps_lat=float(self.lat[row]),
+                gps_lon=float(self.lon[row]),
+                heart_rate=int(self.heart_rate[row]),
+                status=STATUS_NAMES[self.status[row]],
+                last_update=float(self.last_update[row])
+            )
+
+    def simulate_emergency(self, soldier_id: str) -> bool:
+        """Simulate emergency for a specific soldier."""
+        with self._lock:
+            row = self.index.get(soldier_id)
+            if row is None:
+                logger.warning(f"Soldier {soldier_id} not found")
+                return False
+
+            raise_alert = self.status[row] != STATUS_CRITICAL
+            self.status[row] = STATUS_CRITICAL
+            self.pending_since[row] = np.nan
+            self.heart_rate[row] = self._rng.integers(120, 151)  # Elevated heart rate
+            self.last_update[row] = time.time()
+            alerts = self._soldier_alerts(np.array([row]))
+            soldiers = self._soldier_dicts(np.array([row]))
+            self._publish_snapshot()
+
+        logger.info(f"Emergency simulated for {self.names[row]} ({soldier_id})")
+        if raise_alert:
+            publish_alerts(alerts)
+        self._publish(soldiers, replace=False)
+        return True
+
+    def _throttle_warnings(self, rows: np.ndarray, now: float) -> np.ndarray:
+        """Drop simulated AT_RISK rows warned about within warning_cooldown. Caller holds the lock."""
+        if not self.warning_cooldown:
+            return rows
+        at_risk = (self.status[rows] == STATUS_AT_RISK) & ~self.live[rows]
+        held = at_risk & (now - self.last_warned[rows] < self.warning_cooldown)
+        self.last_warned[rows[at_risk & ~held]] = now
+        return rows[~held]
+
+    def _soldier_alerts(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Build alerts for soldiers in the given rows that are not OK. Caller holds the lock."""
+        rows = rows[self.status[rows] != STATUS_OK]
+        critical = (self.status[rows] == STATUS_CRITICAL).tolist()
         return [
             {
-                "id": soldier.id,
-                "name": soldier.name,
-                "gps": {"lat": soldier.gps_lat, "lon": soldier.gps_lon},
-                "heart_rate": soldier.heart_rate,
-                "status": soldier.status,
-                "last_update": soldier.last_update
+                "type": "soldier_emergency" if is_critical else "soldier_warning",
+                "message": (
+                    f"CRITICAL: {self.names[row]} requires immediate assistance" if is_critical
+                    else f"WARNING: {self.names[row]} shows concerning vital signs"
+                ),
+                "meta": {
+                    "soldier_id": self.ids[row],
+                    "soldier_name": self.names[row],
+                    "heart_rate": heart_rate,
+                    "gps": {"lat": lat, "lon": lon}
+                },
+                "severity": "HIGH" if is_critical else "MEDIUM",
+                "timestamp": last_update
             }
-            for soldier in self.soldiers
+            for row, is_critical, lat, lon, heart_rate, last_update in zip(
+                rows.tolist(),
+                critical,
+                self.lat[rows].tolist(),
+                self.lon[rows].tolist(),
+                self.heart_rate[rows].tolist(),
+                self.last_update[rows].tolist()
+            )
         ]
-    
-    def simulate_emergency(self, soldier_id: str) -> bool:
-        """Simulate emergency for a specific soldier."""
-        for soldier in self.soldiers:
-            if soldier.id == soldier_id:
-                soldier.status = "CRITICAL"
-                soldier.heart_rate = random.randint(120, 150)  # Elevated heart rate
-                soldier.last_update = time.time()
-                logger.info(f"Emergency simulated for {soldier.name} ({soldier.id})")
-                return True
-        
-        logger.warning(f"Soldier {soldier_id} not found")
-        return False
-    
+
     def get_alerts(self) -> List[Dict[str, Any]]:
         """Get current alerts from soldier data."""
-        alerts = []
-        current_time = time.time()
-        
-        for soldier in self.soldiers:
-            # Check for status alerts
-            if soldier.status == "CRITICAL":
-                alerts.append({
-                    "type": "soldier_emergency",
-                    "message": f"CRITICAL: {soldier.name} requires immediate assistance",
-                    "meta": {
-                        "soldier_id": soldier.id,
-                        "soldier_name": soldier.name,
-                        "heart_rate": soldier.heart_rate,
-                        "gps": {"lat": soldier.gps_lat, "lon": soldier.gps_lon}
-                    },
-                    "severity": "HIGH",
-                    "timestamp": soldier.last_update
-                })
-            elif soldier.status == "AT_RISK":
-                alerts.append({
-                    "type": "soldier_warning",
-                    "message": f"WARNING: {soldier.name} shows concerning vital signs",
-                    "meta": {
-                        "soldier_id": soldier.id,
-                        "soldier_name": soldier.name,
-                        "heart_rate": soldier.heart_rate,
-                        "gps": {"lat": soldier.gps_lat, "lon": soldier.gps_lon}
-                    },
-                    "severity": "MEDIUM",
-                    "timestamp": soldier.last_update
-                })
-        
-        return alerts
+        with self._lock:
+            return self._soldier_alerts(np.arange(len(self.ids)))
 
 # Global soldier monitor instance
-soldier_monitor = SoldierMonitor()
+soldier_monitor = SoldierMonitor(
+    status_dwell=float(os.environ.get("SOLDIER_STATUS_DWELL", DEFAULT_STATUS_DWELL)),
+    warning_cooldown=float(os.environ.get("SOLDIER_WARNING_COOLDOWN", DEFAULT_WARNING_COOLDOWN))
+)
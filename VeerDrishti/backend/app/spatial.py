@@ -0,0 +1,140 @@
+"""
+Spatial index over soldier GPS positions.
+A uniform lat/lon grid maintained incrementally as positions change.
+"""
+
+import math
+import numpy as np
+from typing import Dict, List, Set, Tuple
+
+# Grid cell size in degrees (~550 m of latitude)
+DEFAULT_CELL_SIZE = 0.005
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
+    """Great-circle distance in meters from one point to arrays of points."""
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+
+class GridIndex:
+    """Grid of cells mapping to the rows positioned inside them.
+
+    The caller owns the coordinate arrays and calls ``update`` with the rows
+    whose position changed; only rows that crossed a cell boundary are moved.
+    Queries visit the cells overlapping the search area, so their cost
+    depends on local density rather than the total number of rows.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+        self.cell_of = np.empty((0, 2), dtype=np.int64)
+
+    def _cell_coords(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        return np.stack([np.floor(lat / self.cell_size), np.floor(lon / self.cell_size)], axis=1).astype(np.int64)
+
+    def update(self, rows: np.ndarray, lat: np.ndarray, lon: np.ndarray):
+        """Re-index rows given their full coordinate arrays."""
+        if len(rows) == 0:
+            return
+        if rows.max() >= len(self.cell_of):
+            # New rows: mark them as not yet in any cell
+            grown = np.full((len(lat), 2), np.iinfo(np.int64).min, dtype=np.int64)
+            grown[:len(self.cell_of)] = self.cell_of
+            self.cell_of = grown
+
+        new_cells = self._cell_coords(lat[rows], lon[rows])
+        moved = np.flatnonzero((new_cells != self.cell_of[rows]).any(axis=1))
+        if len(moved) == 0:
+            return
+        moved_rows = rows[moved]
+        cells = self.cells
+        for row, old_y, old_x, new_y, new_x in zip(moved_rows.tolist(), *self.cell_of[moved_rows].T.tolist(),
+                                                   *new_cells[moved].T.tolist()):
+            members = cells.get((old_y, old_x))
+            if members is not None:
+                members.discard(row)
+                if not members:
+                    del cells[(old_y, old_x)]
+            cells.setdefault((new_y, new_x), set()).add(row)
+        self.cell_of[moved_rows] = new_cells[moved]
+
+    def query_bbox(self, lat: np.ndarray, lon: np.ndarray, min_lat: float, min_lon: float,
+                   max_lat: float, max_lon: float) -> np.ndarray:
+        """Rows inside the bounding box, given the full coordinate arrays."""
+        lat_lo, lon_lo = math.floor(min_lat / self.cell_size), math.floor(min_lon / self.cell_size)
+        lat_hi, lon_hi = math.floor(max_lat / self.cell_size), math.floor(max_lon / self.cell_size)
+        cell_count = (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1)
+
+        if cell_count > len(self.cells):
+            # Zoomed far out: scanning occupied cells beats walking the empty grid
+            candidates = np.array(
+                [row for (cy, cx), members in self.cells.items()
+                 if lat_lo <= cy <= lat_hi and lon_lo <= cx <= lon_hi for row in members],
+                dtype=np.intp
+            )
+        else:
+            candidates = np.array(
+                [row for cy in range(lat_lo, lat_hi + 1) for cx in range(lon_lo, lon_hi + 1)
+                 for row in self.cells.get((cy, cx), ())],
+                dtype=np.intp
+            )
+        if len(candidates) == 0:
+            return candidates
+
+        inside = (
+            (lat[candidates] >= min_lat) & (lat[candidates] <= max_lat)
+            & (lon[candidates] >= min_lon) & (lon[candidates] <= max_lon)
+        )
+        return np.sort(candidates[inside])
+
+    def nearest(self, lat: np.ndarray, lon: np.ndarray, point_lat: float, point_lon: float,
+                k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """The k rows closest to a point and their distances in meters, nearest first.
+
+        Visits occupied cells in order of their ring (Chebyshev cell distance)
+        around the point's cell, stopping once the k-th best distance is closer
+        than any cell not yet visited. Empty cells are never walked.
+        """
+        if not self.cells or k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        center_y = math.floor(point_lat / self.cell_size)
+        center_x = math.floor(point_lon / self.cell_size)
+        keys = list(self.cells.keys())
+        occupied = np.array(keys, dtype=np.int64)
+        rings = np.maximum(np.abs(occupied[:, 0] - center_y), np.abs(occupied[:, 1] - center_x))
+        order = np.argsort(rings, kind="stable")
+
+        # Smallest ground distance covered by one ring of cells
+        meters_per_degree = math.pi * EARTH_RADIUS_M / 180.0
+        widest_lat = min(abs(point_lat) + (int(rings.max()) + 1) * self.cell_size, 89.9)
+        ring_width_m = self.cell_size * meters_per_degree * math.cos(math.radians(widest_lat))
+
+        candidates: List[int] = []
+        best_rows = np.empty(0, dtype=np.intp)
+        best_distances = np.empty(0)
+        current_ring = -1
+        for i in order.tolist():
+            ring = int(rings[i])
+            if ring != current_ring:
+                if len(candidates) >= k:
+                    rows = np.array(candidates, dtype=np.intp)
+                    distances = haversine_m(point_lat, point_lon, lat[rows], lon[rows])
+                    nearest = np.argsort(distances)[:k]
+                    best_rows, best_distances = rows[nearest], distances[nearest]
+                    # Cells from this ring on are at least ring - 1 full cells away
+                    if best_distances[-1] <= (ring - 1) * ring_width_m:
+                        return best_rows, best_distances
+                current_ring = ring
+            candidates.extend(self.cells[keys[i]])
+
+        rows = np.array(candidates, dtype=np.intp)
+        distances = haversine_m(point_lat, point_lon, lat[rows], lon[rows])
+        nearest = np.argsort(distances)[:k]
+        return rows[nearest], distances[nearest]
@@ -0,0 +1,215 @@
+"""
+Wearable telemetry ingestion.
+Accepts GPS and heart-rate readings over HTTP (NDJSON/msgpack) and UDP, and
+applies them to the soldier monitor in batches.
+"""
+
+import asyncio
+import json
+import math
+import threading
+import time
+import logging
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.metrics import telemetry_flush_seconds
+from app.soldier_data import soldier_monitor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Readings buffered before new ones are dropped (backpressure)
+DEFAULT_MAX_PENDING = 100000
+
+# How often (seconds) buffered readings are applied to the soldier monitor
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+DEFAULT_UDP_PORT = 9999
+
+# (id, lat, lon, heart_rate, timestamp), with NaN for missing values
+Reading = Tuple[str, float, float, float, float]
+
+
+def parse_ndjson(body: bytes) -> List[Dict[str, Any]]:
+    """Parse newline-delimited JSON. A single JSON array is also accepted."""
+    text = body.decode("utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def parse_msgpack(body: bytes) -> List[Dict[str, Any]]:
+    """Parse a msgpack array of readings, or a stream of concatenated readings."""
+    import msgpack
+
+    readings = []
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(body)
+    for item in unpacker:
+        if isinstance(item, list):
+            readings.extend(item)
+        else:
+            readings.append(item)
+    return readings
+
+
+def _number(value: Any) -> float:
+    return math.nan if value is None else float(value)
+
+
+class TelemetryIngestor:
+    """Bounded buffer of wearable readings flushed to the soldier monitor in batches.
+
+    ``submit`` validates readings and appends them to a pending buffer; a
+    flusher thread swaps the buffer out every ``flush_interval`` seconds and
+    applies it with one ``apply_readings`` call. When more than
+    ``max_pending`` readings are waiting, new ones are dropped and counted.
+    """
+
+    def __init__(self, monitor, max_pending: int = DEFAULT_MAX_PENDING,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        self.monitor = monitor
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.running = False
+        self.thread = None
+        self._pending: List[Reading] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # Counters
+        self.received = 0
+        self.accepted = 0
+        self.dropped = 0
+        self.invalid = 0
+        self.applied = 0
+        self.unknown = 0
+        self.batches = 0
+
+    def submit(self, readings: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """Queue readings for the next flush. Returns (accepted, dropped)."""
+        parsed = []
+        invalid = 0
+        now = time.time()
+        for reading in readings:
+            try:
+                parsed.append((
+                    str(reading["id"]),
+                    _number(reading.get("lat")),
+                    _number(reading.get("lon")),
+                    _number(reading.get("heart_rate")),
+                    float(reading.get("timestamp") or now)
+                ))
+            except (KeyError, TypeError, ValueError, AttributeError):
+                invalid += 1
+
+        with self._lock:
+            room = max(0, self.max_pending - len(self._pending))
+            accepted = parsed[:room]
+            self._pending.extend(accepted)
+            dropped = len(parsed) - len(accepted)
+            self.received += len(parsed) + invalid
+            self.accepted += len(accepted)
+            self.dropped += dropped
+            self.invalid += invalid
+        return len(accepted), dropped
+
+    def flush(self) -> int:
+        """Apply all pending readings. Returns how many were applied."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        with telemetry_flush_seconds.time():
+            ids, lat, lon, heart_rate, timestamp = zip(*batch)
+            applied = self.monitor.apply_readings(
+                list(ids),
+                np.array(lat, dtype=np.float64),
+                np.array(lon, dtype=np.float64),
+                np.array(heart_rate, dtype=np.float64),
+                np.array(timestamp, dtype=np.float64)
+            )
+        self.applied += applied
+        self.unknown += len(batch) - applied
+        self.batches += 1
+        return applied
+
+    def _flush_loop(self):
+        """Apply buffered readings at a fixed interval."""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Telemetry flush error: {e}")
+
+    def start(self):
+        """Start the flusher thread."""
+        if not self.running:
+            self.running = True
+            self._stop_event.clear()
+            self.thread = threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True)
+            self.thread.start()
+            logger.info("Telemetry ingestion started")
+
+    def stop(self):
+        """Stop the flusher thread, applying anything still buffered."""
+        self.running = False
+        self._stop_event.set()
+        if self.thread:
+            self.thread.join()
+        self.flush()
+        logger.info("Telemetry ingestion stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Ingestion counters."""
+        return {
+            "received": self.received,
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "invalid": self.invalid,
+            "applied": self.applied,
+            "unknown_ids": self.unknown,
+            "batches": self.batches,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending
+        }
+
+
+class TelemetryUDPProtocol(asyncio.DatagramProtocol):
+    """UDP listener for lightweight devices: each datagram holds NDJSON readings."""
+
+    def __init__(self, ingestor: TelemetryIngestor):
+        self.ingestor = ingestor
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        try:
+            readings = parse_ndjson(data)
+        except (ValueError, UnicodeDecodeError):
+            self.ingestor.invalid += 1
+            return
+        self.ingestor.submit(readings)
+
+
+async def start_udp_listener(ingestor: TelemetryIngestor, host: str = "0.0.0.0",
+                             port: int = DEFAULT_UDP_PORT) -> Optional[asyncio.DatagramTransport]:
+    """Start the UDP listener on the running event loop."""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: TelemetryUDPProtocol(ingestor), local_addr=(host, port)
+        )
+    except OSError as e:
+        logger.warning(f"Telemetry UDP listener not started on port {port}: {e}")
+        return None
+    logger.info(f"Telemetry UDP listener on {host}:{port}")
+    return transport
+
+# Global telemetry ingestor instance
+telemetry_ingestor = TelemetryIngestor(soldier_monitor)
@@ -0,0 +1,158 @@
+"""
+Multi-object tracking for video detections.
+Associates each frame's detections with existing tracks by IoU against the
+tracks' predicted boxes, so the same object keeps one id across frames.
+"""
+
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Minimum IoU between a track's predicted box and a detection to match them
+DEFAULT_IOU_THRESHOLD = 0.2
+
+# Detector runs a track may go unmatched (coasting on its prediction) before it is dropped
+DEFAULT_MAX_MISSES = 3
+
+# Smoothing of the velocity estimate (1.0 = use only the latest displacement)
+VELOCITY_GAIN = 0.5
+
+SEVERITY_RANK = {"MEDIUM": 1, "HIGH": 2}
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes."""
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+@dataclass
+class Track:
+    """One tracked object with a constant-velocity motion model."""
+    track_id: int
+    label: str
+    bbox: np.ndarray
+    confidence: float
+    timestamp: float
+    first_seen: float
+    velocity: np.ndarray = field(default_factory=lambda: np.zeros(4))
+    hits: int = 1
+    misses: int = 0
+    alerted_severity: Optional[str] = None
+
+    def predict(self, timestamp: float) -> np.ndarray:
+        """Box extrapolated to timestamp."""
+        return self.bbox + self.velocity * max(0.0, timestamp - self.timestamp)
+
+    def to_detection(self, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Detection dict for this track, at its last update or predicted to timestamp."""
+        bbox = self.bbox if timestamp is None else self.predict(timestamp)
+        return {
+            "label": self.label,
+            "confidence": self.confidence,
+            "bbox": bbox.tolist(),
+            "timestamp": self.timestamp if timestamp is None else timestamp,
+            "track_id": self.track_id,
+            "predicted": self.misses > 0 or timestamp is not None
+        }
+
+
+class Tracker:
+    """IoU tracker for one video stream.
+
+    ``update`` is called with each detector result. Detections are matched
+    greedily (highest IoU first, same label only) to the tracks' predicted
+    boxes. Unmatched detections start new tracks; unmatched tracks coast on
+    their prediction for up to ``max_misses`` detector runs. Between detector
+    runs, ``predict`` propagates the live tracks without running the model.
+    """
+
+    def __init__(self, iou_threshold: float = DEFAULT_IOU_THRESHOLD, max_misses: int = DEFAULT_MAX_MISSES):
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.tracks: List[Track] = []
+        self._next_id = 0
+
+    def reset(self):
+        """Drop all tracks, e.g. when the video loops or the source reconnects."""
+        self.tracks = []
+
+    def update(self, detections: List[Dict[str, Any]], timestamp: float) -> Tuple[List[Track], List[Track]]:
+        """Advance the tracks with a detector result.
+
+        Returns (live tracks, tracks matched or started by this update).
+        """
+        matched_tracks, matched_detections = self._associate(detections, timestamp)
+
+        updated = []
+        for track_index, detection_index in zip(matched_tracks, matched_detections):
+            track = self.tracks[track_index]
+            detection = detections[detection_index]
+            bbox = np.asarray(detection["bbox"], dtype=np.float64)
+            dt = timestamp - track.timestamp
+            if dt > 0:
+                track.velocity += VELOCITY_GAIN * ((bbox - track.bbox) / dt - track.velocity)
+            track.bbox = bbox
+            track.confidence = detection["confidence"]
+            track.timestamp = timestamp
+            track.hits += 1
+            track.misses = 0
+            updated.append(track)
+
+        matched = set(matched_tracks)
+        for index, track in enumerate(self.tracks):
+            if index not in matched:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        assigned = set(matched_detections)
+        for index, detection in enumerate(detections):
+            if index in assigned:
+                continue
+            self._next_id += 1
+            track = Track(
+                track_id=self._next_id,
+                label=detection["label"],
+                bbox=np.asarray(detection["bbox"], dtype=np.float64),
+                confidence=detection["confidence"],
+                timestamp=timestamp,
+                first_seen=timestamp
+            )
+            self.tracks.append(track)
+            updated.append(track)
+
+        return list(self.tracks), updated
+
+    def _associate(self, detections: List[Dict[str, Any]], timestamp: float) -> Tuple[List[int], List[int]]:
+        """Greedy IoU matching of tracks to detections with the same label."""
+        if not self.tracks or not detections:
+            return [], []
+
+        predicted = np.array([track.predict(timestamp) for track in self.tracks])
+        boxes = np.array([detection["bbox"] for detection in detections], dtype=np.float64)
+        scores = iou_matrix(predicted, boxes)
+        track_labels = np.array([track.label for track in self.tracks], dtype=object)
+        detection_labels = np.array([detection["label"] for detection in detections], dtype=object)
+        scores[track_labels[:, None] != detection_labels[None, :]] = 0.0
+
+        matched_tracks, matched_detections = [], []
+        for flat in np.argsort(scores, axis=None)[::-1].tolist():
+            track_index, detection_index = divmod(flat, len(detections))
+            if scores[track_index, detection_index] < self.iou_threshold:
+                break
+            if track_index in matched_tracks or detection_index in matched_detections:
+                continue
+            matched_tracks.append(track_index)
+            matched_detections.append(detection_index)
+        return matched_tracks, matched_detections
+
+    def predict(self, timestamp: float) -> List[Dict[str, Any]]:
+        """Detections for the live tracks, propagated to timestamp."""
+        return [track.to_detection(timestamp) for track in self.tracks]
@@ -0,0 +1,200 @@
+"""
+Annotated video output for dashboards.
+Each stream owns a ``FrameBroadcaster``: frames are annotated and JPEG
+encoded once per quality tier on a dedicated thread, and every viewer of
+that tier is served the same encoded bytes.
+"""
+
+import asyncio
+import threading
+import time
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Output tiers: name -> (maximum width in pixels or None for source width, JPEG quality)
+TIERS: Dict[str, Tuple[Optional[int], int]] = {
+    "high": (None, 85),
+    "medium": (960, 75),
+    "low": (480, 60)
+}
+DEFAULT_TIER = "medium"
+
+# Frames shown between detector passes, per second, while anyone is watching
+DEFAULT_OUTPUT_FPS = 10.0
+
+# Seconds a viewer waits for a new frame before the current one is resent
+# (keeps proxies from closing idle connections)
+KEEPALIVE_INTERVAL = 5.0
+
+BOUNDARY = "frame"
+MJPEG_MEDIA_TYPE = f"multipart/x-mixed-replace; boundary={BOUNDARY}"
+
+# Box colors (BGR): detector boxes and boxes predicted by the tracker
+DETECTED_COLOR = (0, 0, 255)
+PREDICTED_COLOR = (0, 200, 255)
+
+
+def annotate(frame: np.ndarray, detections: Sequence[Dict[str, Any]], scale: float = 1.0):
+    """Draw detection boxes and labels onto a frame in place."""
+    for detection in detections:
+        x1, y1, x2, y2 = (int(round(coord * scale)) for coord in detection["bbox"])
+        color = PREDICTED_COLOR if detection.get("predicted") else DETECTED_COLOR
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        label = f"{detection['label']} {detection['confidence']:.0%}"
+        if detection.get("track_id") is not None:
+            label = f"#{detection['track_id']} {label}"
+        (width, height), baseline = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)
+        top = max(0, y1 - height - baseline - 2)
+        cv2.rectangle(frame, (x1, top), (x1 + width + 4, top + height + baseline + 2), color, -1)
+        cv2.putText(frame, label, (x1 + 2, top + height + 1), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1,
+                    cv2.LINE_AA)
+
+
+class EncodedFrame:
+    """One encoded frame of a tier, with its multipart chunk prebuilt for MJPEG viewers."""
+
+    __slots__ = ("sequence", "jpeg", "chunk", "timestamp")
+
+    def __init__(self, sequence: int, jpeg: bytes, timestamp: float):
+        self.sequence = sequence
+        self.jpeg = jpeg
+        self.timestamp = timestamp
+        self.chunk = (
+            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+            + jpeg + b"\r\n"
+        )
+
+
+class FrameBroadcaster:
+    """Latest annotated frame of one stream, encoded once per tier and fanned out to viewers.
+
+    ``submit`` is called from the decode thread and detector workers; it only
+    stores a reference to the newest frame (older unencoded frames are
+    replaced) and is a no-op while nobody is watching. An encoder thread,
+    started with the first viewer, annotates and encodes the newest frame for
+    each tier that has viewers and wakes the waiting viewers. Slow viewers
+    simply skip frames.
+    """
+
+    def __init__(self, name: str, tiers: Dict[str, Tuple[Optional[int], int]] = TIERS):
+        self.name = name
+        self.tiers = tiers
+        self.frames: Dict[str, EncodedFrame] = {}
+        self.viewers: Dict[str, int] = {tier: 0 for tier in tiers}
+        self.encoded = 0
+        self._sequence = 0
+        self._slot: Optional[Tuple[np.ndarray, Sequence[Dict[str, Any]], float]] = None
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def watched(self) -> bool:
+        return any(self.viewers.values())
+
+    def submit(self, frame: np.ndarray, detections: Sequence[Dict[str, Any]], timestamp: Optional[float] = None):
+        """Offer a frame and the detections drawn on it. The frame must not be modified afterwards."""
+        if not self.watched:
+            return
+        self._slot = (frame, detections, time.time() if timestamp is None else timestamp)
+        self._wake.set()
+
+    def _encode_loop(self):
+        """Encode the newest submitted frame for every watched tier, until nobody is watching."""
+        while True:
+            with self._lock:
+                if not self.watched:
+                    self._thread = None
+                    return
+            if not self._wake.wait(1.0):
+                continue
+            self._wake.clear()
+            slot, self._slot = self._slot, None
+            if slot is None:
+                continue
+            frame, detections, timestamp = slot
+            self._sequence += 1
+            for tier, (max_width, quality) in self.tiers.items():
+                if not self.viewers[tier]:
+                    continue
+                try:
+                    jpeg = self._encode(frame, detections, max_width, quality)
+                except Exception as e:
+                    logger.error(f"[{self.name}] Frame encode error: {e}")
+                    continue
+                self.frames[tier] = EncodedFrame(self._sequence, jpeg, timestamp)
+                self.encoded += 1
+            self._notify()
+
+    @staticmethod
+    def _encode(frame: np.ndarray, detections: Sequence[Dict[str, Any]], max_width: Optional[int],
+                quality: int) -> bytes:
+        height, width = frame.shape[:2]
+        scale = 1.0
+        if max_width and width > max_width:
+            scale = max_width / width
+            image = cv2.resize(frame, (max_width, max(1, int(round(height * scale)))), interpolation=cv2.INTER_AREA)
+        else:
+            image = frame.copy()
+        annotate(image, detections, scale)
+        ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buffer.tobytes()
+
+    def _notify(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def _add_viewer(self, tier: str, waiter: Tuple[asyncio.AbstractEventLoop, asyncio.Event]):
+        with self._lock:
+            self.viewers[tier] += 1
+            self._waiters.add(waiter)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._encode_loop, name=f"encode-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _remove_viewer(self, tier: str, waiter: Tuple[asyncio.AbstractEventLoop, asyncio.Event]):
+        with self._lock:
+            self.viewers[tier] -= 1
+            self._waiters.discard(waiter)
+            if not self.viewers[tier]:
+                # Don't hand a stale frame to the next viewer of this tier
+                self.frames.pop(tier, None)
+
+    async def mjpeg(self, tier: str = DEFAULT_TIER) -> AsyncIterator[bytes]:
+        """Multipart JPEG chunks for one viewer, one per new frame."""
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown tier: {tier}")
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        self._add_viewer(tier, waiter)
+        try:
+            sent = 0
+            while True:
+                event.clear()
+                frame = self.frames.get(tier)
+                if frame is not None and frame.sequence != sent:
+                    sent = frame.sequence
+                    yield frame.chunk
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    if frame is not None:
+                        yield frame.chunk
+        finally:
+            self._remove_viewer(tier, waiter)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"viewers": dict(self.viewers), "frames_encoded": self.encoded}
@@ -0,0 +1,5 @@
+"""
+Offline benchmark suite for the VeerDrishti backend.
+Run from the backend directory with ``python -m benchmarks``; results are
+printed (or written with --output) as JSON for run-to-run comparison.
+"""
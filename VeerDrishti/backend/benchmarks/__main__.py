@@ -0,0 +1,118 @@
+"""
+Run the benchmark suite and emit JSON.
+
+    python -m benchmarks                          # everything, printed to stdout
+    python -m benchmarks --suite soldiers --quick
+    python -m benchmarks --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+
+SUITES = ("video", "soldiers", "api")
+
+# Keys compared between runs, and whether a higher value is better
+COMPARED_SUFFIXES = {"_ms": False, "fps": True, "per_second": True}
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.time(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]):
+    """Print the change of every latency and throughput figure against a baseline run.
+
+    Lines are marked + (better) or - (worse) when they moved by 5% or more.
+    """
+    before, after = flatten(baseline.get("results", {})), flatten(current["results"])
+    for key in sorted(before.keys() & after.keys()):
+        higher_is_better = next((better for suffix, better in COMPARED_SUFFIXES.items() if key.endswith(suffix)), None)
+        if higher_is_better is None or not before[key]:
+            continue
+        change = (after[key] - before[key]) / before[key] * 100.0
+        improved = change > 0 if higher_is_better else change < 0
+        marker = " " if abs(change) < 5 else "+" if improved else "-"
+        print(f"{marker} {key}: {before[key]} -> {after[key]} ({change:+.1f}%)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VeerDrishti offline benchmarks")
+    parser.add_argument("--suite", choices=SUITES, action="append", help="Suite to run (repeatable, default all)")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads for a fast sanity run")
+    parser.add_argument("--backends", nargs="+", help="Detector backends to benchmark (default all)")
+    parser.add_argument("--input-size", type=int, default=640, help="Detector input size")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    # Keep service logs out of the results
+    logging.disable(logging.INFO)
+
+    suites = args.suite or list(SUITES)
+    results: Dict[str, Any] = {}
+
+    if "video" in suites:
+        from app.detectors import BACKENDS
+        from benchmarks import bench_video
+        results["video"] = bench_video.run(
+            backends=args.backends or BACKENDS,
+            frames=60 if args.quick else 300,
+            input_size=args.input_size
+        )
+
+    if "soldiers" in suites:
+        from benchmarks import bench_soldiers
+        results["soldiers"] = bench_soldiers.run(ticks=10 if args.quick else 20)
+
+    if "api" in suites:
+        from benchmarks import bench_api
+        results["api"] = bench_api.run(requests=200 if args.quick else 2000)
+
+    report = {"environment": environment(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
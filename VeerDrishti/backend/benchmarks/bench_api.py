@@ -0,0 +1,99 @@
+"""
+API throughput benchmarks using an in-process ASGI client (no network, no server).
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import httpx
+import numpy as np
+
+from app.alerts import alert_store
+from app.main import app
+from app.soldier_data import soldier_monitor
+from benchmarks.common import summarize
+
+DEFAULT_ENDPOINTS = ("/api/alerts", "/api/soldiers")
+
+
+def seed_state(soldiers: int, alerts: int):
+    """Grow the global soldier fleet and refill the alert store with distinct alerts."""
+    extra = max(0, soldiers - len(soldier_monitor))
+    if extra:
+        first = len(soldier_monitor) + 1
+        rng = np.random.default_rng(0)
+        soldier_monitor.add_soldiers(
+            [f"bench-{i}" for i in range(first, first + extra)],
+            [f"Bench Unit {i}" for i in range(first, first + extra)],
+            28.6139 + rng.normal(0.0, 0.01, extra),
+            77.2090 + rng.normal(0.0, 0.01, extra)
+        )
+    soldier_monitor.step()
+
+    now = time.time()
+    alert_store.clear()
+    alert_store.add_many([
+        {
+            "type": "threat_detection",
+            "message": f"Benchmark alert {i}",
+            "meta": {"label": "person", "confidence": 0.9, "bbox": [i * 64.0, 0.0, i * 64.0 + 32.0, 32.0]},
+            "severity": "HIGH",
+            "timestamp": now - i * 0.01
+        }
+        for i in range(alerts)
+    ], now)
+
+
+async def bench_endpoint(client: httpx.AsyncClient, path: str, requests: int, concurrency: int,
+                         etag: Optional[str] = None) -> Dict[str, Any]:
+    """Issue requests from concurrent workers; with etag, measure 304 revalidation instead."""
+    headers = {"If-None-Match": etag} if etag else {}
+    timings = []
+    statuses: Dict[int, int] = {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            timings.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(timings)
+    stats.pop("per_second")
+    stats.update({
+        "requests_per_second": round(len(timings) / elapsed, 1),
+        "concurrency": concurrency,
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())}
+    })
+    return stats
+
+
+async def _run(endpoints: Sequence[str], requests: int, concurrency: int) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in endpoints:
+            await client.get(path)  # warm the response caches
+            etag = (await client.get(path)).headers.get("etag")
+            results[path] = {"full": await bench_endpoint(client, path, requests, concurrency)}
+            if etag:
+                results[path]["not_modified"] = await bench_endpoint(client, path, requests, concurrency, etag)
+    return results
+
+
+def run(endpoints: Sequence[str] = DEFAULT_ENDPOINTS, requests: int = 2000, concurrency: int = 32,
+        soldiers: int = 1000, alerts: int = 1000) -> Dict[str, Any]:
+    seed_state(soldiers, alerts)
+    return {
+        "soldiers": len(soldier_monitor),
+        "alerts": len(alert_store),
+        "endpoints": asyncio.run(_run(endpoints, requests, concurrency))
+    }
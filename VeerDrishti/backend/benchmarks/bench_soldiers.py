@@ -0,0 +1,48 @@
+"""
+Soldier simulation benchmarks: tick cost and snapshot serialization by fleet size.
+"""
+
+import time
+from typing import Any, Dict, Sequence
+
+from app.soldier_data import SoldierMonitor
+from benchmarks.common import summarize
+
+DEFAULT_SIZES = (10, 1000, 50000)
+
+
+def bench_fleet(count: int, ticks: int) -> Dict[str, Any]:
+    monitor = SoldierMonitor(count=count, seed=0)
+    # Simulated clock at the real one-second tick rate, so status dwell and
+    # warning cooldowns behave as they do in service
+    now = time.time()
+    monitor.step(now)  # warm-up
+
+    timings = []
+    for tick in range(1, ticks + 1):
+        start = time.perf_counter()
+        monitor.step(now + tick)
+        timings.append(time.perf_counter() - start)
+
+    # First read of a version materializes and serializes the snapshot; later reads are cached
+    snapshot = monitor.snapshot
+    start = time.perf_counter()
+    body = snapshot.body("soldiers")
+    first_read = time.perf_counter() - start
+    start = time.perf_counter()
+    snapshot.body("soldiers")
+    cached_read = time.perf_counter() - start
+
+    stats = summarize(timings)
+    stats.pop("per_second")
+    stats.update({
+        "soldiers": len(monitor),
+        "snapshot_first_read_ms": round(first_read * 1000.0, 3),
+        "snapshot_cached_read_ms": round(cached_read * 1000.0, 4),
+        "snapshot_bytes": len(body)
+    })
+    return stats
+
+
+def run(sizes: Sequence[int] = DEFAULT_SIZES, ticks: int = 20) -> Dict[str, Any]:
+    return {str(count): bench_fleet(count, ticks) for count in sizes}
@@ -0,0 +1,80 @@
+"""
+Video benchmarks: decode throughput and per-backend detector latency.
+"""
+
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence
+
+import cv2
+
+from app.detectors import BACKENDS, DetectorConfig, load_detector
+from app.inference import Watchlist
+from app.motion import MotionEngine
+from benchmarks.common import summarize
+from benchmarks.synthetic import moving_shapes, write_video
+
+
+def bench_decode(width: int, height: int, frames: int) -> Dict[str, Any]:
+    """Full decode (read) versus grab-only throughput on a synthetic MJPEG file."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_video(os.path.join(directory, "synthetic.avi"), width, height, frames)
+        results = {}
+        for mode in ("read", "grab"):
+            cap = cv2.VideoCapture(path)
+            timings = []
+            while True:
+                start = time.perf_counter()
+                ok = cap.read()[0] if mode == "read" else cap.grab()
+                if not ok:
+                    break
+                timings.append(time.perf_counter() - start)
+            cap.release()
+            results[mode] = summarize(timings)
+        return results
+
+
+def bench_detector(backend: str, frames: List, batch_size: int, input_size: int) -> Dict[str, Any]:
+    """Latency per detector call and frames per second for one backend."""
+    config = DetectorConfig(backend=backend, input_size=input_size)
+    load_start = time.perf_counter()
+    detector = load_detector(config, Watchlist())
+    load_seconds = time.perf_counter() - load_start
+    if detector.name != backend:
+        return {"skipped": f"{backend} backend could not be loaded"}
+
+    batch_size = batch_size if detector.supports_batching else 1
+    motion = MotionEngine()
+    timings = []
+    detections = 0
+    for start_index in range(0, len(frames), batch_size):
+        batch = frames[start_index:start_index + batch_size]
+        start = time.perf_counter()
+        results = detector.detect_batch(batch, [motion] * len(batch))
+        timings.append(time.perf_counter() - start)
+        detections += sum(len(result) for result in results)
+
+    stats = summarize(timings, items_per_sample=len(frames) / max(1, len(timings)))
+    stats["fps"] = stats.pop("per_second")
+    stats.update({
+        "model": config.key,
+        "batch_size": batch_size,
+        "load_seconds": round(load_seconds, 3),
+        "errors": detector.latency.errors,
+        "detections_per_frame": round(detections / len(frames), 2)
+    })
+    return stats
+
+
+def run(backends: Sequence[str] = BACKENDS, width: int = 640, height: int = 480, frames: int = 300,
+        batch_size: int = 4, input_size: int = 640) -> Dict[str, Any]:
+    frame_list = list(moving_shapes(width, height, frames))
+    return {
+        "resolution": f"{width}x{height}",
+        "frames": frames,
+        "decode": bench_decode(width, height, frames),
+        "detectors": {
+            backend: bench_detector(backend, frame_list, batch_size, input_size) for backend in backends
+        }
+    }
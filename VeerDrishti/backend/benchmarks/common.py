@@ -0,0 +1,22 @@
+"""
+Shared helpers for summarizing benchmark samples.
+"""
+
+import numpy as np
+from typing import Any, Dict, Sequence
+
+
+def summarize(seconds: Sequence[float], items_per_sample: float = 1.0) -> Dict[str, Any]:
+    """Latency percentiles (ms) and throughput for a list of per-call timings."""
+    samples = np.asarray(seconds, dtype=np.float64)
+    if len(samples) == 0:
+        return {"samples": 0}
+    total = float(samples.sum())
+    return {
+        "samples": int(len(samples)),
+        "mean_ms": round(float(samples.mean()) * 1000.0, 3),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000.0, 3),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000.0, 3),
+        "max_ms": round(float(samples.max()) * 1000.0, 3),
+        "per_second": round(len(samples) * items_per_sample / total, 1) if total > 0 else None
+    }
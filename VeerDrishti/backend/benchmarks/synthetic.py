@@ -0,0 +1,51 @@
+"""
+Synthetic test video: moving rectangles and circles on a textured background.
+Deterministic for a given seed, so runs are comparable without sample files.
+"""
+
+import cv2
+import numpy as np
+from typing import Iterator
+
+
+def moving_shapes(width: int = 640, height: int = 480, frames: int = 300, shapes: int = 4,
+                  seed: int = 0) -> Iterator[np.ndarray]:
+    """Yield BGR frames with shapes bouncing around the frame."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(40, 80, (height, width, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(background, (9, 9), 0)
+
+    sizes = rng.integers(min(width, height) // 12, min(width, height) // 5, shapes)
+    position = rng.uniform(0, 1, (shapes, 2)) * [width - sizes.max(), height - sizes.max()]
+    velocity = rng.uniform(-8, 8, (shapes, 2))
+    colors = rng.integers(120, 255, (shapes, 3)).tolist()
+
+    for _ in range(frames):
+        frame = background.copy()
+        position += velocity
+        for i in range(shapes):
+            limit = [width - sizes[i], height - sizes[i]]
+            for axis in range(2):
+                if not 0 <= position[i, axis] <= limit[axis]:
+                    velocity[i, axis] = -velocity[i, axis]
+                    position[i, axis] = np.clip(position[i, axis], 0, limit[axis])
+            x, y, size = int(position[i, 0]), int(position[i, 1]), int(sizes[i])
+            if i % 2:
+                cv2.circle(frame, (x + size // 2, y + size // 2), size // 2, colors[i], -1)
+            else:
+                cv2.rectangle(frame, (x, y), (x + size, y + size), colors[i], -1)
+        yield frame
+
+
+def write_video(path: str, width: int = 640, height: int = 480, frames: int = 300, fps: float = 30.0,
+                shapes: int = 4, seed: int = 0) -> str:
+    """Write a synthetic MJPEG AVI and return its path."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    try:
+        for frame in moving_shapes(width, height, frames, shapes, seed):
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
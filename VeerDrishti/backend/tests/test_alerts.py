@@ -0,0 +1,91 @@
+"""
+Tests for the in-memory alert store: dedup keys and per-type eviction.
+"""
+
+from app.alerts import AlertStore
+
+NOW = 1700000000.0
+
+
+def threat(timestamp, bbox=(100, 100, 200, 200), label="person", severity="HIGH"):
+    return {
+        "type": "threat_detection",
+        "message": f"Threat detected: {label}",
+        "meta": {"label": label, "confidence": 0.9, "bbox": list(bbox)},
+        "severity": severity,
+        "timestamp": timestamp
+    }
+
+
+def warning(soldier_id, timestamp):
+    return {
+        "type": "soldier_warning",
+        "message": f"WARNING: {soldier_id} shows concerning vital signs",
+        "meta": {"soldier_id": soldier_id},
+        "severity": "MEDIUM",
+        "timestamp": timestamp
+    }
+
+
+def test_near_identical_alerts_are_stored_once():
+    store = AlertStore()
+    assert store.add(threat(NOW), now=NOW)
+    # Same label, bbox within one quantum, same time bucket
+    assert not store.add(threat(NOW + 1, bbox=(105, 110, 210, 205)), now=NOW + 1)
+    assert len(store) == 1
+
+
+def test_escalation_and_new_bucket_are_not_duplicates():
+    store = AlertStore(time_bucket=5.0)
+    assert store.add(threat(NOW, severity="MEDIUM"), now=NOW)
+    assert store.add(threat(NOW, severity="HIGH"), now=NOW)
+    assert store.add(threat(NOW + 5), now=NOW + 5)
+    assert len(store) == 3
+
+
+def test_add_many_assigns_ids_and_drops_duplicates_within_the_batch():
+    store = AlertStore()
+    accepted = store.add_many([warning("soldier-1", NOW), warning("soldier-1", NOW), warning("soldier-2", NOW)],
+                              now=NOW)
+    assert [alert["meta"]["soldier_id"] for alert in accepted] == ["soldier-1", "soldier-2"]
+    assert len({alert["id"] for alert in accepted}) == 2
+
+
+def test_flood_of_one_type_does_not_evict_another():
+    store = AlertStore(capacity=100, capacities={"soldier_warning": 10})
+    store.add(threat(NOW), now=NOW)
+    store.add_many([warning(f"soldier-{i}", NOW + 1) for i in range(50)], now=NOW + 1)
+
+    assert len(store) == 11
+    types = [alert["type"] for alert in store.latest(100)]
+    assert types.count("threat_detection") == 1
+    assert types.count("soldier_warning") == 10
+
+
+def test_capacity_evicts_oldest_and_frees_its_dedup_key():
+    store = AlertStore(capacities={"soldier_warning": 2})
+    for i in range(3):
+        store.add(warning(f"soldier-{i}", NOW + i), now=NOW + i)
+    assert [alert["meta"]["soldier_id"] for alert in store.latest(10)] == ["soldier-2", "soldier-1"]
+    # soldier-0 was evicted, so an alert with its dedup key (same time bucket) is accepted again
+    assert store.add(warning("soldier-0", NOW + 3), now=NOW + 3)
+
+
+def test_window_expiry():
+    store = AlertStore(window=60.0)
+    store.add(threat(NOW), now=NOW)
+    store.add(threat(NOW + 30, label="vehicle"), now=NOW + 30)
+    assert store.expire(now=NOW + 61) == 1
+    assert [alert["meta"]["label"] for alert in store.latest(10)] == ["vehicle"]
+    # Already outside the window on arrival
+    assert not store.add(threat(NOW, label="drone"), now=NOW + 61)
+
+
+def test_queries_merge_types_newest_first():
+    store = AlertStore()
+    store.add(threat(NOW), now=NOW + 3)
+    store.add(warning("soldier-1", NOW + 2), now=NOW + 3)
+    store.add(threat(NOW + 1, label="vehicle"), now=NOW + 3)
+
+    assert [alert["timestamp"] for alert in store.latest(10)] == [NOW + 2, NOW + 1, NOW]
+    assert [alert["timestamp"] for alert in store.since(NOW)] == [NOW + 2, NOW + 1]
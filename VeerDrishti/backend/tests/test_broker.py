@@ -0,0 +1,75 @@
+"""
+Tests for the engine/API worker wire format: length-prefixed frames with a
+JSON header and an optional binary body.
+"""
+
+import socket
+import threading
+
+import pytest
+
+from app.broker import _frame, _parse_address, _read_frame
+
+
+@pytest.fixture
+def sockets():
+    left, right = socket.socketpair()
+    yield left, right
+    left.close()
+    right.close()
+
+
+def test_frame_round_trip(sockets):
+    writer, reader = sockets
+    header = {"type": "state", "topic": "soldiers", "version": 7}
+    body = bytes(range(256)) * 4
+    writer.sendall(_frame(header, body))
+    assert _read_frame(reader) == (header, body)
+
+
+def test_frame_without_body(sockets):
+    writer, reader = sockets
+    writer.sendall(_frame({"type": "hello"}))
+    assert _read_frame(reader) == ({"type": "hello"}, b"")
+
+
+def test_consecutive_frames_keep_their_boundaries(sockets):
+    writer, reader = sockets
+    writer.sendall(_frame({"n": 1}, b"a") + _frame({"n": 2}) + _frame({"n": 3}, b"ccc"))
+    assert [_read_frame(reader) for _ in range(3)] == [({"n": 1}, b"a"), ({"n": 2}, b""), ({"n": 3}, b"ccc")]
+
+
+def test_frame_split_across_sends(sockets):
+    writer, reader = sockets
+    data = _frame({"type": "state"}, b"x" * 100000)
+
+    def send_in_pieces():
+        for start in range(0, len(data), 997):
+            writer.sendall(data[start:start + 997])
+
+    sender = threading.Thread(target=send_in_pieces)
+    sender.start()
+    header, body = _read_frame(reader)
+    sender.join()
+    assert header == {"type": "state"}
+    assert body == b"x" * 100000
+
+
+@pytest.mark.parametrize("cut", [3, 12, 22])
+def test_short_read_raises_connection_error(sockets, cut):
+    writer, reader = sockets
+    # Cut inside the length prefix, the header and the body respectively
+    data = _frame({"type": "x"}, b"body")
+    writer.sendall(data[:cut])
+    writer.shutdown(socket.SHUT_WR)
+    with pytest.raises(ConnectionError):
+        _read_frame(reader)
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("127.0.0.1:9000", ("127.0.0.1", 9000)),
+    (":9000", ("127.0.0.1", 9000)),
+    ("engine.local:7000", ("engine.local", 7000)),
+])
+def test_parse_address(address, expected):
+    assert _parse_address(address) == expected
@@ -0,0 +1,116 @@
+"""
+Tests for ROI and tile planning and for merging tile detections back into
+frame-level detections.
+"""
+
+import numpy as np
+import pytest
+
+from app.regions import RegionConfig, RegionPlanner, merge_detections
+
+# Left half of the frame
+LEFT_HALF = [[[0.0, 0.0], [0.5, 0.0], [0.5, 1.0], [0.0, 1.0]]]
+
+
+def frame(width=1920, height=1080):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+
+def detection(bbox, confidence=0.9, label="person"):
+    return {"label": label, "confidence": confidence, "bbox": list(bbox)}
+
+
+def test_tiles_cover_the_frame_with_overlap():
+    planner = RegionPlanner(RegionConfig(tile_size=640, tile_overlap=0.2, full_frame=False))
+    crops = planner.plan(frame())
+
+    assert all(x2 - x1 <= 640 and y2 - y1 <= 640 for x1, y1, x2, y2 in crops)
+    # Last tiles are flush with the frame edges
+    assert max(x2 for _, _, x2, _ in crops) == 1920
+    assert max(y2 for _, _, _, y2 in crops) == 1080
+    coverage = np.zeros((1080, 1920), dtype=np.int32)
+    for x1, y1, x2, y2 in crops:
+        coverage[y1:y2, x1:x2] += 1
+    assert coverage.min() >= 1
+    assert coverage.max() > 1
+
+
+def test_full_frame_pass_comes_first():
+    crops = RegionPlanner(RegionConfig(tile_size=640)).plan(frame())
+    assert crops[0] == (0, 0, 1920, 1080)
+    assert len(crops) > 2
+
+
+def test_tiles_are_limited_to_the_roi():
+    planner = RegionPlanner(RegionConfig.from_polygons(LEFT_HALF, tile_size=320, full_frame=False))
+    crops = planner.plan(frame())
+    assert crops
+    assert all(x1 < 960 for x1, _, _, _ in crops)
+    assert max(x2 for _, _, x2, _ in crops) <= 960
+
+
+def test_roi_without_tiles_crops_to_its_bounding_box():
+    planner = RegionPlanner(RegionConfig.from_polygons(LEFT_HALF))
+    assert planner.plan(frame()) == [(0, 0, 960, 1080)]
+
+
+def test_motion_gating_keeps_tiles_with_motion_inside_the_roi():
+    planner = RegionPlanner(RegionConfig.from_polygons(LEFT_HALF, tile_size=320, full_frame=False,
+                                                       motion_gated=True))
+    image = frame()
+    assert planner.plan(image, np.empty((0, 4), dtype=np.float32)) == []
+    # Motion only outside the ROI
+    assert planner.plan(image, np.array([[1500, 500, 1600, 600]], dtype=np.float32)) == []
+    crops = planner.plan(image, np.array([[100, 100, 150, 150]], dtype=np.float32))
+    assert crops
+    assert all(x1 < 150 and y1 < 150 and x2 > 100 and y2 > 100 for x1, y1, x2, y2 in crops)
+
+
+def test_motion_gating_without_tiles_ignores_motion_outside_the_roi():
+    planner = RegionPlanner(RegionConfig.from_polygons(LEFT_HALF, motion_gated=True))
+    image = frame()
+    assert planner.plan(image, np.array([[1500, 500, 1600, 600]], dtype=np.float32)) == []
+    assert planner.plan(image, np.array([[100, 100, 150, 150]], dtype=np.float32)) == [(0, 0, 960, 1080)]
+
+
+def test_merge_maps_crop_detections_to_frame_coordinates():
+    planner = RegionPlanner(RegionConfig(tile_size=640))
+    image = frame()
+    crops = [(0, 0, 1920, 1080), (640, 400, 1280, 1040)]
+    planner.plan(image)
+    merged = planner.merge(crops, [[], [detection((10, 20, 30, 40))]])
+    assert merged[0]["bbox"] == [650, 420, 670, 440]
+
+
+def test_merge_drops_detections_centered_outside_the_roi():
+    planner = RegionPlanner(RegionConfig.from_polygons(LEFT_HALF))
+    image = frame()
+    crops = planner.plan(image)
+    merged = planner.merge(crops, [[detection((100, 100, 200, 200)), detection((900, 100, 1100, 200))]])
+    assert [item["bbox"] for item in merged] == [[100, 100, 200, 200]]
+
+
+def test_nms_keeps_the_most_confident_duplicate_unchanged():
+    merged = merge_detections([
+        detection((100, 100, 200, 200), confidence=0.6),
+        detection((105, 100, 205, 200), confidence=0.9),
+    ])
+    assert merged == [detection((105, 100, 205, 200), confidence=0.9)]
+
+
+def test_nms_keeps_adjacent_objects_and_other_labels_apart():
+    detections = [
+        detection((100, 100, 200, 200)),
+        # Neighbour touching across a tile seam: low IoU, must not be fused
+        detection((180, 100, 280, 200), confidence=0.8),
+        detection((100, 100, 200, 200), confidence=0.7, label="car"),
+    ]
+    merged = merge_detections(detections)
+    assert len(merged) == 3
+    assert sorted(tuple(item["bbox"]) for item in merged) == sorted(tuple(item["bbox"]) for item in detections)
+
+
+@pytest.mark.parametrize("count", [0, 1])
+def test_nms_passes_through_trivial_input(count):
+    detections = [detection((0, 0, 10, 10))][:count]
+    assert merge_detections(detections) == detections
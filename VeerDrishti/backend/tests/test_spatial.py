@@ -0,0 +1,91 @@
+"""
+Tests for the soldier grid index: incremental updates, bounding box queries
+and nearest-neighbour search across cell rings, checked against brute force.
+"""
+
+import numpy as np
+import pytest
+
+from app.spatial import GridIndex, haversine_m
+
+CELL_SIZE = 0.005
+
+
+def build(lat, lon, cell_size=CELL_SIZE):
+    index = GridIndex(cell_size)
+    index.update(np.arange(len(lat)), lat, lon)
+    return index
+
+
+def brute_force_nearest(lat, lon, point_lat, point_lon, k):
+    distances = haversine_m(point_lat, point_lon, lat, lon)
+    order = np.argsort(distances)[:k]
+    return order, distances[order]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    lat = 28.6 + rng.uniform(-0.05, 0.05, 2000)
+    lon = 77.2 + rng.uniform(-0.05, 0.05, 2000)
+    index = build(lat, lon)
+    for point_lat, point_lon in rng.uniform([28.55, 77.15], [28.65, 77.25], (20, 2)).tolist():
+        rows, distances = index.nearest(lat, lon, point_lat, point_lon, 10)
+        expected_rows, expected_distances = brute_force_nearest(lat, lon, point_lat, point_lon, 10)
+        np.testing.assert_allclose(distances, expected_distances)
+        assert set(rows.tolist()) == set(expected_rows.tolist())
+
+
+def test_nearest_reaches_past_empty_rings():
+    # One soldier right next to the point, the rest several cells away
+    lat = np.array([28.6000, 28.6400, 28.6410, 28.5600])
+    lon = np.array([77.2000, 77.2400, 77.2410, 77.1600])
+    index = build(lat, lon)
+    rows, distances = index.nearest(lat, lon, 28.6001, 77.2001, 3)
+    expected_rows, expected_distances = brute_force_nearest(lat, lon, 28.6001, 77.2001, 3)
+    assert rows.tolist() == expected_rows.tolist()
+    np.testing.assert_allclose(distances, expected_distances)
+
+
+def test_nearest_prefers_a_closer_point_in_an_outer_ring():
+    # The point sits at the edge of its cell: the neighbour across the cell
+    # boundary is closer than the only other soldier in its own cell
+    point_lat, point_lon = 28.6049, 77.2001
+    lat = np.array([28.6001, 28.6051])
+    lon = np.array([77.2001, 77.2001])
+    index = build(lat, lon)
+    rows, _ = index.nearest(lat, lon, point_lat, point_lon, 1)
+    assert rows.tolist() == [1]
+
+
+def test_nearest_with_fewer_rows_than_k():
+    lat = np.array([28.60, 28.61])
+    lon = np.array([77.20, 77.21])
+    rows, distances = build(lat, lon).nearest(lat, lon, 28.60, 77.20, 5)
+    assert rows.tolist() == [0, 1]
+    assert distances[0] == pytest.approx(0.0)
+
+
+def test_update_moves_rows_between_cells():
+    lat = np.array([28.6001, 28.6001])
+    lon = np.array([77.2001, 77.2001])
+    index = build(lat, lon)
+    assert len(index.cells) == 1
+
+    lat[1] += 3 * CELL_SIZE
+    index.update(np.array([0, 1]), lat, lon)
+    assert len(index.cells) == 2
+    assert index.query_bbox(lat, lon, 28.61, 77.19, 28.62, 77.21).tolist() == [1]
+    rows, _ = index.nearest(lat, lon, lat[1], lon[1], 1)
+    assert rows.tolist() == [1]
+
+
+def test_query_bbox_matches_brute_force():
+    rng = np.random.default_rng(7)
+    lat = 28.6 + rng.uniform(-0.05, 0.05, 3000)
+    lon = 77.2 + rng.uniform(-0.05, 0.05, 3000)
+    index = build(lat, lon)
+    for bbox in ((28.58, 77.18, 28.6, 77.21), (28.0, 77.0, 29.0, 78.0), (28.7, 77.3, 28.8, 77.4)):
+        min_lat, min_lon, max_lat, max_lon = bbox
+        expected = np.flatnonzero((lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon))
+        assert index.query_bbox(lat, lon, *bbox).tolist() == expected.tolist()
@@ -0,0 +1,81 @@
+"""
+Tests for the IoU tracker: track id continuity and expiry.
+"""
+
+from app.tracking import Tracker
+
+
+def detection(bbox, label="person", confidence=0.9):
+    return {"label": label, "confidence": confidence, "bbox": list(bbox)}
+
+
+def track_ids(tracks):
+    return sorted(track.track_id for track in tracks)
+
+
+def test_moving_object_keeps_its_track_id():
+    tracker = Tracker()
+    _, started = tracker.update([detection((100, 100, 150, 200))], 0.0)
+    track_id = started[0].track_id
+    for step in range(1, 6):
+        x = 100 + 10 * step
+        live, updated = tracker.update([detection((x, 100, x + 50, 200))], float(step))
+        assert [track.track_id for track in updated] == [track_id]
+        assert track_ids(live) == [track_id]
+
+
+def test_objects_are_tracked_separately_and_by_label():
+    tracker = Tracker()
+    tracker.update([detection((0, 0, 50, 50)), detection((300, 300, 350, 350))], 0.0)
+    first = track_ids(tracker.tracks)
+
+    # Same boxes, but the second object is now a different class
+    live, updated = tracker.update(
+        [detection((2, 0, 52, 50)), detection((300, 300, 350, 350), label="car")], 1.0
+    )
+    assert first[0] in track_ids(updated)
+    assert first[1] not in track_ids(updated)
+    assert len(live) == 3
+
+
+def test_velocity_prediction_bridges_a_gap():
+    tracker = Tracker()
+    tracker.update([detection((0, 0, 40, 40))], 0.0)
+    tracker.update([detection((20, 0, 60, 40))], 1.0)
+    track_id = tracker.tracks[0].track_id
+
+    # Missed for one run, then seen beyond its last box but where the motion model expects it
+    tracker.update([], 2.0)
+    _, updated = tracker.update([detection((60, 0, 100, 40))], 3.0)
+    assert [track.track_id for track in updated] == [track_id]
+
+
+def test_unmatched_track_expires_after_max_misses():
+    tracker = Tracker(max_misses=2)
+    tracker.update([detection((0, 0, 50, 50))], 0.0)
+    for step in (1.0, 2.0):
+        live, _ = tracker.update([], step)
+        assert len(live) == 1
+        assert live[0].misses == step
+    live, _ = tracker.update([], 3.0)
+    assert live == []
+
+
+def test_expired_object_gets_a_new_id_and_ids_are_not_reused():
+    tracker = Tracker(max_misses=0)
+    _, started = tracker.update([detection((0, 0, 50, 50))], 0.0)
+    old_id = started[0].track_id
+    tracker.update([], 1.0)
+    _, started = tracker.update([detection((0, 0, 50, 50))], 2.0)
+    assert started[0].track_id > old_id
+
+
+def test_predict_propagates_live_tracks():
+    tracker = Tracker()
+    tracker.update([detection((0, 0, 10, 10))], 0.0)
+    tracker.update([detection((5, 0, 15, 10))], 1.0)
+    predicted = tracker.predict(2.0)
+    assert len(predicted) == 1
+    assert predicted[0]["predicted"]
+    # Velocity is smoothed, so the box moves forward but not the full step
+    assert 5 < predicted[0]["bbox"][0] < 10
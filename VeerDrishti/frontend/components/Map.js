@@ -1,8 +1,52 @@
-import { useEffect, useRef } from 'react'
+import { useEffect, useRef, useState } from 'react'
 
-export default function Map({ soldiers = [] }) {
+const API_URL = 'http://localhost:8000'
+const DEFAULT_CENTER = { lat: 28.6143, lon: 77.2098 }
+const DEFAULT_SPAN = 0.004 // degrees shown across the map
+const REFRESH_MS = 2000
+
+export default function Map({ center = DEFAULT_CENTER }) {
   const mapRef = useRef(null)
-  const mapInstanceRef = useRef(null)
+  const [view, setView] = useState({ ...center, span: DEFAULT_SPAN })
+  const [soldiers, setSoldiers] = useState([])
+
+  const bounds = {
+    minLat: view.lat - view.span / 2,
+    maxLat: view.lat + view.span / 2,
+    minLon: view.lon - view.span / 2,
+    maxLon: view.lon + view.span / 2,
+  }
+
+  // Only fetch soldiers inside the visible viewport
+  useEffect(() => {
+    let cancelled = false
+
+    const fetchViewport = async () => {
+      try {
+        const params = new URLSearchParams({
+          min_lat: bounds.minLat,
+          min_lon: bounds.minLon,
+          max_lat: bounds.maxLat,
+          max_lon: bounds.maxLon,
+        })
+        const res = await fetch(`${API_URL}/api/soldiers/viewport?${params}`)
+        if (res.ok && !cancelled) {
+          const data = await res.json()
+          setSoldiers(data.soldiers || [])
+        }
+      } catch (error) {
+        console.error('Error fetching viewport:', error)
+      }
+    }
+
+    fetchViewport()
+    const interval = setInterval(fetchViewport, REFRESH_MS)
+
+    return () => {
+      cancelled = true
+      clearInterval(interval)
+    }
+  }, [view.lat, view.lon, view.span])
 
   useEffect(() => {
     // Simple static map implementation
@@ -10,11 +54,11 @@ export default function Map({ soldiers = [] }) {
     if (mapRef.current && soldiers.length > 0) {
       // Clear previous content
       mapRef.current.innerHTML = ''
-      
+
       // Create a simple grid-based map representation
       const mapContainer = document.createElement('div')
       mapContainer.className = 'w-full h-48 bg-green-100 border-2 border-green-300 rounded-lg relative overflow-hidden'
-      
+
       // Add grid lines
       for (let i = 0; i < 10; i++) {
         const line = document.createElement('div')
@@ -30,52 +74,69 @@ export default function Map({ soldiers = [] }) {
         }
         mapContainer.appendChild(line)
       }
-      
-      // Add soldier markers
-      soldiers.forEach((soldier, index) => {
+
+      // Add soldier markers at their GPS position within the viewport
+      soldiers.forEach((soldier) => {
         const marker = document.createElement('div')
         marker.className = `absolute w-4 h-4 rounded-full border-2 ${
           soldier.status === 'CRITICAL' ? 'bg-red-500 border-red-700' :
           soldier.status === 'AT_RISK' ? 'bg-yellow-500 border-yellow-700' :
           'bg-green-500 border-green-700'
         }`
-        
-        // Position markers in a grid pattern
-        const x = (index % 3) * 30 + 15 // 3 columns
-        const y = Math.floor(index / 3) * 30 + 15 // rows
+
+        const x = ((soldier.gps.lon - bounds.minLon) / view.span) * 100
+        const y = ((bounds.maxLat - soldier.gps.lat) / view.span) * 100
         marker.style.left = `${x}%`
         marker.style.top = `${y}%`
+        marker.style.transform = 'translate(-50%, -50%)'
         marker.title = `${soldier.name} (${soldier.status})`
-        
+
         mapContainer.appendChild(marker)
       })
-      
+
       // Add title
       const title = document.createElement('div')
       title.className = 'absolute top-2 left-2 bg-white px-2 py-1 rounded text-xs font-medium shadow'
-      title.textContent = 'Soldier Positions'
+      title.textContent = `Soldier Positions (${soldiers.length})`
       mapContainer.appendChild(title)
-      
+
       mapRef.current.appendChild(mapContainer)
     }
   }, [soldiers])
 
+  const zoom = (factor) => setView(prev => ({ ...prev, span: prev.span * factor }))
+  const pan = (dLat, dLon) => setView(prev => ({
+    ...prev,
+    lat: prev.lat + dLat * prev.span / 4,
+    lon: prev.lon + dLon * prev.span / 4,
+  }))
+
   return (
     <div className="space-y-4">
-      <div className="text-sm font-medium text-gray-700">Tactical Map</div>
-      
+      <div className="flex items-center justify-between">
+        <div className="text-sm font-medium text-gray-700">Tactical Map</div>
+        <div className="flex space-x-1 text-xs">
+          <button className="px-2 py-1 border rounded" onClick={() => pan(1, 0)}>↑</button>
+          <button className="px-2 py-1 border rounded" onClick={() => pan(-1, 0)}>↓</button>
+          <button className="px-2 py-1 border rounded" onClick={() => pan(0, -1)}>←</button>
+          <button className="px-2 py-1 border rounded" onClick={() => pan(0, 1)}>→</button>
+          <button className="px-2 py-1 border rounded" onClick={() => zoom(0.5)}>+</button>
+          <button className="px-2 py-1 border rounded" onClick={() => zoom(2)}>−</button>
+        </div>
+      </div>
+
       {/* Map Container */}
       <div ref={mapRef} className="w-full h-48">
         {soldiers.length === 0 && (
           <div className="w-full h-48 bg-gray-100 border-2 border-gray-300 rounded-lg flex items-center justify-center">
             <div className="text-center text-gray-500">
               <div className="text-2xl mb-2">🗺️</div>
-              <p className="text-sm">No soldier data</p>
+              <p className="text-sm">No soldiers in view</p>
             </div>
           </div>
         )}
       </div>
-      
+
       {/* Legend */}
       <div className="grid grid-cols-3 gap-2 text-xs">
         <div className="flex items-center space-x-1">
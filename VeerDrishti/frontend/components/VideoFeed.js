@@ -1,73 +1,38 @@
-import { useState, useEffect, useRef } from 'react'
+import { useState } from 'react'
 
-export default function VideoFeed({ detections }) {
-  const videoRef = useRef(null)
-  const [videoLoaded, setVideoLoaded] = useState(false)
+const API_URL = 'http://localhost:8000'
 
-  useEffect(() => {
-    const video = videoRef.current
-    if (video) {
-      video.addEventListener('loadeddata', () => setVideoLoaded(true))
-      video.addEventListener('error', () => {
-        console.log('Video failed to load, using placeholder')
-        setVideoLoaded(false)
-      })
-    }
-  }, [])
+// Annotated MJPEG from the backend: boxes are drawn server-side on the exact
+// frames that were analyzed, so they always line up with the video
+export default function VideoFeed({ detections, streamId = 'default', tier = 'medium' }) {
+  const [videoLoaded, setVideoLoaded] = useState(false)
+  const [videoFailed, setVideoFailed] = useState(false)
 
   return (
     <div className="relative">
       {/* Video Container */}
       <div className="relative bg-gray-900 rounded-lg overflow-hidden">
-        <video
-          ref={videoRef}
-          className="w-full h-64 object-cover"
-          autoPlay
-          loop
-          muted
-          playsInline
-        >
-          <source src="/sample_videos/demo1.mp4" type="video/mp4" />
-          Your browser does not support the video tag.
-        </video>
-
-        {/* Video Overlay for Detection Boxes */}
-        {videoLoaded && detections.length > 0 && (
-          <div className="video-overlay">
-            {detections.map((detection, index) => {
-              const { bbox, label, confidence } = detection
-              const [x1, y1, x2, y2] = bbox
-              const width = x2 - x1
-              const height = y2 - y1
-
-              return (
-                <div
-                  key={index}
-                  className="detection-box"
-                  style={{
-                    left: `${x1}px`,
-                    top: `${y1}px`,
-                    width: `${width}px`,
-                    height: `${height}px`,
-                  }}
-                >
-                  <div className="detection-label">
-                    {label} ({Math.round(confidence * 100)}%)
-                  </div>
-                </div>
-              )
-            })}
-          </div>
+        {!videoFailed && (
+          <img
+            src={`${API_URL}/api/streams/${streamId}/mjpeg?tier=${tier}`}
+            alt={`Live feed ${streamId}`}
+            className="w-full h-64 object-contain"
+            onLoad={() => setVideoLoaded(true)}
+            onError={() => {
+              console.log('Video stream unavailable, using placeholder')
+              setVideoFailed(true)
+            }}
+          />
         )}
 
         {/* Video Loading/Error State */}
-        {!videoLoaded && (
+        {(!videoLoaded || videoFailed) && (
           <div className="absolute inset-0 flex items-center justify-center bg-gray-800 text-white">
             <div className="text-center">
               <div className="text-4xl mb-2">📹</div>
-              <p className="text-sm">Video feed unavailable</p>
+              <p className="text-sm">{videoFailed ? 'Video feed unavailable' : 'Connecting to video feed...'}</p>
               <p className="text-xs text-gray-400 mt-1">
-                Place demo1.mp4 in /sample_videos/
+                Stream "{streamId}" from the backend
               </p>
             </div>
           </div>
@@ -1,73 +1,161 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import Head from 'next/head'
 import VideoFeed from '../components/VideoFeed'
 import SoldierStatus from '../components/SoldierStatus'
 import AlertPanel from '../components/AlertPanel'
 
+const API_URL = 'http://localhost:8000'
+const WS_URL = 'ws://localhost:8000/ws/stream'
+const ALERT_WINDOW_SECONDS = 600
+const RECONNECT_DELAY_MS = 3000
+
 export default function Dashboard() {
   const [detections, setDetections] = useState([])
   const [soldiers, setSoldiers] = useState([])
   const [alerts, setAlerts] = useState([])
   const [hasHighAlert, setHasHighAlert] = useState(false)
-  const [lastHighAlertTime, setLastHighAlertTime] = useState(0)
+  const lastHighAlertTime = useRef(0)
 
-  // Poll API endpoints every 1 second
-  useEffect(() => {
-    const pollData = async () => {
-      try {
-        // Fetch detections
-        const detectionsRes = await fetch('http://localhost:8000/api/detections')
-        if (detectionsRes.ok) {
-          const detectionsData = await detectionsRes.json()
-          setDetections(detectionsData.detections || [])
-        }
+  // Latest state per topic, keyed by id, as pushed by the backend
+  const topics = useRef({ detections: {}, soldiers: {}, alerts: {} })
+
+  const updateAlerts = (nextAlerts) => {
+    setAlerts(nextAlerts)
 
-        // Fetch soldiers
-        const soldiersRes = await fetch('http://localhost:8000/api/soldiers')
-        if (soldiersRes.ok) {
-          const soldiersData = await soldiersRes.json()
-          setSoldiers(soldiersData.soldiers || [])
+    // Check for new HIGH alerts
+    const highAlerts = nextAlerts.filter(alert => alert.severity === 'HIGH')
+    if (highAlerts.length > 0) {
+      setHasHighAlert(true)
+      const latestHighAlert = highAlerts[0]
+      if (latestHighAlert.timestamp > lastHighAlertTime.current) {
+        lastHighAlertTime.current = latestHighAlert.timestamp
+
+        // Play beep sound for new HIGH alerts
+        try {
+          const audio = new Audio('/beep.mp3')
+          audio.play().catch(e => console.log('Could not play beep sound:', e))
+        } catch (e) {
+          console.log('Beep sound not available:', e)
         }
+      }
+    } else {
+      setHasHighAlert(false)
+    }
+  }
+
+  const renderTopics = () => {
+    const state = topics.current
+    setDetections(Object.values(state.detections).flat())
+    setSoldiers(Object.values(state.soldiers))
 
-        // Fetch alerts
-        const alertsRes = await fetch('http://localhost:8000/api/alerts')
+    // Keep only recent alerts (last 10 minutes), newest first
+    const cutoff = Date.now() / 1000 - ALERT_WINDOW_SECONDS
+    for (const [id, alert] of Object.entries(state.alerts)) {
+      if (alert.timestamp <= cutoff) delete state.alerts[id]
+    }
+    updateAlerts(Object.values(state.alerts).sort((a, b) => b.timestamp - a.timestamp))
+  }
+
+  const applyMessage = (message) => {
+    const current = message.snapshot ? {} : { ...(topics.current[message.topic] || {}) }
+    Object.assign(current, message.upsert)
+    message.remove.forEach(id => delete current[id])
+    topics.current[message.topic] = current
+  }
+
+  // Fallback: poll API endpoints every 1 second
+  const pollData = async () => {
+    try {
+      // Fetch detections
+      const detectionsRes = await fetch(`${API_URL}/api/detections`)
+      if (detectionsRes.ok) {
+        const detectionsData = await detectionsRes.json()
+        setDetections(detectionsData.detections || [])
+      }
+
+      // Fetch soldiers
+      const soldiersRes = await fetch(`${API_URL}/api/soldiers`)
+      if (soldiersRes.ok) {
+        const soldiersData = await soldiersRes.json()
+        setSoldiers(soldiersData.soldiers || [])
+      }
+
+      // Fetch alerts
+      const alertsRes = await fetch(`${API_URL}/api/alerts`)
+      if (alertsRes.ok) {
+        const alertsData = await alertsRes.json()
+        updateAlerts(alertsData.alerts || [])
+      }
+    } catch (error) {
+      console.error('Error polling data:', error)
+    }
+  }
+
+  // Receive live updates over WebSocket, polling while it is unavailable
+  useEffect(() => {
+    let socket = null
+    let pollInterval = null
+    let reconnectTimer = null
+    let closed = false
+
+    const startPolling = () => {
+      if (!pollInterval) {
+        pollData()
+        pollInterval = setInterval(pollData, 1000)
+      }
+    }
+
+    const stopPolling = () => {
+      clearInterval(pollInterval)
+      pollInterval = null
+    }
+
+    const seedAlerts = async () => {
+      // Alerts are pushed as events, so load recent history once
+      try {
+        const alertsRes = await fetch(`${API_URL}/api/alerts`)
         if (alertsRes.ok) {
           const alertsData = await alertsRes.json()
-          setAlerts(alertsData.alerts || [])
-          
-          // Check for new HIGH alerts
-          const highAlerts = alertsData.alerts.filter(alert => alert.severity === 'HIGH')
-          if (highAlerts.length > 0) {
-            const latestHighAlert = highAlerts[0]
-            if (latestHighAlert.timestamp > lastHighAlertTime) {
-              setHasHighAlert(true)
-              setLastHighAlertTime(latestHighAlert.timestamp)
-              
-              // Play beep sound for new HIGH alerts
-              try {
-                const audio = new Audio('/beep.mp3')
-                audio.play().catch(e => console.log('Could not play beep sound:', e))
-              } catch (e) {
-                console.log('Beep sound not available:', e)
-              }
-            }
-          } else {
-            setHasHighAlert(false)
-          }
+          alertsData.alerts.forEach(alert => {
+            topics.current.alerts[alert.id] = alert
+          })
+          renderTopics()
         }
       } catch (error) {
-        console.error('Error polling data:', error)
+        console.error('Error loading alerts:', error)
       }
     }
 
-    // Initial poll
-    pollData()
+    const connect = () => {
+      socket = new WebSocket(WS_URL)
 
-    // Set up polling interval
-    const interval = setInterval(pollData, 1000)
+      socket.onopen = () => {
+        stopPolling()
+        topics.current = { detections: {}, soldiers: {}, alerts: {} }
+        seedAlerts()
+      }
+
+      socket.onmessage = (event) => {
+        applyMessage(JSON.parse(event.data))
+        renderTopics()
+      }
+
+      socket.onclose = () => {
+        if (closed) return
+        startPolling()
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS)
+      }
+    }
 
-    return () => clearInterval(interval)
-  }, [lastHighAlertTime])
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(reconnectTimer)
+      stopPolling()
+      if (socket) socket.close()
+    }
+  }, [])
 
   return (
     <>